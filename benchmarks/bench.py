@@ -0,0 +1,445 @@
+# benchmarks/bench.py
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date as Date, datetime, timedelta
+from itertools import product
+from typing import NamedTuple
+
+from src.controllers.utils import format_report, seed_database
+from src.models.database import Database
+from src.models.kpi_calculator import KPI
+from src.models.report_stats import compute_report_stats
+from src.models.rollups import range_sums_query, range_totals_params
+from src.models.sales_rep_data import SalesRepData
+from src.models.user_manager import UserManager
+from src.views import views
+
+# (reps, days) grids; "full" is every combination of the request's scales
+SCALES = {
+    "quick": [(10, 30), (100, 30), (100, 365)],
+    "standard": [(10, 30), (100, 365), (1000, 365)],
+    "full": list(product((10, 100, 1000, 10_000), (30, 365, 1825))),
+}
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# First seeded date; fixed so every run builds the same database
+START_DATE = "2024-01-01"
+
+# A run is a regression when it is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.25
+
+# Each sample repeats its call until it has run this long, so fast
+# operations are not dominated by timer and scheduling noise
+MIN_SAMPLE_SECONDS = 0.05
+
+# Upper bounds on the calls timed per sample by the per-rep benchmarks
+KPI_SAMPLE_REPS = 100
+INSERT_SAMPLE_ROWS = 200
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    Timings of one benchmark at one scale. Times are seconds per operation.
+    """
+
+    benchmark: str
+    reps: int
+    days: int
+    rows: int
+    ops: int
+    best: float
+    median: float
+
+
+class Comparison(NamedTuple):
+    """
+    A result next to its baseline timing.
+    """
+
+    result: BenchmarkResult
+    baseline: float
+    ratio: float
+    regression: bool
+
+
+def time_calls(function, ops, repeat, min_time=MIN_SAMPLE_SECONDS):
+    """
+    Times a function that performs `ops` operations per call.
+
+    Args:
+        function (callable): Called without arguments, at least once per
+            sample and until the sample has run for `min_time` seconds.
+        ops (int): Number of operations one call performs.
+        repeat (int): Number of samples.
+        min_time (float): Minimum duration of a sample in seconds.
+
+    Returns:
+        tuple: (best, median) seconds per operation.
+    """
+    samples = []
+    # Like timeit, keep garbage collection pauses out of the samples
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            calls = 0
+            started = time.perf_counter()
+            while True:
+                function()
+                calls += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time:
+                    break
+            samples.append(elapsed / (calls * ops))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return min(samples), statistics.median(samples)
+
+
+def check_report(db, metrics_manager, start_date, end_date):
+    """
+    Checks that the team report for a date range prints the same text as a
+    report built from each rep's rows summed directly from sales_rep_data,
+    as the report originally did, so a faster totals path cannot change it.
+
+    Args:
+        db (Database): The database instance.
+        metrics_manager (SalesRepData): Computes the report being checked.
+        start_date (str): First date of the range in YYYY-MM-DD format.
+        end_date (str): Last date of the range in YYYY-MM-DD format.
+
+    Raises:
+        RuntimeError: If the two reports differ.
+    """
+    rows = db.fetch_all(
+        range_sums_query(db.storage),
+        range_totals_params(start_date, end_date, db.storage),
+    )
+    expected = format_report(compute_report_stats(rows), start_date, end_date)
+    stats = metrics_manager.report_stats(start_date, end_date)
+    if format_report(stats, start_date, end_date) != expected:
+        raise RuntimeError(
+            f"The report for {start_date} to {end_date} differs from one "
+            "summed directly from sales_rep_data"
+        )
+
+
+def bench_scale(reps, days, repeat, compact=False):
+    """
+    Builds a synthetic database with `reps` sales reps and `days` days of
+    metrics each, then times the main data and KPI paths on it.
+
+    The KPI and report benchmarks run without a result cache, so they time
+    the queries themselves. generate_report is timed without its date
+    prompts: SalesRepData.report_stats() plus format_report(), which is the
+    work it does once the dates are entered. Its output is first checked
+    against a report summed directly from the rows (see check_report()).
+
+    Args:
+        reps (int): Number of sales reps.
+        days (int): Number of days of metrics per rep.
+        repeat (int): Samples taken of each timed benchmark.
+        compact (bool): Use the compact storage format.
+
+    Returns:
+        list: A BenchmarkResult per benchmark.
+
+    Raises:
+        RuntimeError: If the report differs from one summed directly.
+    """
+    rows = reps * days
+    results = []
+
+    def record(benchmark, ops, best, median):
+        results.append(
+            BenchmarkResult(benchmark, reps, days, rows, ops, best, median)
+        )
+
+    with tempfile.TemporaryDirectory() as directory, open(
+        os.devnull, "w"
+    ) as devnull:
+        db = Database(os.path.join(directory, "bench.db"), compact=compact)
+        try:
+            started = time.perf_counter()
+            rep_ids = seed_database(db, reps, START_DATE, days)
+            elapsed = time.perf_counter() - started
+            record("seed_database", rows, elapsed / rows, elapsed / rows)
+
+            user_manager = UserManager(db)
+            metrics_manager = SalesRepData(db)
+            kpi_calculator = KPI(db, user_manager)
+            sample = rep_ids[:KPI_SAMPLE_REPS]
+            # Display every result as the menus do; discard the output
+            quiet = contextlib.redirect_stdout(devnull)
+
+            def calculate_kpis():
+                with quiet:
+                    for rep_id in sample:
+                        views.display_kpi_summary(
+                            kpi_calculator.calculate_kpis(rep_id, rep_id)
+                        )
+
+            record(
+                "calculate_kpis",
+                len(sample),
+                *time_calls(calculate_kpis, len(sample), repeat),
+            )
+
+            def compare_all_kpis():
+                with quiet:
+                    for result in kpi_calculator.compare_all_kpis():
+                        views.display_kpi_summary(result)
+
+            record(
+                "compare_all_kpis", 1, *time_calls(compare_all_kpis, 1, repeat)
+            )
+
+            # Start and end mid-range, so both ends of the range are looked
+            # up in the cumulative rollup
+            first = Date.fromisoformat(START_DATE)
+            margin = timedelta(days=days // 10)
+            start_date = (first + margin).isoformat()
+            end_date = (first + timedelta(days=days - 1) - margin).isoformat()
+
+            check_report(db, metrics_manager, start_date, end_date)
+
+            def generate_report():
+                stats = metrics_manager.report_stats(start_date, end_date)
+                format_report(stats, start_date, end_date)
+
+            record(
+                "generate_report", 1, *time_calls(generate_report, 1, repeat)
+            )
+
+            # Inserted after the seeded days so reads above were unaffected
+            inserts = min(INSERT_SAMPLE_ROWS, rows)
+            next_day = first + timedelta(days=days)
+
+            def add_daily_metrics():
+                nonlocal next_day
+                day = next_day.isoformat()
+                next_day += timedelta(days=1)
+                for i in range(inserts):
+                    metrics_manager.add_daily_metrics(
+                        rep_ids[i % len(rep_ids)],
+                        day,
+                        20,
+                        10,
+                        5,
+                        2,
+                        500.0,
+                        800.0,
+                    )
+
+            record(
+                "add_daily_metrics",
+                inserts,
+                *time_calls(add_daily_metrics, inserts, repeat),
+            )
+        finally:
+            db.close()
+    return results
+
+
+def run_benchmarks(scales, repeat=5, compact=False, log=print):
+    """
+    Runs every benchmark at each (reps, days) scale.
+
+    Args:
+        scales (iterable): (reps, days) pairs.
+        repeat (int): Samples taken of each timed benchmark.
+        compact (bool): Use the compact storage format.
+        log (callable): Receives a progress line per result.
+
+    Returns:
+        list: BenchmarkResult entries, in run order.
+    """
+    results = []
+    for reps, days in scales:
+        for result in bench_scale(reps, days, repeat, compact):
+            log(format_result(result))
+            results.append(result)
+    return results
+
+
+def format_result(result):
+    """
+    Formats one result as a single report line.
+    """
+    return (
+        f"{result.benchmark:<18} {result.reps:>6} reps x {result.days:>4} days"
+        f"  best {result.best * 1000:10.4f} ms"
+        f"  median {result.median * 1000:10.4f} ms"
+    )
+
+
+def save_results(results, path, **meta):
+    """
+    Writes results and details of the environment to a JSON file.
+
+    Args:
+        results (list): BenchmarkResult entries.
+        path (str): Output file path; parent directories are created.
+        **meta: Extra values stored under "meta", e.g. the scale name.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        "meta": dict(
+            meta,
+            created=datetime.now().isoformat(timespec="seconds"),
+            python=platform.python_version(),
+            sqlite=sqlite3.sqlite_version,
+            platform=platform.platform(),
+        ),
+        "results": [result._asdict() for result in results],
+    }
+    with open(path, "w") as handle:
+        json.dump(document, handle, indent=2)
+        handle.write("\n")
+
+
+def load_results(path):
+    """
+    Reads results written by save_results().
+
+    Args:
+        path (str): Path of the JSON file.
+
+    Returns:
+        list: BenchmarkResult entries.
+    """
+    with open(path) as handle:
+        document = json.load(handle)
+    return [BenchmarkResult(**entry) for entry in document["results"]]
+
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares results with a baseline run, matching them by benchmark and
+    scale. Best times are compared, as they are the least noisy.
+
+    Args:
+        results (list): BenchmarkResult entries of the current run.
+        baseline (list): BenchmarkResult entries of the baseline run.
+        threshold (float): Allowed slowdown, e.g. 0.25 for 25%.
+
+    Returns:
+        list: A Comparison per result that has a baseline entry.
+    """
+    reference = {
+        (entry.benchmark, entry.reps, entry.days): entry.best
+        for entry in baseline
+    }
+    comparisons = []
+    for result in results:
+        base = reference.get((result.benchmark, result.reps, result.days))
+        if not base:
+            continue
+        ratio = result.best / base
+        comparisons.append(
+            Comparison(result, base, ratio, ratio > 1 + threshold)
+        )
+    return comparisons
+
+
+def format_comparison(comparison):
+    """
+    Formats one comparison as a single report line.
+    """
+    result = comparison.result
+    flag = "  REGRESSION" if comparison.regression else ""
+    return (
+        f"{result.benchmark:<18} {result.reps:>6} reps x {result.days:>4} days"
+        f"  {comparison.baseline * 1000:10.4f} ms"
+        f" -> {result.best * 1000:10.4f} ms"
+        f"  {comparison.ratio:5.2f}x{flag}"
+    )
+
+
+def parse_scales(args):
+    """
+    Returns the (reps, days) pairs selected on the command line.
+    """
+    if args.reps or args.days:
+        reps = [int(value) for value in (args.reps or "100").split(",")]
+        days = [int(value) for value in (args.days or "365").split(",")]
+        return list(product(reps, days))
+    return SCALES[args.scale]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the KPI Tracker data and KPI paths."
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    parser.add_argument("--reps", help="Comma-separated rep counts")
+    parser.add_argument("--days", help="Comma-separated day counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--output", help="Results file (JSON)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline instead of comparing to it",
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    scales = parse_scales(args)
+    results = run_benchmarks(scales, args.repeat, args.compact)
+    meta = {
+        "scale": "custom" if args.reps or args.days else args.scale,
+        "repeat": args.repeat,
+        "storage": "compact" if args.compact else "text",
+    }
+
+    if args.save_baseline:
+        save_results(results, args.baseline, **meta)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    save_results(results, output, **meta)
+    print(f"Results saved to {output}")
+
+    if not os.path.exists(args.baseline):
+        print(
+            "No baseline to compare against"
+            " (run make bench-baseline on this machine first)."
+        )
+        return 0
+    comparisons = compare_results(
+        results, load_results(args.baseline), args.threshold
+    )
+    print(f"\nCompared with {args.baseline} (best times):")
+    for comparison in comparisons:
+        print(format_comparison(comparison))
+    regressions = sum(comparison.regression for comparison in comparisons)
+    if regressions:
+        print(
+            f"{regressions} benchmark(s) regressed by more than "
+            f"{args.threshold:.0%}."
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
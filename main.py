@@ -1,28 +1,40 @@
 # main.py
 
+import argparse
+import sqlite3
+import sys
+
 from src.models.database import Database
-from src.models.sales_rep_data import SalesRepData
-from src.models.kpi_calculator import KPI
-from src.models.user_manager import UserManager
-from src.controllers.menus import (
-    manager_menu,
-    sales_rep_menu,
-    initial_setup,
-    login_user,
-)
-
-
-def main():
-    # Initialize database and related classes
-    db = Database()
-    user_manager = UserManager(db)
-    metrics_manager = SalesRepData(db)
-    kpi_calculator = KPI(db, user_manager)
+from src.models.tracing import tracer_from_env
+
+# Modules needed by a subcommand are imported inside its handler, so a
+# scripted run only pays for what it uses
+
 
-    # Check if any users exist in the database
-    users_exist = db.fetch_all("SELECT * FROM users")
+def run_interactive(db):
+    """
+    Runs the interactive login and menus.
 
-    if not users_exist:
+    Args:
+        db (Database): The database instance.
+    """
+    from src.controllers.menus import (
+        manager_menu,
+        sales_rep_menu,
+        initial_setup,
+        login_user,
+    )
+    from src.models.kpi_cache import KPICache
+    from src.models.kpi_calculator import KPI
+    from src.models.sales_rep_data import SalesRepData
+    from src.models.user_manager import UserManager
+
+    cache = KPICache()
+    user_manager = UserManager(db)
+    metrics_manager = SalesRepData(db, cache)
+    kpi_calculator = KPI(db, user_manager, cache)
+
+    if not user_manager.has_users():
         # Perform initial setup and directly enter the manager menu afterward
         initial_setup(user_manager)
         print("Logging in as the initial manager...")
@@ -43,9 +55,362 @@ def main():
                 print("Invalid User Role. Please contact your administrator.")
         else:
             print("Login failed. Please try again.")
+    return 0
+
+
+def run_report(db, args):
+    """
+    Prints the team performance report for a date range, optionally with
+    approximate day-level distributions.
+    """
+    import json
+
+    from src.controllers.utils import (
+        format_daily_distribution,
+        format_report,
+        report_document,
+    )
+    from src.models.sales_rep_data import SalesRepData
+
+    if args.snapshot:
+        from src.models.snapshot_file import open_snapshot
+
+        # Computed in memory from the mapped file, rewritten first if stale
+        source = open_snapshot(db, args.snapshot)
+    else:
+        source = SalesRepData(db)
+    try:
+        stats = source.report_stats(args.start, args.end)
+        distribution = None
+        if stats is not None and args.approximate:
+            distribution = source.daily_distribution(args.start, args.end)
+    finally:
+        if args.snapshot:
+            source.close()
+    if args.format == "json":
+        document = report_document(stats, args.start, args.end, distribution)
+        print(json.dumps(document, indent=2))
+    elif stats is None:
+        print(f"No performance data found between {args.start} and {args.end}.")
+    else:
+        print(format_report(stats, args.start, args.end))
+        if distribution is not None:
+            print()
+            print(format_daily_distribution(distribution))
+    return 0
+
+
+def run_kpis(db, args):
+    """
+    Prints KPIs for the selected reps (all sales reps by default), as text
+    summaries or as CSV/NDJSON records.
+    """
+    from src.controllers.exporter import write_records
+    from src.models.kpi_calculator import KPI, KPIResult
+    from src.models.user_manager import UserManager
+
+    kpi_calculator = KPI(db, UserManager(db))
+    if args.sort or args.limit:
+        if args.rep or args.start or args.end:
+            raise ValueError(
+                "--sort and --limit cannot be combined with --rep or a date "
+                "range."
+            )
+        results = kpi_calculator.team_kpis(sort_by=args.sort, limit=args.limit)
+    else:
+        results = kpi_calculator.iter_kpis(args.rep, args.start, args.end)
+
+    if args.format == "text":
+        from src.views.views import format_kpi_summary
+
+        for result in results:
+            print(format_kpi_summary(result))
+    else:
+        write_records(results, KPIResult._fields, sys.stdout, args.format)
+    return 0
+
+
+def run_leaderboard(db, args):
+    """
+    Prints the top (or bottom) reps by one metric or KPI.
+    """
+    from src.models.kpi_calculator import KPI
+    from src.models.user_manager import UserManager
+
+    entries = KPI(db, UserManager(db)).leaderboard(
+        args.metric,
+        limit=args.limit,
+        bottom=args.bottom,
+        start_date=args.start,
+        end_date=args.end,
+    )
+    if args.format == "json":
+        import json
+
+        print(json.dumps([entry._asdict() for entry in entries], indent=2))
+    else:
+        from src.views.views import format_leaderboard
+
+        print(format_leaderboard(entries, args.metric, args.bottom))
+    return 0
+
+
+def run_import(db, args):
+    """
+    Imports daily metrics from a CSV or NDJSON file.
+    """
+    from src.controllers.importer import format_import_summary, import_metrics
+
+    stats = import_metrics(
+        db, args.path, file_format=args.format, rejects_path=args.rejects
+    )
+    print(format_import_summary(stats))
+    return 0
+
+
+def run_export(db, args):
+    """
+    Exports metrics, KPIs or the report statistics to a file.
+    """
+    from src.controllers.exporter import export_data
+
+    count = export_data(
+        db,
+        args.kind,
+        args.path,
+        file_format=args.format,
+        rep_ids=args.rep,
+        start_date=args.start,
+        end_date=args.end,
+    )
+    print(f"Exported {count} records to {args.path}.")
+    return 0
+
+
+def run_reports(db, args):
+    """
+    Writes a performance report file per sales rep using worker processes.
+    """
+    from src.controllers.batch_reports import (
+        format_batch_summary,
+        write_rep_reports,
+    )
+
+    stats = write_rep_reports(
+        db,
+        args.output_dir,
+        rep_ids=args.rep,
+        start_date=args.start,
+        end_date=args.end,
+        workers=args.workers,
+    )
+    print(format_batch_summary(stats))
+    return 1 if stats.failures else 0
+
+
+def run_snapshot(db, args):
+    """
+    Writes the memory-mapped metrics snapshot file, unless it is already up
+    to date.
+    """
+    import time
+
+    from src.models.snapshot_file import MappedSnapshot, write_snapshot
+
+    if not args.force:
+        try:
+            with MappedSnapshot(args.path) as snapshot:
+                stale = snapshot.is_stale(db)
+        except (FileNotFoundError, ValueError):
+            stale = True
+        if not stale:
+            print(f"{args.path} is up to date.")
+            return 0
+    started = time.perf_counter()
+    header = write_snapshot(db, args.path)
+    print(
+        f"Wrote {header.row_count} rows to {args.path} in "
+        f"{time.perf_counter() - started:.2f}s."
+    )
+    return 0
+
+
+def run_seed(db, args):
+    """
+    Seeds the database with generated employees and metrics.
+    """
+    from src.controllers.utils import bulk_seed
+
+    options = {} if args.seed is None else {"seed": args.seed}
+    stats = bulk_seed(db, args.employees, args.start_date, args.days, **options)
+    print(
+        f"Seeded {len(stats.employee_ids)} employees and {stats.rows} rows "
+        f"in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s)."
+    )
+    return 0
+
+
+def date_argument(value):
+    """
+    Validates a YYYY-MM-DD command-line date.
+    """
+    from src.controllers.utils import parse_date
+
+    try:
+        return parse_date(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
+def build_parser():
+    """
+    Builds the command-line parser. Without a subcommand the interactive
+    menus are started.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Track and report sales rep KPIs."
+    )
+    parser.add_argument(
+        "--db", default="kpi_tracker_v2.db", help="SQLite database file"
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    def add_range(command):
+        command.add_argument(
+            "--start", type=date_argument, help="First date (YYYY-MM-DD)"
+        )
+        command.add_argument(
+            "--end", type=date_argument, help="Last date (YYYY-MM-DD)"
+        )
+
+    report = commands.add_parser("report", help="Print the team report")
+    report.add_argument(
+        "--start", type=date_argument, required=True, help="First date"
+    )
+    report.add_argument(
+        "--end", type=date_argument, required=True, help="Last date"
+    )
+    report.add_argument(
+        "--approximate",
+        action="store_true",
+        help="Add day-level distributions estimated with quantile sketches",
+    )
+    report.add_argument(
+        "--snapshot",
+        metavar="FILE",
+        help="Compute from this snapshot file (rewritten first if stale)",
+    )
+    report.add_argument("--format", choices=("text", "json"), default="text")
+    report.set_defaults(handler=run_report)
+
+    kpis = commands.add_parser("kpis", help="Print rep KPIs")
+    kpis.add_argument(
+        "--rep", action="append", help="Only this rep (repeatable)"
+    )
+    kpis.add_argument("--sort", help="KPI to rank reps by, highest first")
+    kpis.add_argument("--limit", type=int, help="Only the first N reps")
+    add_range(kpis)
+    kpis.add_argument(
+        "--format", choices=("text", "csv", "ndjson"), default="text"
+    )
+    kpis.set_defaults(handler=run_kpis)
+
+    leaderboard = commands.add_parser(
+        "leaderboard", help="Rank reps by a metric or KPI"
+    )
+    leaderboard.add_argument(
+        "metric", help="e.g. closed, close_percentage or cash_per_call"
+    )
+    leaderboard.add_argument("--limit", type=int, default=10)
+    leaderboard.add_argument(
+        "--bottom", action="store_true", help="Lowest-ranked reps first"
+    )
+    add_range(leaderboard)
+    leaderboard.add_argument(
+        "--format", choices=("text", "json"), default="text"
+    )
+    leaderboard.set_defaults(handler=run_leaderboard)
+
+    import_ = commands.add_parser("import", help="Import daily metrics")
+    import_.add_argument("path", help="CSV or NDJSON file")
+    import_.add_argument("--format", choices=("csv", "ndjson"))
+    import_.add_argument("--rejects", help="File for rejected records")
+    import_.set_defaults(handler=run_import)
+
+    export = commands.add_parser("export", help="Export data to a file")
+    export.add_argument("kind", choices=("metrics", "kpis", "report"))
+    export.add_argument("path", help="Output file")
+    export.add_argument("--format", choices=("csv", "ndjson"))
+    export.add_argument(
+        "--rep", action="append", help="Only this rep (repeatable)"
+    )
+    add_range(export)
+    export.set_defaults(handler=run_export)
+
+    reports = commands.add_parser(
+        "reports", help="Write a report file per sales rep"
+    )
+    reports.add_argument("output_dir", help="Directory for the report files")
+    reports.add_argument(
+        "--rep", action="append", help="Only this rep (repeatable)"
+    )
+    add_range(reports)
+    reports.add_argument(
+        "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    reports.set_defaults(handler=run_reports)
+
+    snapshot = commands.add_parser(
+        "snapshot", help="Write the memory-mapped metrics snapshot file"
+    )
+    snapshot.add_argument("path", help="Snapshot file")
+    snapshot.add_argument(
+        "--force", action="store_true", help="Rewrite even if up to date"
+    )
+    snapshot.set_defaults(handler=run_snapshot)
+
+    seed = commands.add_parser("seed", help="Generate sample data")
+    seed.add_argument("--employees", type=int, required=True)
+    seed.add_argument(
+        "--start-date", type=date_argument, required=True, help="YYYY-MM-DD"
+    )
+    seed.add_argument("--days", type=int, required=True)
+    seed.add_argument("--seed", type=int, help="Random seed for the metrics")
+    seed.set_defaults(handler=run_seed)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Runs a subcommand, or the interactive menus when none is given.
+
+    Args:
+        argv (list, optional): Arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: The process exit code.
+    """
+    args = build_parser().parse_args(argv)
 
-    db.close()
+    # Set KPI_TRACKER_TRACE_SLOW_MS to time every query and menu action
+    tracer = tracer_from_env()
+    db = Database(args.db, tracer=tracer)
+    try:
+        if args.command is None:
+            return run_interactive(db)
+        return args.handler(db, args)
+    except (ValueError, OSError, sqlite3.Error) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if tracer is not None:
+            print(tracer.format_report(), file=sys.stderr)
+        db.close()
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,295 @@
+# src/controllers/batch_reports.py
+
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+from src.models.database import Database
+from src.models.kpi_calculator import KPI, KPIResult
+from src.models.user_manager import UserManager
+from src.views.views import format_kpi_summary
+
+# Tasks submitted per worker; more, smaller tasks even out reps that take
+# longer than others at the cost of more round trips to the pool
+TASKS_PER_WORKER = 4
+
+# Characters kept in report file names; anything else becomes "_"
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Each worker process's read-only database, opened by _init_worker()
+_worker_db = None
+
+
+class RepReport(NamedTuple):
+    """
+    Outcome of one rep's report.
+
+    Attributes:
+        rep_id (str): The ID of the sales rep.
+        path (str): The report file, or None if it was not written.
+        seconds (float): Time spent formatting and writing the report.
+        error (str): Why the report failed, or None on success.
+    """
+
+    rep_id: str
+    path: str
+    seconds: float
+    error: str
+
+
+class BatchReportStats(NamedTuple):
+    """
+    Summary of a batch report run.
+
+    Attributes:
+        reports (list): A RepReport per requested rep, ordered by rep ID.
+        seconds (float): Wall-clock time of the run.
+        query_seconds (float): Time the workers spent computing KPIs, summed
+            over all workers.
+        workers (int): Number of worker processes used.
+    """
+
+    reports: list
+    seconds: float
+    query_seconds: float
+    workers: int
+
+    @property
+    def failures(self):
+        """The RepReport entries of reports that were not written."""
+        return [report for report in self.reports if report.error]
+
+    @property
+    def written(self):
+        """Number of report files written."""
+        return len(self.reports) - len(self.failures)
+
+    @property
+    def reports_per_second(self):
+        """Reports written per second of wall-clock time."""
+        return self.written / self.seconds if self.seconds else 0.0
+
+
+def report_filename(rep_id):
+    """
+    Returns the file name of a rep's report, safe for any rep ID.
+    """
+    return _UNSAFE_FILENAME.sub("_", rep_id) + ".txt"
+
+
+def format_rep_report(result, start_date=None, end_date=None):
+    """
+    Formats one rep's individual performance report.
+
+    Args:
+        result (KPIResult): The rep's totals and KPIs for the period.
+        start_date (str, optional): First date of the period.
+        end_date (str, optional): Last date of the period.
+
+    Returns:
+        str: The report text.
+    """
+    if start_date is None and end_date is None:
+        period = "All time"
+    else:
+        period = f"{start_date or 'first day'} to {end_date or 'last day'}"
+    return "\n".join(
+        [
+            f"Performance Report for {result.name or result.rep_id} "
+            f"({result.rep_id})",
+            f"Period: {period}",
+            "=" * 50,
+            format_kpi_summary(result).lstrip("\n"),
+            "",
+        ]
+    )
+
+
+def _init_worker(db_name):
+    """
+    Opens the worker process's own read-only connection to the database.
+    """
+    global _worker_db
+    _worker_db = Database(db_name, read_only=True)
+
+
+def _close_worker():
+    global _worker_db
+    _worker_db.close()
+    _worker_db = None
+
+
+def _write_reports(reps, output_dir, start_date, end_date):
+    """
+    Computes the KPIs of a chunk of reps in one query with the worker's
+    database, then writes each rep's report. A rep whose file cannot be
+    written is recorded and does not stop the others.
+
+    Args:
+        reps (list): (rep_id, name) pairs.
+        output_dir (str): Directory the report files are written to.
+        start_date (str): First date of the period, or None.
+        end_date (str): Last date of the period, or None.
+
+    Returns:
+        tuple: (RepReport list, seconds spent in the query).
+    """
+    started = time.perf_counter()
+    kpi_calculator = KPI(_worker_db, UserManager(_worker_db))
+    rep_ids = [rep_id for rep_id, _ in reps]
+    if start_date is None and end_date is None:
+        results = kpi_calculator.compute_many(rep_ids)
+    else:
+        # Reps without data in the range are missing from the result
+        found = {
+            result.rep_id: result
+            for result in kpi_calculator.iter_kpis(
+                rep_ids, start_date, end_date
+            )
+        }
+        results = [
+            found.get(rep_id)
+            or KPIResult.from_totals(rep_id, name, 0, 0, 0, 0, 0.0, 0.0)
+            for rep_id, name in reps
+        ]
+    query_seconds = time.perf_counter() - started
+
+    reports = []
+    for result in results:
+        started = time.perf_counter()
+        path = os.path.join(output_dir, report_filename(result.rep_id))
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(format_rep_report(result, start_date, end_date))
+        except OSError as e:
+            reports.append(
+                RepReport(
+                    result.rep_id, None, time.perf_counter() - started, str(e)
+                )
+            )
+        else:
+            reports.append(
+                RepReport(
+                    result.rep_id, path, time.perf_counter() - started, None
+                )
+            )
+    return reports, query_seconds
+
+
+def write_rep_reports(
+    db, output_dir, rep_ids=None, start_date=None, end_date=None, workers=None
+):
+    """
+    Writes an individual performance report file for every sales rep,
+    splitting the reps across a pool of worker processes. Each worker opens
+    its own read-only connection, so reports are computed in parallel with
+    each other and with writers of the database.
+
+    Args:
+        db (Database): The database instance; must be a file on disk.
+        output_dir (str): Directory for the report files (created if
+            missing), one <rep_id>.txt per rep.
+        rep_ids (iterable, optional): Only report these reps. Defaults to
+            every sales rep.
+        start_date (str, optional): First date of the period (YYYY-MM-DD).
+        end_date (str, optional): Last date of the period (YYYY-MM-DD).
+            Reports cover each rep's whole history when both are omitted.
+        workers (int, optional): Number of worker processes. Defaults to
+            the number of CPUs; 1 writes the reports in this process.
+
+    Returns:
+        BatchReportStats: The outcome of every rep's report and timings.
+
+    Raises:
+        ValueError: If the database is in memory or workers is below 1.
+    """
+    if db.db_name == ":memory:":
+        raise ValueError("Batch reports need a database file")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+
+    started = time.perf_counter()
+    sales_reps = {
+        user.id: user.name
+        for user in UserManager(db).iter_users(role="sales_rep")
+    }
+    if rep_ids is None:
+        rep_ids = sales_reps
+    reps = []
+    reports = []
+    for rep_id in dict.fromkeys(rep_ids):
+        if rep_id in sales_reps:
+            reps.append((rep_id, sales_reps[rep_id]))
+        else:
+            reports.append(RepReport(rep_id, None, 0.0, "Unknown sales rep"))
+
+    os.makedirs(output_dir, exist_ok=True)
+    query_seconds = 0.0
+    workers = min(workers, len(reps)) or 1
+    if workers == 1:
+        _init_worker(db.db_name)
+        try:
+            written, query_seconds = _write_reports(
+                reps, output_dir, start_date, end_date
+            )
+            reports.extend(written)
+        finally:
+            _close_worker()
+    else:
+        size = -(-len(reps) // (workers * TASKS_PER_WORKER))
+        chunks = [reps[i : i + size] for i in range(0, len(reps), size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(db.db_name,),
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _write_reports, chunk, output_dir, start_date, end_date
+                ): chunk
+                for chunk in chunks
+            }
+            for future in as_completed(futures):
+                try:
+                    written, seconds = future.result()
+                except Exception as e:
+                    # The worker itself failed, e.g. it could not open the
+                    # database or was killed; every rep of its chunk failed
+                    reports.extend(
+                        RepReport(rep_id, None, 0.0, f"Worker failed: {e}")
+                        for rep_id, _ in futures[future]
+                    )
+                else:
+                    reports.extend(written)
+                    query_seconds += seconds
+
+    reports.sort(key=lambda report: report.rep_id)
+    return BatchReportStats(
+        reports, time.perf_counter() - started, query_seconds, workers
+    )
+
+
+def format_batch_summary(stats):
+    """
+    Formats the throughput summary of a batch report run.
+
+    Args:
+        stats (BatchReportStats): The result of write_rep_reports().
+
+    Returns:
+        str: A short human-readable summary, listing every failed rep.
+    """
+    writing = sum(report.seconds for report in stats.reports)
+    summary = [
+        f"Wrote {stats.written} of {len(stats.reports)} reports in "
+        f"{stats.seconds:.2f}s with {stats.workers} worker(s) "
+        f"({stats.reports_per_second:,.0f} reports/sec; workers spent "
+        f"{stats.query_seconds:.2f}s in queries and {writing:.2f}s writing)."
+    ]
+    for report in stats.failures:
+        summary.append(f" - {report.rep_id}: {report.error}")
+    return "\n".join(summary)
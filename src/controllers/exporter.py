@@ -0,0 +1,125 @@
+# src/controllers/exporter.py
+
+import csv
+import json
+import os
+
+from src.controllers.importer import detect_format
+from src.models.kpi_calculator import KPI, KPIResult
+from src.models.report_stats import MetricStats
+from src.models.sales_rep_data import SalesRepData
+from src.models.user_manager import UserManager
+
+# What can be exported: raw daily rows, per-rep KPIs or report statistics
+EXPORT_KINDS = ("metrics", "kpis", "report")
+
+# Rows read from SQLite per fetchmany() call while exporting
+EXPORT_BATCH_SIZE = 5_000
+
+REPORT_FIELDS = ("metric",) + MetricStats._fields
+
+
+def iter_report(db, start_date, end_date):
+    """
+    Yields the per-metric report statistics for a date range.
+
+    Args:
+        db (Database): The database instance.
+        start_date (str): First date of the range (YYYY-MM-DD).
+        end_date (str): Last date of the range (YYYY-MM-DD).
+
+    Yields:
+        tuple: (metric, min, q1, median, q3, max, mean) per metric; nothing
+               if there is no data in the range.
+    """
+    stats = SalesRepData(db).report_stats(start_date, end_date)
+    if stats is None:
+        return
+    for metric, metric_stats in stats.metrics.items():
+        yield (metric,) + tuple(metric_stats)
+
+
+def write_records(records, fields, handle, file_format):
+    """
+    Writes records to an open file as CSV (with a header row) or NDJSON,
+    one record at a time.
+
+    Args:
+        records (iterable): Tuples matching `fields`.
+        fields (sequence): Field names.
+        handle (file): The open output file.
+        file_format (str): "csv" or "ndjson".
+
+    Returns:
+        int: The number of records written.
+    """
+    count = 0
+    if file_format == "csv":
+        writer = csv.writer(handle)
+        writer.writerow(fields)
+        for count, record in enumerate(records, 1):
+            writer.writerow(record)
+    else:
+        for count, record in enumerate(records, 1):
+            handle.write(json.dumps(dict(zip(fields, record))) + "\n")
+    return count
+
+
+def export_data(
+    db,
+    kind,
+    path,
+    file_format=None,
+    rep_ids=None,
+    start_date=None,
+    end_date=None,
+):
+    """
+    Streams raw metrics, per-rep KPIs or report statistics to a file.
+
+    Args:
+        db (Database): The database instance.
+        kind (str): One of EXPORT_KINDS.
+        path (str): Path of the output file.
+        file_format (str, optional): "csv" or "ndjson"; inferred from the
+            file extension when omitted.
+        rep_ids (iterable, optional): Only include these reps (metrics and
+            kpis).
+        start_date (str, optional): First date to include (YYYY-MM-DD).
+        end_date (str, optional): Last date to include (YYYY-MM-DD).
+
+    Returns:
+        int: The number of records written.
+
+    Raises:
+        ValueError: If the kind or format is unknown, or a report is
+            requested without a complete date range.
+    """
+    file_format = file_format or detect_format(path)
+    if kind == "metrics":
+        fields = SalesRepData.COLUMNS
+        records = SalesRepData(db).iter_daily_metrics(
+            rep_ids, start_date, end_date, batch_size=EXPORT_BATCH_SIZE
+        )
+    elif kind == "kpis":
+        fields = KPIResult._fields
+        kpi = KPI(db, UserManager(db))
+        records = kpi.iter_kpis(rep_ids, start_date, end_date)
+    elif kind == "report":
+        if start_date is None or end_date is None:
+            raise ValueError("A report export needs a start and end date.")
+        fields = REPORT_FIELDS
+        records = iter_report(db, start_date, end_date)
+    else:
+        raise ValueError(
+            f"Unknown export '{kind}'. Use one of: {', '.join(EXPORT_KINDS)}."
+        )
+
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            return write_records(records, fields, handle, file_format)
+    except BaseException:
+        # Do not leave a truncated export behind
+        if os.path.exists(path):
+            os.remove(path)
+        raise
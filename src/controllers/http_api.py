@@ -0,0 +1,426 @@
+# src/controllers/http_api.py
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.controllers.utils import parse_date, report_document
+from src.models.database import Database
+from src.models.kpi_calculator import (
+    KPI,
+    KPI_EXPRESSIONS,
+    ROLLING_WINDOWS,
+    KPIResult,
+)
+from src.models.kpi_cache import KPICache
+from src.models.sales_rep_data import SalesRepData
+from src.models.tracing import tracer_from_env
+from src.models.user_manager import UserManager
+from src.models.versions import current_version
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of rendered responses kept by ResponseCache
+RESPONSE_CACHE_SIZE = 256
+
+# Number of worker threads serving requests, each with its own long-lived
+# database connection
+SERVER_WORKERS = 8
+
+# Endpoints whose responses change without a data write
+UNCACHED_PATHS = {"/api/cache", "/api/queries"}
+
+
+class NotFound(Exception):
+    """
+    Raised by an endpoint when the requested resource does not exist.
+    """
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded cache of rendered JSON bodies. Each entry
+    remembers the data version it was computed at and is only served while
+    that version is current, so writes invalidate it automatically.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """
+        Returns the cached body for a key if it was computed at `version`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, body):
+        """
+        Stores a body computed at `version`, evicting the oldest entries.
+        """
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class KPIService:
+    """
+    JSON views over the KPI and report models, shared by all request
+    threads.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db (Database): Instance of the Database class for data operations.
+        """
+        self.db = db
+        self.kpi_cache = KPICache()
+        self.user_manager = UserManager(db)
+        self.kpi = KPI(db, self.user_manager, self.kpi_cache)
+        self.metrics = SalesRepData(db, self.kpi_cache)
+        self.cache = ResponseCache()
+
+    def rep_kpis(self, rep_id, query):
+        """
+        GET /api/kpis/<rep_id>[?start=&end=]: one rep's KPIs. A rep without
+        data in the range gets zero totals, as over their whole history.
+        """
+        user = self.user_manager.get_user(rep_id)
+        if user is None:
+            raise NotFound(f"Unknown rep '{rep_id}'")
+        start_date, end_date = _date_range(query, required=False)
+        if start_date is None and end_date is None:
+            result = self.kpi.compute_kpis(rep_id, user["name"])
+        else:
+            result = next(
+                self.kpi.iter_kpis([rep_id], start_date, end_date), None
+            )
+            if result is None:
+                result = KPIResult.from_totals(
+                    rep_id, user["name"], 0, 0, 0, 0, 0.0, 0.0
+                )
+        return result._asdict()
+
+    def team_kpis(self, query):
+        """
+        GET /api/kpis[?sort=&limit=&order=asc]: every rep's KPIs.
+        """
+        sort_by = _single(query, "sort")
+        if sort_by is not None and sort_by not in KPI_EXPRESSIONS:
+            raise ValueError(f"Unknown KPI to sort by: {sort_by}")
+        limit = _single(query, "limit")
+        if limit is not None:
+            if not limit.isdigit():
+                raise ValueError("limit must be a positive number")
+            limit = int(limit)
+        descending = _single(query, "order", "desc") != "asc"
+        results = self.kpi.team_kpis(sort_by, descending, limit)
+        return [result._asdict() for result in results]
+
+    def leaderboard(self, query):
+        """
+        GET /api/leaderboard?metric=[&limit=10&order=bottom&start=&end=]:
+        dense-ranked top (or bottom) reps by one metric or KPI.
+        """
+        metric = _single(query, "metric")
+        if metric is None:
+            raise ValueError("metric is required")
+        limit = _single(query, "limit", "10")
+        if not limit.isdigit():
+            raise ValueError("limit must be a positive number")
+        bottom = _single(query, "order", "top") == "bottom"
+        start_date, end_date = _date_range(query, required=False)
+        entries = self.kpi.leaderboard(
+            metric, int(limit), bottom, start_date, end_date
+        )
+        return [entry._asdict() for entry in entries]
+
+    def trends(self, query, rep_id=None):
+        """
+        GET /api/trends[/<rep_id>][?windows=7,30,90&start=&end=]: rolling
+        KPI series per rep and window.
+        """
+        if rep_id is not None and self.user_manager.get_user(rep_id) is None:
+            raise NotFound(f"Unknown rep '{rep_id}'")
+        windows = _single(query, "windows")
+        if windows is None:
+            windows = ROLLING_WINDOWS
+        else:
+            parts = windows.split(",")
+            if not all(part.isdigit() for part in parts):
+                raise ValueError("windows must be a list of numbers of days")
+            windows = [int(part) for part in parts]
+        start_date, end_date = _date_range(query, required=False)
+        trends = self.kpi.rolling_kpis(
+            windows,
+            [rep_id] if rep_id is not None else None,
+            start_date,
+            end_date,
+        )
+        return {
+            rep: {
+                str(window): trend.as_dict() for window, trend in series.items()
+            }
+            for rep, series in trends.items()
+        }
+
+    def report(self, query):
+        """
+        GET /api/report?start=&end=[&approximate=1]: the team report
+        statistics, optionally with approximate day-level distributions.
+        """
+        start_date, end_date = _date_range(query, required=True)
+        stats = self.metrics.report_stats(start_date, end_date)
+        distribution = None
+        if stats is not None and _single(query, "approximate") == "1":
+            distribution = self.metrics.daily_distribution(start_date, end_date)
+        return report_document(stats, start_date, end_date, distribution)
+
+    def cache_stats(self):
+        """
+        GET /api/cache: hit/miss counters of the KPI result cache.
+        """
+        stats = self.kpi_cache.stats()
+        return dict(stats._asdict(), hit_rate=stats.hit_rate)
+
+    def query_stats(self):
+        """
+        GET /api/queries: per-query timings and slow queries, when the
+        database was opened with a tracer.
+        """
+        tracer = self.db.tracer
+        if tracer is None:
+            raise NotFound(
+                "Query tracing is off; set KPI_TRACKER_TRACE_SLOW_MS to enable"
+            )
+        return {
+            "queries": [entry._asdict() for entry in tracer.query_stats()],
+            "slow": [entry._asdict() for entry in tracer.slow_queries()],
+        }
+
+    def route(self, path, query):
+        """
+        Dispatches a request path to its endpoint.
+
+        Returns:
+            The JSON-serializable response payload.
+
+        Raises:
+            NotFound: If no endpoint matches.
+            ValueError: If the query parameters are invalid.
+        """
+        parts = [part for part in path.split("/") if part]
+        if parts == ["api", "kpis"]:
+            return self.team_kpis(query)
+        if len(parts) == 3 and parts[:2] == ["api", "kpis"]:
+            return self.rep_kpis(parts[2], query)
+        if parts == ["api", "leaderboard"]:
+            return self.leaderboard(query)
+        if parts == ["api", "trends"]:
+            return self.trends(query)
+        if len(parts) == 3 and parts[:2] == ["api", "trends"]:
+            return self.trends(query, parts[2])
+        if parts == ["api", "report"]:
+            return self.report(query)
+        if parts == ["api", "cache"]:
+            return self.cache_stats()
+        if parts == ["api", "queries"]:
+            return self.query_stats()
+        raise NotFound(f"No endpoint at {path}")
+
+
+class KPIRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves KPIService endpoints with ETag/If-None-Match support. ETags are
+    derived from the data version and the request, so a client whose copy
+    is current gets a 304 without anything being recomputed.
+    """
+
+    service = None  # Set by make_server()
+
+    def do_GET(self):
+        try:
+            self._get()
+        except Exception:
+            # Report the failure as JSON instead of dropping the connection
+            logger.exception("Error serving %s", self.path)
+            self._send_error(500, "Internal server error")
+
+    def _get(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path in UNCACHED_PATHS:
+            body = self._render(url.path, query)
+            if body is not None:
+                self._send(200, body)
+            return
+
+        key = (
+            url.path
+            + "?"
+            + "&".join(
+                f"{name}={value}"
+                for name, values in sorted(query.items())
+                for value in values
+            )
+        )
+        version = current_version(self.service.db)
+        etag = '"{}-{}"'.format(
+            version, hashlib.sha1(key.encode()).hexdigest()[:16]
+        )
+
+        if etag in _etags(self.headers.get("If-None-Match")):
+            self._send(304, None, etag)
+            return
+
+        body = self.service.cache.get(key, version)
+        if body is None:
+            body = self._render(url.path, query)
+            if body is None:
+                return
+            self.service.cache.put(key, version, body)
+        self._send(200, body, etag)
+
+    def _render(self, path, query):
+        """
+        Routes a request and encodes its payload, answering client errors.
+
+        Returns:
+            bytes: The JSON body, or None once an error response was sent.
+        """
+        try:
+            payload = self.service.route(path, query)
+        except NotFound as e:
+            self._send_error(404, str(e))
+            return None
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return None
+        return json.dumps(payload).encode()
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode())
+
+    def log_message(self, format, *args):
+        # Keep polling dashboards from flooding the terminal
+        pass
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTP server that hands requests to a fixed pool of worker threads.
+    Database connections are per thread, so each worker opens one on its
+    first request and reuses it for every later one.
+    """
+
+    def __init__(self, server_address, handler_class, workers=SERVER_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="kpi-api"
+        )
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def make_server(db, host="127.0.0.1", port=8000, workers=SERVER_WORKERS):
+    """
+    Creates a multi-threaded HTTP server for the KPI service. Requests are
+    served by a fixed pool of worker threads, each reusing its own database
+    connection.
+
+    Args:
+        db (Database): The database instance.
+        host (str): Interface to listen on.
+        port (int): Port to listen on (0 picks a free one).
+        workers (int): Number of worker threads.
+
+    Returns:
+        PooledHTTPServer: The server; call serve_forever() to run it.
+    """
+    handler = type(
+        "BoundKPIRequestHandler",
+        (KPIRequestHandler,),
+        {"service": KPIService(db)},
+    )
+    return PooledHTTPServer((host, port), handler, workers)
+
+
+def _single(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _date_range(query, required):
+    start_date = _single(query, "start")
+    end_date = _single(query, "end")
+    if required and (start_date is None or end_date is None):
+        raise ValueError("start and end dates are required")
+    return (
+        parse_date(start_date) if start_date is not None else None,
+        parse_date(end_date) if end_date is not None else None,
+    )
+
+
+def _etags(header):
+    if not header:
+        return ()
+    return [tag.strip() for tag in header.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve KPIs as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    args = parser.parse_args()
+
+    db = Database(tracer=tracer_from_env())
+    server = make_server(db, args.host, args.port, args.workers)
+    print(f"Serving KPI API on http://{args.host}:{server.server_port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close()
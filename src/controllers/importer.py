@@ -0,0 +1,256 @@
+# src/controllers/importer.py
+
+import csv
+import json
+import os
+import time
+from typing import NamedTuple
+
+from src.controllers.utils import parse_amount, parse_count, parse_date
+from src.models.sales_rep_data import SalesRepData
+
+# Number of validated rows written per executemany() call
+IMPORT_CHUNK_SIZE = 10_000
+
+# Count and money fields of an imported record, with their validators
+FIELD_PARSERS = (
+    ("scheduled_calls", parse_count),
+    ("live_calls", parse_count),
+    ("offers", parse_count),
+    ("closed", parse_count),
+    ("cash_collected", parse_amount),
+    ("contract_value", parse_amount),
+)
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class ImportStats(NamedTuple):
+    """
+    Summary of an import run.
+
+    Attributes:
+        read (int): Records read from the input file.
+        imported (int): Rows inserted into sales_rep_data.
+        rejected (int): Records written to the rejects file.
+        seconds (float): Wall-clock time of the run.
+        rejects_path (str): Path of the rejects file, or None if every
+            record was imported.
+    """
+
+    read: int
+    imported: int
+    rejected: int
+    seconds: float
+    rejects_path: str
+
+    @property
+    def rows_per_second(self):
+        """Records processed per second of wall-clock time."""
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+def detect_format(path):
+    """
+    Infers the file format from its extension.
+
+    Args:
+        path (str): Path of the input file.
+
+    Returns:
+        str: "csv" or "ndjson".
+
+    Raises:
+        ValueError: If the extension is not recognized.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(
+            f"Unknown file type '{extension}'. Use .csv, .ndjson or .jsonl."
+        )
+    return FORMATS[extension]
+
+
+def read_records(handle, file_format):
+    """
+    Lazily reads records from an open CSV (with a header row) or NDJSON file.
+
+    Args:
+        handle (file): The open input file.
+        file_format (str): "csv" or "ndjson".
+
+    Yields:
+        tuple: (line_number, record), where record is a dict of field values,
+               or None if the line could not be parsed.
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(handle)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(handle, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+def validate_record(record, known_reps):
+    """
+    Checks one record with the same rules as interactive metric entry.
+
+    Args:
+        record (dict): Field values keyed by sales_rep_data column name.
+        known_reps (set): IDs of existing users.
+
+    Returns:
+        tuple: A row in SalesRepData.COLUMNS order.
+
+    Raises:
+        ValueError: Describing the first invalid field.
+    """
+    if record is None:
+        raise ValueError("Malformed record")
+    rep_id = str(record.get("rep_id") or "").strip()
+    if rep_id not in known_reps:
+        raise ValueError(f"Unknown rep_id '{rep_id}'")
+    try:
+        date = parse_date(str(record.get("date") or ""))
+    except ValueError as e:
+        raise ValueError(f"date: {e}")
+
+    row = [rep_id, date]
+    for field, parse in FIELD_PARSERS:
+        value = record.get(field)
+        if value is None:
+            raise ValueError(f"{field}: missing")
+        try:
+            row.append(parse(value))
+        except ValueError as e:
+            raise ValueError(f"{field}: {e}")
+    return tuple(row)
+
+
+class _RejectsWriter:
+    """
+    Writes rejected records as NDJSON, opening the file on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._handle = None
+
+    def write(self, line_number, error, record):
+        if self._handle is None:
+            self._handle = open(self.path, "w", encoding="utf-8")
+        self._handle.write(
+            json.dumps({"line": line_number, "error": error, "record": record})
+            + "\n"
+        )
+        self.count += 1
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+
+
+def valid_rows(records, known_reps, rejects):
+    """
+    Passes valid records through as rows and diverts invalid ones.
+
+    Args:
+        records (iterable): (line_number, record) pairs from read_records().
+        known_reps (set): IDs of existing users.
+        rejects (_RejectsWriter): Receives every invalid record.
+
+    Yields:
+        tuple: Rows in SalesRepData.COLUMNS order.
+    """
+    for line_number, record in records:
+        try:
+            yield validate_record(record, known_reps)
+        except ValueError as e:
+            rejects.write(line_number, str(e), record)
+
+
+def import_metrics(
+    db, path, file_format=None, chunk_size=IMPORT_CHUNK_SIZE, rejects_path=None
+):
+    """
+    Streams daily metrics from a CSV or NDJSON file into sales_rep_data.
+
+    Records flow through a generator pipeline (parse, validate, chunked
+    insert), so memory use does not grow with the size of the file. Valid
+    rows are written in a single transaction; invalid ones are written to a
+    rejects file as NDJSON with their line number and error.
+
+    Args:
+        db (Database): The database instance.
+        path (str): Path of the input file. CSV files need a header row with
+            the sales_rep_data column names.
+        file_format (str, optional): "csv" or "ndjson"; inferred from the
+            file extension when omitted.
+        chunk_size (int): Number of rows written per executemany() call.
+        rejects_path (str, optional): Where to write rejected records.
+            Defaults to the input path with ".rejects.ndjson" appended.
+
+    Returns:
+        ImportStats: Counts and throughput of the run.
+    """
+    file_format = file_format or detect_format(path)
+    rejects = _RejectsWriter(rejects_path or path + ".rejects.ndjson")
+    known_reps = {row[0] for row in db.iter_query("SELECT id FROM users")}
+
+    started = time.perf_counter()
+    read = 0
+
+    def counted(records):
+        nonlocal read
+        for item in records:
+            read += 1
+            yield item
+
+    try:
+        with open(path, newline="", encoding="utf-8") as handle:
+            records = counted(read_records(handle, file_format))
+            imported = SalesRepData(db).add_many_daily_metrics(
+                valid_rows(records, known_reps, rejects),
+                chunk_size=chunk_size,
+            )
+    finally:
+        rejects.close()
+
+    return ImportStats(
+        read,
+        imported,
+        rejects.count,
+        time.perf_counter() - started,
+        rejects.path if rejects.count else None,
+    )
+
+
+def format_import_summary(stats):
+    """
+    Formats the throughput summary of an import run.
+
+    Args:
+        stats (ImportStats): The result of import_metrics().
+
+    Returns:
+        str: A short human-readable summary.
+    """
+    summary = (
+        f"Imported {stats.imported} of {stats.read} records in "
+        f"{stats.seconds:.2f}s ({stats.rows_per_second:,.0f} records/sec)."
+    )
+    if stats.rejected:
+        summary += (
+            f"\n{stats.rejected} rejected records written to "
+            f"{stats.rejects_path}."
+        )
+    return summary
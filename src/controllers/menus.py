@@ -3,7 +3,10 @@
 from src.views import views
 from src.models.user_manager import UserManager
 from src.models.sales_rep_data import SalesRepData
-from src.models.kpi_calculator import KPI
+from src.models.kpi_calculator import KPI, KPI_EXPRESSIONS
+from src.models.tracing import span
+from src.controllers.exporter import export_data, EXPORT_KINDS
+from src.controllers.importer import import_metrics, format_import_summary
 from src.controllers.utils import (
     get_nonempty_input,
     get_numeric_input,
@@ -57,6 +60,8 @@ def manager_menu(
         management.
         kpi_calculator (KPI): Instance of KPI for KPI calculations.
     """
+    # Time each action's work (not its prompts) when tracing is on
+    tracer = metrics_manager.db.tracer
 
     while True:
         views.display_manager_menu()
@@ -79,9 +84,13 @@ def manager_menu(
             clear_screen()
         
             # Use UserManager's add_user method to add the new sales rep
-            success, message = user_manager.add_user(
-                user_id=user_id, name=name, pin=hashed_pin, role="sales_rep"
-            )
+            with span(tracer, "manager.add_sales_rep"):
+                success, message = user_manager.add_user(
+                    user_id=user_id,
+                    name=name,
+                    pin=hashed_pin,
+                    role="sales_rep",
+                )
         
             if success:
                 print(f"Sales rep {name} added successfully with ID {user_id}.")
@@ -90,8 +99,15 @@ def manager_menu(
 
         elif choice == "2":
             # View KPIs across all sales reps using KPI
+            sort_by, limit = views.prompt_for_team_kpi_options(KPI_EXPRESSIONS)
+            clear_screen()
             print("Comparing KPIs Across All Sales Reps:")
-            kpi_calculator.compare_all_kpis()
+            with span(tracer, "manager.compare_all_kpis"):
+                results = kpi_calculator.compare_all_kpis(
+                    sort_by=sort_by, limit=limit
+                )
+            for result in results:
+                views.display_kpi_summary(result)
 
         elif choice == "3":
             # Generate team performance overview
@@ -107,6 +123,55 @@ def manager_menu(
             # Seed the database with sample data
             seed_database_interactive(metrics_manager)
 
+        elif choice == "6":
+            # Stream daily metrics from a CSV or NDJSON export
+            path = get_nonempty_input(
+                "Enter the path of the CSV or NDJSON file to import: "
+            )
+            try:
+                with span(tracer, "manager.import_metrics"):
+                    stats = import_metrics(metrics_manager.db, path)
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+            else:
+                print(format_import_summary(stats))
+
+        elif choice == "7":
+            # Stream metrics, KPIs or report statistics to a file
+            kind, path, rep_ids, start_date, end_date = views.prompt_for_export(
+                EXPORT_KINDS
+            )
+            try:
+                with span(tracer, "manager.export_data"):
+                    count = export_data(
+                        metrics_manager.db,
+                        kind,
+                        path,
+                        rep_ids=rep_ids,
+                        start_date=start_date,
+                        end_date=end_date,
+                    )
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+            else:
+                print(f"Exported {count} records to {path}.")
+
+        elif choice == "8":
+            # Rank the team by one metric or KPI
+            metric, limit, bottom, start_date, end_date = (
+                views.prompt_for_leaderboard(KPI_EXPRESSIONS)
+            )
+            clear_screen()
+            with span(tracer, "manager.leaderboard"):
+                entries = kpi_calculator.leaderboard(
+                    metric,
+                    limit=limit,
+                    bottom=bottom,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+            print(views.format_leaderboard(entries, metric, bottom))
+
         else:
             print("Invalid choice. Please try again.")
 
@@ -123,6 +188,9 @@ def sales_rep_menu(
         kpi_calculator (KPI): Instance of KPI for calculating personal KPIs.
         rep_id (str): The ID of the sales rep.
     """
+    # Time each action's work (not its prompts) when tracing is on
+    tracer = metrics_manager.db.tracer
+
     while True:
         views.display_sales_rep_menu()
         choice = input("Enter your choice: ").strip()
@@ -139,16 +207,17 @@ def sales_rep_menu(
                 cash_collected,
                 contract_value,
             ) = views.prompt_for_metrics()
-            metrics_manager.add_daily_metrics(
-                rep_id,
-                date,
-                scheduled_calls,
-                live_calls,
-                offers,
-                closed,
-                cash_collected,
-                contract_value,
-            )
+            with span(tracer, "sales_rep.add_daily_metrics"):
+                metrics_manager.add_daily_metrics(
+                    rep_id,
+                    date,
+                    scheduled_calls,
+                    live_calls,
+                    offers,
+                    closed,
+                    cash_collected,
+                    contract_value,
+                )
             clear_screen()
             print("Daily metrics added successfully.")
 
@@ -156,7 +225,9 @@ def sales_rep_menu(
             # View personal KPIs using KPI calculator
             # print(f"\nKPI Summary for Sales Rep {rep_id}:")
 
-            kpi_calculator.calculate_kpis(rep_id, name)
+            with span(tracer, "sales_rep.calculate_kpis"):
+                result = kpi_calculator.calculate_kpis(rep_id, name)
+            views.display_kpi_summary(result)
 
         elif choice == "3":
             # Exit the sales rep menu
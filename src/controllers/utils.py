@@ -1,7 +1,12 @@
 import os
 import random
-import statistics
-from datetime import datetime, timedelta
+import time
+from datetime import date as Date, datetime, timedelta
+from typing import NamedTuple
+
+from src.models.sales_rep_data import SalesRepData
+from src.models.tracing import span
+from src.models.user_manager import UserManager
 
 
 def clear_screen():
@@ -93,6 +98,91 @@ def hash_pin(pin):
     return hashlib.sha256(pin.encode()).hexdigest()
 
 
+def parse_date(date_str):
+    """
+    Validates a date string in the format YYYY-MM-DD. Shared by interactive
+    prompts and file imports so both apply the same rules.
+
+    Args:
+        date_str (str): The date to validate.
+
+    Returns:
+        str: The date in consistent YYYY-MM-DD format.
+
+    Raises:
+        ValueError: If the date is empty or not a valid YYYY-MM-DD date.
+    """
+    date_str = date_str.strip()
+    if not date_str:
+        raise ValueError("Date cannot be empty. Please enter a valid date.")
+    if _is_canonical_date(date_str):
+        # Already YYYY-MM-DD; skip the much slower strptime() for bulk imports
+        return date_str
+    try:
+        # Parse and ensure the input date is valid
+        valid_date = datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+    return valid_date.strftime("%Y-%m-%d")  # Return consistent format
+
+
+def _is_canonical_date(date_str):
+    """
+    Returns True if the string is a valid, zero-padded YYYY-MM-DD date.
+    """
+    if (
+        len(date_str) != 10
+        or date_str[4] != "-"
+        or date_str[7] != "-"
+        or not (date_str[:4] + date_str[5:7] + date_str[8:]).isdigit()
+    ):
+        return False
+    try:
+        Date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
+    except ValueError:
+        return False
+    return True
+
+
+def parse_count(value):
+    """
+    Validates a count metric (calls, offers, deals): digits only, not empty.
+
+    Args:
+        value (str or int): The value to validate.
+
+    Returns:
+        int: The parsed count.
+
+    Raises:
+        ValueError: If the value is not a non-negative whole number.
+    """
+    value = str(value).strip()
+    if not value.isdigit():  # Ensures input is numeric and nonempty
+        raise ValueError("Input must be numeric and not empty.")
+    return int(value)
+
+
+def parse_amount(value):
+    """
+    Validates a money metric: digits with an optional decimal part.
+
+    Args:
+        value (str, int or float): The value to validate.
+
+    Returns:
+        float: The parsed amount.
+
+    Raises:
+        ValueError: If the value is not a non-negative decimal number.
+    """
+    value = str(value).strip()
+    whole, _, fraction = value.partition(".")
+    if not whole.isdigit() or (fraction and not fraction.isdigit()):
+        raise ValueError("Input must be a non-negative amount.")
+    return float(value)
+
+
 def get_valid_date(prompt):
     """
     Prompts the user to input a date in the format YYYY-MM-DD and validates it.
@@ -103,17 +193,32 @@ def get_valid_date(prompt):
     Returns:
         str: A valid date string in the format YYYY-MM-DD.
     """
+    while True:
+        try:
+            return parse_date(input(prompt))
+        except ValueError as e:
+            print(f"Error: {e}")
+
+
+def get_optional_date(prompt):
+    """
+    Prompts the user for an optional date in the format YYYY-MM-DD.
+
+    Args:
+        prompt (str): The input prompt to display.
+
+    Returns:
+        str: A valid date string in the format YYYY-MM-DD, or None if the
+             input was left blank.
+    """
     while True:
         date_str = input(prompt).strip()
         if not date_str:
-            print("Error: Date cannot be empty. Please enter a valid date.")
-            continue
+            return None
         try:
-            # Parse and ensure the input date is valid
-            valid_date = datetime.strptime(date_str, "%Y-%m-%d")
-            return valid_date.strftime("%Y-%m-%d")  # Return consistent format
-        except ValueError:
-            print("Error: Invalid date format. Please use YYYY-MM-DD.")
+            return parse_date(date_str)
+        except ValueError as e:
+            print(f"Error: {e}")
 
 
 def seed_database_interactive(metrics_manager):
@@ -138,31 +243,116 @@ def seed_database_interactive(metrics_manager):
         start_date = get_valid_date("Enter the start date (YYYY-MM-DD): ")
 
         # Seed the database
-        employee_ids = seed_database(
+        stats = bulk_seed(
             metrics_manager.db,
             employee_count=employee_count,
             start_date=start_date,
             days=days,
         )
         print(
-            f"Database successfully seeded with {len(employee_ids)} employees and {days} days of data."
+            f"Database successfully seeded with {len(stats.employee_ids)} employees and {days} days of data."
+        )
+        print(
+            f"Inserted {stats.rows} rows in {stats.seconds:.2f}s "
+            f"({stats.rows_per_second:,.0f} rows/sec)."
         )
     except ValueError as e:
         print(f"Error: {e}. Please try again.")
 
 
-def seed_database(db, employee_count, start_date, days):
+# Number of rows handed to a single executemany() call while seeding
+SEED_CHUNK_SIZE = 10_000
+
+# Fixed RNG seed so repeated seeding runs produce identical databases
+SEED_RANDOM_SEED = 42
+
+
+class SeedStats(NamedTuple):
+    """
+    Summary of a bulk seeding run.
+
+    Attributes:
+        employee_ids (list): The generated employee IDs.
+        rows (int): Number of metric rows inserted.
+        seconds (float): Wall-clock time spent generating and writing rows.
     """
-    Seeds the database with a given number of employees and days of metrics.
+
+    employee_ids: list
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        """Metric rows written per second of wall-clock time."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def generate_seed_metrics(employee_ids, start_date, days, rng):
+    """
+    Lazily generates random daily metric rows for the given employees.
+
+    Args:
+        employee_ids (list): Employee IDs to generate rows for.
+        start_date (datetime): The first day of generated data.
+        days (int): Number of consecutive days to generate per employee.
+        rng (random.Random): Random number generator used for the metrics.
+
+    Yields:
+        tuple: A row ready for insertion into sales_rep_data, in column order
+               (rep_id, date, scheduled_calls, live_calls, offers, closed,
+               cash_collected, contract_value).
+    """
+    # Format every date once instead of once per employee
+    dates = [
+        (start_date + timedelta(days=day)).strftime("%Y-%m-%d")
+        for day in range(days)
+    ]
+    randint = rng.randint
+    uniform = rng.uniform
+
+    for employee_id in employee_ids:
+        for date in dates:
+            scheduled_calls = randint(10, 50)
+            live_calls = randint(5, scheduled_calls)
+            offers = randint(2, live_calls)
+            closed = randint(1, offers)
+            cash_collected = round(uniform(100.0, 1000.0), 2)
+            contract_value = round(cash_collected * uniform(1.1, 2.0), 2)
+            yield (
+                employee_id,
+                date,
+                scheduled_calls,
+                live_calls,
+                offers,
+                closed,
+                cash_collected,
+                contract_value,
+            )
+
+
+def bulk_seed(
+    db,
+    employee_count,
+    start_date,
+    days,
+    chunk_size=SEED_CHUNK_SIZE,
+    seed=SEED_RANDOM_SEED,
+):
+    """
+    Seeds the database with generated employees and metrics in a single
+    transaction, writing metric rows in chunks with executemany().
 
     Args:
         db (Database): The database instance.
         employee_count (int): Number of employees to generate data for.
         start_date (str): Starting date in 'YYYY-MM-DD' format.
         days (int): Number of days to generate metrics for.
+        chunk_size (int): Number of metric rows written per executemany().
+        seed (int): Seed for the random number generator. Pass None for
+                    non-reproducible data.
 
     Returns:
-        list: A list of generated employee IDs.
+        SeedStats: The generated employee IDs and throughput figures.
     """
     # Parse the start_date in YYYY-MM-DD format
     try:
@@ -172,61 +362,59 @@ def seed_database(db, employee_count, start_date, days):
 
     # Generate employee IDs
     employee_ids = [f"SR{str(i+1).zfill(3)}" for i in range(employee_count)]
+    rng = random.Random(seed)
 
-    # Add employees to the database
-    for employee_id in employee_ids:
-        db.execute_query(
-            """
-            INSERT INTO users (id, pin, name, role)
-            VALUES (?, ?, ?, ?)
-            """,
+    user_manager = UserManager(db)
+    metrics_manager = SalesRepData(db)
+
+    started = time.perf_counter()
+    with db.transaction():
+        # Add employees to the database
+        success, message = user_manager.add_users(
             (
                 employee_id,
-                "hashed_pin",  # Replace with actual hashed PIN if needed
                 f"Employee {employee_id}",  # Name based on ID
+                "hashed_pin",  # Replace with actual hashed PIN if needed
                 "sales_rep",
-            ),
+            )
+            for employee_id in employee_ids
         )
+        if not success:
+            raise ValueError(message)
 
-    # Add metrics for each employee over the specified number of days
-    for employee_id in employee_ids:
-        for day in range(days):
-            date = start_date + timedelta(days=day)
-            scheduled_calls = random.randint(10, 50)
-            live_calls = random.randint(5, scheduled_calls)
-            offers = random.randint(2, live_calls)
-            closed = random.randint(1, offers)
-            cash_collected = round(random.uniform(100.0, 1000.0), 2)
-            contract_value = round(cash_collected * random.uniform(1.1, 2.0), 2)
-
-            db.execute_query(
-                """
-                INSERT INTO sales_rep_data (
-                    rep_id, date, scheduled_calls, live_calls, offers,
-                    closed, cash_collected, contract_value
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    employee_id,
-                    date.strftime(
-                        "%Y-%m-%d"
-                    ),  # Convert to database-friendly format
-                    scheduled_calls,
-                    live_calls,
-                    offers,
-                    closed,
-                    cash_collected,
-                    contract_value,
-                ),
-            )
+        # Stream generated metrics into the table chunk by chunk
+        rows = metrics_manager.add_many_daily_metrics(
+            generate_seed_metrics(employee_ids, start_date, days, rng),
+            chunk_size=chunk_size,
+        )
+
+    return SeedStats(employee_ids, rows, time.perf_counter() - started)
+
+
+def seed_database(db, employee_count, start_date, days, **options):
+    """
+    Seeds the database with a given number of employees and days of metrics.
 
-    return employee_ids
+    Args:
+        db (Database): The database instance.
+        employee_count (int): Number of employees to generate data for.
+        start_date (str): Starting date in 'YYYY-MM-DD' format.
+        days (int): Number of days to generate metrics for.
+        **options: Extra keyword arguments (chunk_size, seed) passed to
+                   bulk_seed().
+
+    Returns:
+        list: A list of generated employee IDs.
+    """
+    stats = bulk_seed(db, employee_count, start_date, days, **options)
+    return stats.employee_ids
 
 
 def generate_report(metrics_manager):
     """
     Generates a textual report summarizing the team's performance,
     including team-wide averages, quartile statistics, underperforming reps, and top performers.
+    Optionally appends approximate day-level distributions.
 
     Args:
         metrics_manager (SalesRepData): Instance of SalesRepData for fetching metrics.
@@ -234,134 +422,154 @@ def generate_report(metrics_manager):
     # Prompt for date range
     start_date = get_valid_date("Enter the start date (YYYY-MM-DD): ")
     end_date = get_valid_date("Enter the end date (YYYY-MM-DD): ")
+    approximate = (
+        input("Include approximate daily distributions? (y/N): ")
+        .strip()
+        .lower()
+        == "y"
+    )
     clear_screen()
 
-    # Fetch all data for the specified date range
-    data = metrics_manager.db.fetch_all(
-        """
-        SELECT rep_id, SUM(scheduled_calls) AS scheduled_calls, 
-               SUM(live_calls) AS live_calls, SUM(offers) AS offers, 
-               SUM(closed) AS closed, SUM(cash_collected) AS cash_collected, 
-               SUM(contract_value) AS contract_value
-        FROM sales_rep_data
-        WHERE date BETWEEN ? AND ?
-        GROUP BY rep_id
-        """,
-        (start_date, end_date),
-    )
+    with span(metrics_manager.db.tracer, "manager.generate_report"):
+        # Aggregate all data for the specified date range
+        stats = metrics_manager.report_stats(start_date, end_date)
 
-    if not data:
-        print(f"No performance data found between {start_date} and {end_date}.")
-        return
-
-    # Initialize statistics
-    team_totals = {
-        "scheduled_calls": [],
-        "live_calls": [],
-        "offers": [],
-        "closed": [],
-        "cash_collected": [],
-        "contract_value": [],
-    }
-    top_performers = {metric: None for metric in team_totals}
-    top_values = {metric: 0 for metric in team_totals}
-
-    # Populate team totals and identify top performers
-    for entry in data:
-        (
-            rep_id,
-            scheduled_calls,
-            live_calls,
-            offers,
-            closed,
-            cash_collected,
-            contract_value,
-        ) = entry
-
-        # Add to team totals
-        team_totals["scheduled_calls"].append(scheduled_calls)
-        team_totals["live_calls"].append(live_calls)
-        team_totals["offers"].append(offers)
-        team_totals["closed"].append(closed)
-        team_totals["cash_collected"].append(cash_collected)
-        team_totals["contract_value"].append(contract_value)
-
-        # Check for top performers
-        for metric in team_totals:
-            value = locals()[metric]
-            if value > top_values[metric]:
-                top_values[metric] = value
-                top_performers[metric] = rep_id
-
-    # Calculate averages and quartiles
-    num_reps = len(data)
-    team_averages = {
-        metric: sum(values) / num_reps for metric, values in team_totals.items()
-    }
-    quartiles = {
-        metric: {
-            "Min": min(values),
-            "Q1": statistics.quantiles(values, n=4)[0],
-            "Median": statistics.median(values),
-            "Q3": statistics.quantiles(values, n=4)[2],
-            "Max": max(values),
-            "Mean": team_averages[metric],  # Add the mean
-        }
-        for metric, values in team_totals.items()
-    }
+        if stats is None:
+            print(
+                f"No performance data found between {start_date} and {end_date}."
+            )
+            return
 
-    # Identify underperforming reps
-    underperformers = []
-    for entry in data:
-        (
-            rep_id,
-            scheduled_calls,
-            live_calls,
-            offers,
-            closed,
-            cash_collected,
-            contract_value,
-        ) = entry
-        for metric, q1 in {k: v["Q1"] for k, v in quartiles.items()}.items():
-            value = locals()[metric]
-            if value < q1:  # Flag if below Q1
-                underperformers.append(
-                    f" - {rep_id}: {metric.replace('_', ' ').title()} ({value:.2f}, below Q1: {q1:.2f})"
-                )
+        print(format_report(stats, start_date, end_date))
+        if approximate:
+            distribution = metrics_manager.daily_distribution(
+                start_date, end_date
+            )
+            print()
+            print(format_daily_distribution(distribution))
 
+
+def format_report(stats, start_date, end_date):
+    """
+    Formats computed report statistics as the team performance report.
+
+    Args:
+        stats (ReportStats): Statistics from SalesRepData.report_stats().
+        start_date (str): First date of the report range.
+        end_date (str): Last date of the report range.
+
+    Returns:
+        str: The report text.
+    """
     # Generate team summary
     summary = [
         f"Team Performance Report ({start_date} to {end_date})",
         "=" * 50,
         "Team-Wide Averages:",
     ]
-    for metric, average in team_averages.items():
-        summary.append(f" - {metric.replace('_', ' ').title()}: {average:.2f}")
+    for metric, metric_stats in stats.metrics.items():
+        summary.append(
+            f" - {metric.replace('_', ' ').title()}: {metric_stats.mean:.2f}"
+        )
 
     summary.append("")
     summary.append("Quartile Statistics (Per Metric):")
-    for metric, stats in quartiles.items():
+    for metric, metric_stats in stats.metrics.items():
         summary.append(f" - {metric.replace('_', ' ').title()}:")
-        summary.append(f"   - Min: {stats['Min']:.2f}")
-        summary.append(f"   - Q1: {stats['Q1']:.2f}")
-        summary.append(f"   - Median: {stats['Median']:.2f}")
-        summary.append(f"   - Q3: {stats['Q3']:.2f}")
-        summary.append(f"   - Max: {stats['Max']:.2f}")
-        summary.append(f"   - Mean: {stats['Mean']:.2f}")
+        summary.append(f"   - Min: {metric_stats.min:.2f}")
+        summary.append(f"   - Q1: {metric_stats.q1:.2f}")
+        summary.append(f"   - Median: {metric_stats.median:.2f}")
+        summary.append(f"   - Q3: {metric_stats.q3:.2f}")
+        summary.append(f"   - Max: {metric_stats.max:.2f}")
+        summary.append(f"   - Mean: {metric_stats.mean:.2f}")
         summary.append("")
 
-    if underperformers:
+    if stats.underperformers:
         summary.append("Underperforming Reps:")
-        summary.extend(underperformers)
+        for rep_id, metric, value, q1 in stats.underperformers:
+            summary.append(
+                f" - {rep_id}: {metric.replace('_', ' ').title()} ({value:.2f}, below Q1: {q1:.2f})"
+            )
     else:
         summary.append("No underperforming reps identified.")
 
     summary.append("")
     summary.append("Top Performers:")
-    for metric, rep_id in top_performers.items():
+    for metric, (rep_id, value) in stats.top_performers.items():
         summary.append(
-            f" - {metric.replace('_', ' ').title()}: {rep_id} ({top_values[metric]:.2f})"
+            f" - {metric.replace('_', ' ').title()}: {rep_id} ({value:.2f})"
         )
 
-    # Combine and print the report
-    print("\n".join(summary))
+    return "\n".join(summary)
+
+
+def format_daily_distribution(distribution):
+    """
+    Formats approximate day-level distributions as a report section.
+
+    Args:
+        distribution (DailyDistribution): From
+            SalesRepData.daily_distribution().
+
+    Returns:
+        str: The section text.
+    """
+    lines = [
+        f"Daily Distributions (approximate, {distribution.row_count} "
+        f"rep-days; quartiles within {distribution.rank_error:.1%} in rank):"
+    ]
+    for metric, metric_stats in distribution.metrics.items():
+        lines.append(
+            f" - {metric.replace('_', ' ').title()}: "
+            f"Min {metric_stats.min:.2f}, Q1 {metric_stats.q1:.2f}, "
+            f"Median {metric_stats.median:.2f}, Q3 {metric_stats.q3:.2f}, "
+            f"Max {metric_stats.max:.2f}, Mean {metric_stats.mean:.2f}"
+        )
+    return "\n".join(lines)
+
+
+def report_document(stats, start_date, end_date, distribution=None):
+    """
+    Converts computed report statistics to a JSON-serializable document, as
+    served by the HTTP API and printed by `main.py report --format json`.
+
+    Args:
+        stats (ReportStats): Statistics from SalesRepData.report_stats(), or
+            None if the range has no data.
+        start_date (str): First date of the report range.
+        end_date (str): Last date of the report range.
+        distribution (DailyDistribution, optional): Approximate day-level
+            distributions, included under "daily" when given.
+
+    Returns:
+        dict: The report document.
+    """
+    if stats is None:
+        return {"start": start_date, "end": end_date, "rep_count": 0}
+    document = {
+        "start": start_date,
+        "end": end_date,
+        "rep_count": stats.rep_count,
+        "metrics": {
+            metric: metric_stats._asdict()
+            for metric, metric_stats in stats.metrics.items()
+        },
+        "underperformers": [
+            {"rep_id": rep_id, "metric": metric, "value": value, "q1": q1}
+            for rep_id, metric, value, q1 in stats.underperformers
+        ],
+        "top_performers": {
+            metric: {"rep_id": rep_id, "value": value}
+            for metric, (rep_id, value) in stats.top_performers.items()
+        },
+    }
+    if distribution is not None:
+        document["daily"] = {
+            "row_count": distribution.row_count,
+            "rank_error": distribution.rank_error,
+            "metrics": {
+                metric: metric_stats._asdict()
+                for metric, metric_stats in distribution.metrics.items()
+            },
+        }
+    return document
@@ -0,0 +1,467 @@
+# src/models/analytics.py
+
+from array import array
+from collections import Counter
+from datetime import date as Date
+from functools import lru_cache
+from itertools import islice
+from typing import NamedTuple
+
+from .kpi_calculator import KPIResult
+from .quantiles import DEFAULT_K
+from .report_stats import (
+    NUMPY_MIN_ROWS,
+    _load_numpy,
+    compute_daily_distribution,
+    compute_report_stats,
+)
+from .rollups import METRIC_COLUMNS, MONEY_COLUMNS
+from .versions import current_version, reset_version
+
+# Columns of a snapshot and their array typecodes: the dictionary-encoded
+# rep, the date as a day number (date.toordinal()), then the six metrics,
+# all as 64-bit integers, money in whole cents so its sums are exact
+COLUMN_TYPES = {
+    "rep": "i",
+    "date": "i",
+    "scheduled_calls": "q",
+    "live_calls": "q",
+    "offers": "q",
+    "closed": "q",
+    "cash_collected": "q",
+    "contract_value": "q",
+}
+
+# Keys accepted by ColumnarMetrics.group_totals()
+GROUP_KEYS = ("rep", "date", "month")
+
+# Rows read from SQLite and appended to the columns at a time
+LOAD_BATCH_SIZE = 10_000
+
+
+class GroupTotals(NamedTuple):
+    """
+    Metric totals of one group of daily rows.
+
+    Attributes:
+        key (str): The rep ID, date (YYYY-MM-DD) or month (YYYY-MM).
+        row_count (int): Number of daily rows in the group.
+    """
+
+    key: str
+    row_count: int
+    scheduled_calls: int
+    live_calls: int
+    offers: int
+    closed: int
+    cash_collected: float
+    contract_value: float
+
+
+class ColumnarMetrics:
+    """
+    Daily metrics held column by column, with the filters, group-bys and
+    report and KPI computations that run over them.
+
+    Each column is a sequence of fixed-width values supporting the buffer
+    protocol (a typed array or a memoryview) in COLUMN_TYPES order and
+    format, and rep IDs are dictionary-encoded as small integers. NumPy is
+    used when it is installed and there are many rows; its arrays are views
+    of the columns, not copies.
+    """
+
+    def __init__(self, rep_ids, columns, use_numpy=None):
+        """
+        Args:
+            rep_ids (list): Rep ID of each code in the rep column.
+            columns (dict): Column name mapped to its values, for every
+                name of COLUMN_TYPES.
+            use_numpy (bool, optional): Force the NumPy (True) or pure
+                Python (False) computations. Defaults to NumPy when it is
+                installed and there are at least NUMPY_MIN_ROWS rows.
+
+        Raises:
+            ValueError: If use_numpy is True and NumPy is not installed.
+        """
+        if use_numpy and _load_numpy() is None:
+            raise ValueError("NumPy is not installed")
+        self.use_numpy = use_numpy
+        self.rep_ids = rep_ids
+        self._codes = {rep_id: code for code, rep_id in enumerate(rep_ids)}
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["date"])
+
+    @property
+    def nbytes(self):
+        """
+        int: Size of the columns, in bytes.
+        """
+        return sum(
+            column.itemsize * len(column) for column in self.columns.values()
+        )
+
+    def group_totals(
+        self, by="rep", rep_ids=None, start_date=None, end_date=None
+    ):
+        """
+        Sums the metrics of the selected rows per rep, date or month.
+
+        Args:
+            by (str): One of GROUP_KEYS.
+            rep_ids (iterable, optional): Only include these reps.
+            start_date (str, optional): First date to include (YYYY-MM-DD).
+            end_date (str, optional): Last date to include (YYYY-MM-DD).
+
+        Returns:
+            list: A GroupTotals per group with rows, ordered by key.
+
+        Raises:
+            ValueError: If `by` is not one of GROUP_KEYS.
+        """
+        if by not in GROUP_KEYS:
+            raise ValueError(
+                f"Cannot group by {by!r}; expected one of {GROUP_KEYS}"
+            )
+        np = self._numpy()
+        selection = self._selection(np, rep_ids, start_date, end_date)
+        # Months are summed from the (far fewer) per-date groups
+        key_column = "rep" if by == "rep" else "date"
+        if np is None:
+            groups = self._group_python(key_column, selection)
+        else:
+            groups = self._group_numpy(np, key_column, selection)
+
+        if by == "rep":
+            keyed = {self.rep_ids[code]: totals for code, totals in groups}
+        elif by == "date":
+            keyed = {_iso_date(day): totals for day, totals in groups}
+        else:
+            keyed = {}
+            for day, totals in groups:
+                month = _iso_date(day)[:7]
+                sums = keyed.get(month)
+                if sums is None:
+                    keyed[month] = totals
+                else:
+                    keyed[month] = [a + b for a, b in zip(sums, totals)]
+        # Money (the last two metrics) is summed in cents and only then
+        # converted to dollars
+        return [
+            GroupTotals(key, *totals[:5], *_dollars(totals[5:]))
+            for key, totals in sorted(keyed.items())
+        ]
+
+    def totals_by_rep(self, start_date=None, end_date=None, rep_ids=None):
+        """
+        Sums each rep's metrics, like SalesRepData.fetch_totals_by_rep().
+
+        Returns:
+            list: Tuples of (rep_id, scheduled_calls, live_calls, offers,
+                  closed, cash_collected, contract_value), one per rep with
+                  data, ordered by rep ID.
+        """
+        return [
+            (group.key,) + tuple(group[2:])
+            for group in self.group_totals("rep", rep_ids, start_date, end_date)
+        ]
+
+    def report_stats(self, start_date, end_date):
+        """
+        Computes the team report statistics for an inclusive date range,
+        like SalesRepData.report_stats(). Money totals are exact, so on a
+        text-format database a median or quartile falling on a half cent
+        can print one cent away from that report's, which sums floats.
+
+        Returns:
+            ReportStats: The statistics, or None if no rep has data in the
+                         range.
+        """
+        rows = self.totals_by_rep(start_date, end_date)
+        return compute_report_stats(rows) if rows else None
+
+    def kpis(self, rep_ids=None, start_date=None, end_date=None, names=None):
+        """
+        Computes the KPIs of every rep with data among the selected rows.
+
+        Args:
+            rep_ids (iterable, optional): Only include these reps.
+            start_date (str, optional): First date to include (YYYY-MM-DD).
+            end_date (str, optional): Last date to include (YYYY-MM-DD).
+            names (dict, optional): Rep ID mapped to the rep's name.
+
+        Returns:
+            list: A KPIResult per rep, ordered by rep ID.
+        """
+        names = names or {}
+        return [
+            KPIResult.from_totals(rep_id, names.get(rep_id), *totals)
+            for rep_id, *totals in self.totals_by_rep(
+                start_date, end_date, rep_ids
+            )
+        ]
+
+    def daily_distribution(self, start_date, end_date, k=DEFAULT_K):
+        """
+        Estimates the distribution of every metric and per-day ratio across
+        the daily rows of an inclusive date range, like
+        SalesRepData.daily_distribution(). Rows are fed to the sketches in
+        load order, so estimates can differ slightly from the database's.
+
+        Returns:
+            DailyDistribution: The approximate distribution, or None if
+                               there is no data in the range.
+        """
+        return compute_daily_distribution(
+            self.iter_rows(start_date=start_date, end_date=end_date), k
+        )
+
+    def iter_rows(self, rep_ids=None, start_date=None, end_date=None):
+        """
+        Yields the selected rows in load (ID) order.
+
+        Yields:
+            tuple: A row in SalesRepData.COLUMNS order, with the date as
+                   YYYY-MM-DD and money in dollars.
+        """
+        np = self._numpy()
+        selection = self._selection(np, rep_ids, start_date, end_date)
+        if selection is None:
+            selection = range(len(self))
+        elif np is not None:
+            selection = np.flatnonzero(selection).tolist()
+        reps, dates, *metrics = (self.columns[name] for name in COLUMN_TYPES)
+        *counts, cash, contract = metrics
+        for i in selection:
+            yield (
+                self.rep_ids[reps[i]],
+                _iso_date(dates[i]),
+                *(column[i] for column in counts),
+                cash[i] / 100,
+                contract[i] / 100,
+            )
+
+    def _numpy(self):
+        """
+        Returns the numpy module if the computations should use it.
+        """
+        if self.use_numpy is None and len(self) < NUMPY_MIN_ROWS:
+            return None
+        return _load_numpy() if self.use_numpy is not False else None
+
+    def _selection(self, np, rep_ids, start_date, end_date):
+        """
+        Selects the rows matching the filters.
+
+        Returns:
+            A boolean NumPy mask (when np is given) or a list of row
+            indexes, or None when every row is selected.
+        """
+        if rep_ids is None and start_date is None and end_date is None:
+            return None
+        codes = None
+        if rep_ids is not None:
+            codes = {
+                self._codes[rep_id]
+                for rep_id in rep_ids
+                if rep_id in self._codes
+            }
+        first = Date.fromisoformat(start_date).toordinal() if start_date else 0
+        last = (
+            Date.fromisoformat(end_date).toordinal()
+            if end_date
+            else Date.max.toordinal()
+        )
+
+        if np is not None:
+            dates = self._view(np, "date")
+            mask = (dates >= first) & (dates <= last)
+            if codes is not None:
+                mask &= np.isin(
+                    self._view(np, "rep"),
+                    np.fromiter(codes, dtype=np.int32, count=len(codes)),
+                )
+            return mask
+        rows = zip(self.columns["rep"], self.columns["date"])
+        if codes is None:
+            return [
+                i for i, (_, day) in enumerate(rows) if first <= day <= last
+            ]
+        return [
+            i
+            for i, (rep, day) in enumerate(rows)
+            if first <= day <= last and rep in codes
+        ]
+
+    def _group_python(self, key_column, selection):
+        """
+        Returns (key, [row_count, six sums]) pairs of the selected rows,
+        with money in cents.
+        """
+        keys = self.columns[key_column]
+        if selection is not None:
+            keys = [keys[i] for i in selection]
+        counts = Counter(keys)
+        groups = {key: [count] for key, count in counts.items()}
+        for name in METRIC_COLUMNS:
+            values = self.columns[name]
+            if selection is not None:
+                values = [values[i] for i in selection]
+            sums = dict.fromkeys(counts, 0)
+            for key, value in zip(keys, values):
+                sums[key] += value
+            for key, total in sums.items():
+                groups[key].append(total)
+        return groups.items()
+
+    def _group_numpy(self, np, key_column, selection):
+        """
+        Returns (key, [row_count, six sums]) pairs of the selected rows,
+        with money in cents.
+        """
+        keys = self._view(np, key_column)
+        if selection is not None:
+            keys = keys[selection]
+        if not len(keys):
+            return []
+        unique, inverse = np.unique(keys, return_inverse=True)
+        columns = [np.bincount(inverse, minlength=len(unique)).tolist()]
+        for name in METRIC_COLUMNS:
+            values = self._view(np, name)
+            if selection is not None:
+                values = values[selection]
+            # Weighted counts are floats; integer sums stay exact up to 2**53
+            sums = np.bincount(inverse, weights=values, minlength=len(unique))
+            columns.append(sums.astype(np.int64).tolist())
+        return zip(unique.tolist(), map(list, zip(*columns)))
+
+    def _view(self, np, name):
+        """
+        Returns a NumPy array sharing the memory of a column.
+        """
+        return np.frombuffer(self.columns[name], dtype=COLUMN_TYPES[name])
+
+
+class MetricsSnapshot(ColumnarMetrics):
+    """
+    Columnar in-memory copy of sales_rep_data for repeated analysis without
+    going back to SQLite.
+
+    Each column is a typed array (8 bytes or less per value instead of a
+    Python object per field). refresh() appends only the rows inserted
+    since the last load.
+
+    Not thread-safe; give each thread its own snapshot.
+
+    Example:
+        snapshot = MetricsSnapshot(db)
+        stats = snapshot.report_stats("2024-01-01", "2024-03-31")
+        by_month = snapshot.group_totals("month", rep_ids=["SR001"])
+    """
+
+    def __init__(self, db, use_numpy=None):
+        """
+        Loads every row of sales_rep_data.
+
+        Args:
+            db (Database): The database instance.
+            use_numpy (bool, optional): See ColumnarMetrics.
+
+        Raises:
+            ValueError: If use_numpy is True and NumPy is not installed.
+        """
+        super().__init__([], {}, use_numpy)
+        self.db = db
+        # Highest sales_rep_data ID loaded, and the data versions it matches
+        self.last_id = 0
+        self.version = None
+        self.reset_version = None
+        self._clear()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Brings the snapshot up to date by loading the rows inserted since
+        the last load, identified by their increasing IDs. Does nothing when
+        the data version has not changed. The snapshot is reloaded from
+        scratch if rows may have been edited or removed, i.e. the versions
+        were reset (see versions.bump_all_versions()) or IDs went back.
+
+        Returns:
+            int: Number of rows loaded.
+        """
+        # Read before loading, so a write made meanwhile leaves the version
+        # stale and the next refresh looks again (from last_id, so no row
+        # is loaded twice)
+        version = current_version(self.db)
+        if version == self.version:
+            return 0
+        reset = reset_version(self.db)
+        max_id = self.db.fetch_one("SELECT MAX(id) FROM sales_rep_data")[0]
+        if reset != self.reset_version or (max_id or 0) < self.last_id:
+            self._clear()
+        self.reset_version = reset
+        loaded = self._load()
+        # Rows up to max_id were all read, including any skipped for their
+        # date, so they are not looked at again
+        self.last_id = max(self.last_id, max_id or 0)
+        self.version = version
+        return loaded
+
+    def _clear(self):
+        self.rep_ids = []
+        self._codes = {}
+        for name, typecode in COLUMN_TYPES.items():
+            self.columns[name] = array(typecode)
+        self.last_id = 0
+
+    def _load(self):
+        """
+        Appends the rows with IDs above last_id to the columns.
+        """
+        storage = self.db.storage
+        selected = ["id", "rep_id", storage.ordinal_sql]
+        for column in METRIC_COLUMNS:
+            if column in MONEY_COLUMNS:
+                cents = f"ROUND({storage.money_sql(column)} * 100)"
+                selected.append(f"COALESCE(CAST({cents} AS INTEGER), 0)")
+            else:
+                selected.append(f"COALESCE({column}, 0)")
+        # Rows whose date cannot be read have no place in date filters
+        rows = self.db.iter_query(
+            f"""
+            SELECT {", ".join(selected)} FROM sales_rep_data
+            WHERE id > ? AND {storage.ordinal_sql} IS NOT NULL
+            ORDER BY id
+            """,
+            (self.last_id,),
+            batch_size=LOAD_BATCH_SIZE,
+        )
+        reps, *columns = (self.columns[name] for name in COLUMN_TYPES)
+        codes = self._codes
+        loaded = 0
+        while True:
+            batch = list(islice(rows, LOAD_BATCH_SIZE))
+            if not batch:
+                break
+            ids, rep_ids, *values = zip(*batch)
+            for rep_id in dict.fromkeys(rep_ids):
+                if rep_id not in codes:
+                    codes[rep_id] = len(self.rep_ids)
+                    self.rep_ids.append(rep_id)
+            reps.extend(map(codes.__getitem__, rep_ids))
+            for column, column_values in zip(columns, values):
+                column.extend(column_values)
+            self.last_id = ids[-1]
+            loaded += len(batch)
+        return loaded
+
+
+def _dollars(cents):
+    return [value / 100 for value in cents]
+
+
+@lru_cache(maxsize=4096)
+def _iso_date(day):
+    return Date.fromordinal(day).isoformat()
@@ -1,33 +1,180 @@
 # src/models/database.py
 
+import itertools
+import os
 import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+from urllib.parse import quote
+
+from .migrations import convert_to_compact, run_migrations
+from .storage import COMPACT_STORAGE, TEXT_STORAGE, detect_storage
+from .versions import bump_version
+
+# Seconds a connection waits for another writer's lock before giving up
+DEFAULT_BUSY_TIMEOUT = 10.0
+
+# Names for the shared in-memory databases behind Database(":memory:")
+_memory_ids = itertools.count(1)
+
+
+class _ConnectionState:
+    """
+    One thread's connection, its shared cursor and its transaction depth.
+    """
+
+    __slots__ = ("conn", "cursor", "depth", "__weakref__")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        # Depth of nested transaction() scopes; 0 means autocommit per call
+        self.depth = 0
 
 
 class Database:
     """
     Handles database connection, table setup, and query execution.
     Manages a SQLite database for storing sales reps, metrics, and user roles.
+
+    Each thread gets its own connection, opened on first use in WAL mode, so
+    readers in different threads run in parallel with a single writer.
+    Writes are serialized by a lock shared by all threads.
     """
 
-    def __init__(self, db_name="kpi_tracker_v2.db"):
+    def __init__(
+        self,
+        db_name="kpi_tracker_v2.db",
+        batch_size=1000,
+        timeout=DEFAULT_BUSY_TIMEOUT,
+        compact=False,
+        tracer=None,
+        read_only=False,
+    ):
         """
         Initializes the database connection and sets up tables.
 
         Args:
-            db_name (str): The name of the SQLite database file.
+            db_name (str): The name of the SQLite database file, or
+                ":memory:" for a private in-memory database shared by all
+                threads of this instance.
+            batch_size (int): Default number of rows fetched per fetchmany()
+                call by iter_query().
+            timeout (float): Seconds to wait for a lock held by another
+                connection (SQLite's busy timeout).
+            compact (bool): Store daily metrics in the compact format (day
+                numbers and integer cents, see src/models/storage.py). An
+                existing database in the text format is converted.
+            tracer (QueryTracer, optional): Receives the duration of every
+                statement run through this instance (see
+                src/models/tracing.py). Tracing is off when omitted.
+            read_only (bool): Open an existing database file read-only, e.g.
+                in worker processes. Tables are neither created nor
+                migrated, and every write fails.
+
+        Raises:
+            ValueError: If read_only is combined with ":memory:" or compact.
+        """
+        if read_only and (db_name == ":memory:" or compact):
+            raise ValueError(
+                "A read-only database must be an existing file in its "
+                "current format"
+            )
+
+        self.db_name = db_name
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.tracer = tracer
+        self.read_only = read_only
+
+        self._local = threading.local()
+        self._states = weakref.WeakSet()
+        self._states_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+        # In-memory databases are shared between threads through a named,
+        # shared-cache database that lives as long as one connection does
+        self._uri = None
+        self._memory_anchor = None
+        if db_name == ":memory:":
+            self._uri = (
+                f"file:kpi_tracker_memory_{next(_memory_ids)}"
+                "?mode=memory&cache=shared"
+            )
+            self._memory_anchor = self.conn
+
+        if read_only:
+            # mode=ro fails to open a missing file instead of creating it
+            self._uri = f"file:{quote(os.path.abspath(db_name))}?mode=ro"
+        else:
+            # Automatically set up tables and apply pending schema migrations
+            self.setup_tables(COMPACT_STORAGE if compact else TEXT_STORAGE)
+            run_migrations(self)
+
+        # Storage format of sales_rep_data; models convert dates and money
+        # at their boundary according to it
+        self.storage = detect_storage(self)
+        if compact and self.storage is not COMPACT_STORAGE:
+            convert_to_compact(self)
+
+    def _connect(self):
+        """
+        Opens a new connection configured for concurrent use: WAL journal,
+        NORMAL synchronous mode (safe with WAL) and a busy timeout.
+
+        Each connection is only used by the thread that opened it, except
+        that close() closes every thread's connection from the calling
+        thread; sqlite3's same-thread check is turned off to allow that.
+        """
+        options = {"timeout": self.timeout, "check_same_thread": False}
+        if self._uri is not None:
+            # Shared in-memory and read-only databases keep their journal
+            # mode, which a read-only connection could not change anyway
+            return sqlite3.connect(self._uri, uri=True, **options)
+        conn = sqlite3.connect(self.db_name, **options)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def _state(self):
+        """
+        The calling thread's connection state, connecting on first use.
+        """
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = _ConnectionState(self._connect())
+            self._local.state = state
+            with self._states_lock:
+                self._states.add(state)
+        return state
+
+    @property
+    def conn(self):
+        """
+        sqlite3.Connection: The calling thread's connection.
         """
-        # Establish a connection to the SQLite database
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
+        return self._state.conn
 
-        # Automatically set up tables during initialization
-        self.setup_tables()
+    @property
+    def cursor(self):
+        """
+        sqlite3.Cursor: The calling thread's shared cursor.
+        """
+        return self._state.cursor
 
-    def setup_tables(self):
+    def setup_tables(self, storage=TEXT_STORAGE):
         """
         Creates necessary tables if they do not already exist, including:
         - sales_rep_data: Stores daily metrics for each sales rep.
         - users: Stores user information, including roles for role-based access.
+
+        Args:
+            storage (TextStorage): Format of a newly created sales_rep_data
+                table; an existing table is left as it is.
         """
         # Create the 'sales_rep_data' table for storing daily metrics
         self.cursor.execute(
@@ -35,16 +182,16 @@ class Database:
             CREATE TABLE IF NOT EXISTS sales_rep_data (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,  -- Auto-incrementing unique ID
                 rep_id TEXT,                           -- References the user ID of the sales rep
-                date TEXT,                             -- Date of the metric entry
+                date {date},                           -- Date of the metric entry
                 scheduled_calls INTEGER,               -- Number of scheduled calls
                 live_calls INTEGER,                    -- Number of live calls made
                 offers INTEGER,                        -- Number of offers presented
                 closed INTEGER,                        -- Number of deals closed
-                cash_collected REAL,                   -- Amount of cash collected
-                contract_value REAL,                   -- Total contract value of closed deals
+                cash_collected {money},                -- Amount of cash collected
+                contract_value {money},                -- Total contract value of closed deals
                 FOREIGN KEY (rep_id) REFERENCES users (id) -- Relationship with users table
             )
-            """
+            """.format(date=storage.date_type, money=storage.money_type)
         )
 
         # Create the 'users' table to store user credentials and roles
@@ -60,39 +207,254 @@ class Database:
             """
         )
 
-        # Commit the changes to persist table structures in the database
-        self.conn.commit()
+        # Commit the changes to persist table structures in the database,
+        # unless an enclosing transaction() block will
+        if not self.in_transaction:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups every write issued inside the block into a single commit.
+
+        The transaction is committed when the outermost block exits normally
+        and rolled back if it raises. Nested scopes join the enclosing
+        transaction instead of committing on their own. The outermost block
+        holds the write lock, so only one thread writes at a time, and starts
+        with BEGIN IMMEDIATE so it never has to upgrade a read lock.
+
+        Example:
+            with db.transaction():
+                db.execute_query("INSERT ...", params)
+                db.execute_many("INSERT ...", rows)
+        """
+        state = self._state
+        if state.depth == 0:
+            self._write_lock.acquire()
+            try:
+                if not state.conn.in_transaction:
+                    state.cursor.execute("BEGIN IMMEDIATE")
+            except BaseException:
+                self._write_lock.release()
+                raise
+        state.depth += 1
+        try:
+            yield self
+        except BaseException:
+            state.depth -= 1
+            if state.depth == 0:
+                try:
+                    state.conn.rollback()
+                finally:
+                    self._write_lock.release()
+            raise
+        else:
+            state.depth -= 1
+            if state.depth == 0:
+                try:
+                    state.conn.commit()
+                finally:
+                    self._write_lock.release()
+
+    @property
+    def in_transaction(self):
+        """
+        bool: True while the calling thread is inside a transaction() block.
+        """
+        return self._state.depth > 0
 
     def execute_query(self, query, params=()):
         """
         Executes a given SQL query with parameters and commits changes.
+        Inside a transaction() block the commit is deferred to the block.
 
         Args:
             query (str): SQL query to execute.
             params (tuple): Parameters to use in the SQL query.
         """
-        self.cursor.execute(query, params)
-        self.conn.commit()
+        with self.transaction(), self._traced(query, params):
+            self.cursor.execute(query, params)
+
+    def execute_many(self, query, param_rows):
+        """
+        Executes a SQL statement once per parameter row with executemany() and
+        commits once at the end (or when the enclosing transaction() block
+        exits).
+
+        Args:
+            query (str): SQL statement to execute.
+            param_rows (iterable): Sequence or iterator of parameter tuples.
+
+        Returns:
+            int: The number of rows affected.
+        """
+        with self.transaction(), self._traced(query, None):
+            self.cursor.executemany(query, param_rows)
+            return self.cursor.rowcount
+
+    def bulk_insert(self, table, columns, rows, chunk_size=10_000):
+        """
+        Inserts many rows into a table in chunks of executemany() calls, all
+        within a single transaction.
+
+        Args:
+            table (str): Name of the table to insert into.
+            columns (sequence): Column names, in the order used by each row.
+            rows (iterable): Row tuples; may be a generator.
+            chunk_size (int): Number of rows passed to each executemany().
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            table, ", ".join(columns), ", ".join("?" for _ in columns)
+        )
+        inserted = 0
+        rows = iter(rows)
+        with self.transaction():
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                with self._traced(query, None):
+                    self.cursor.executemany(query, chunk)
+                inserted += len(chunk)
+        return inserted
 
-    def fetch_all(self, query, params=()):
+    def fetch_all(self, query, params=(), row_factory=None):
         """
         Fetches all results for a given SQL query.
 
         Args:
             query (str): SQL query to execute.
             params (tuple): Parameters to use in the SQL query.
+            row_factory (callable, optional): Builds each row from
+                (cursor, row), e.g. sqlite3.Row or record_factory(SomeClass).
+                Rows are plain tuples when omitted.
 
         Returns:
             list: List of all results fetched from the database.
         """
-        self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        if row_factory is None:
+            with self._traced(query, params):
+                self.cursor.execute(query, params)
+                return self.cursor.fetchall()
+        cursor = self._cursor(row_factory)
+        try:
+            with self._traced(query, params):
+                cursor.execute(query, params)
+                return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def fetch_one(self, query, params=(), row_factory=None):
+        """
+        Fetches the first result of a SQL query without building a list.
+
+        Args:
+            query (str): SQL query to execute.
+            params (tuple): Parameters to use in the SQL query.
+            row_factory (callable, optional): See fetch_all().
+
+        Returns:
+            The first row, or None if the query returned no rows.
+        """
+        cursor = self._cursor(row_factory)
+        try:
+            with self._traced(query, params):
+                cursor.execute(query, params)
+                return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def iter_query(self, query, params=(), batch_size=None, row_factory=None):
+        """
+        Lazily yields the results of a query, reading them from SQLite in
+        batches with fetchmany() so memory use does not grow with the size of
+        the result. Uses its own cursor, so other queries can run while the
+        iterator is being consumed.
+
+        Args:
+            query (str): SQL query to execute.
+            params (tuple): Parameters to use in the SQL query.
+            batch_size (int, optional): Number of rows fetched per
+                fetchmany() call. Defaults to the database's batch_size.
+            row_factory (callable, optional): See fetch_all().
+
+        Yields:
+            One result row at a time.
+        """
+        batch_size = batch_size or self.batch_size
+        tracer = self.tracer
+        clock = time.perf_counter
+        cursor = self._cursor(row_factory)
+        # Only time spent in SQLite counts towards the query's duration, not
+        # the time the caller spends between batches
+        elapsed = 0.0
+        try:
+            started = clock()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += clock() - started
+                if not rows:
+                    break
+                yield from rows
+                started = clock()
+        finally:
+            cursor.close()
+            if tracer is not None:
+                tracer.record(query, params, elapsed)
+
+    def _traced(self, query, params):
+        """
+        Times the enclosed block as one execution of `query` when tracing
+        is on.
+        """
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.timing(query, params)
+
+    def _cursor(self, row_factory=None):
+        """
+        Opens a new cursor that builds its rows with the given factory.
+        """
+        cursor = self.conn.cursor()
+        if row_factory is not None:
+            cursor.row_factory = row_factory
+        return cursor
+
+    def explain_query_plan(self, query, params=()):
+        """
+        Returns SQLite's EXPLAIN QUERY PLAN output for a query, e.g. to check
+        that it uses an index instead of scanning the whole table.
+
+        Args:
+            query (str): SQL query to explain.
+            params (tuple): Parameters to use in the SQL query.
+
+        Returns:
+            list: The plan steps as strings, e.g.
+                  ["SEARCH sales_rep_data USING COVERING INDEX ..."].
+        """
+        self.cursor.execute("EXPLAIN QUERY PLAN " + query, params)
+        return [row[3] for row in self.cursor.fetchall()]
 
     def close(self):
         """
-        Closes the database connection.
+        Closes the database connections of every thread. A thread that uses
+        the database afterwards opens a new connection; call it once other
+        threads are done with the database.
         """
-        self.conn.close()
+        with self._states_lock:
+            states = list(self._states)
+            self._states = weakref.WeakSet()
+        for state in states:
+            state.conn.close()
+        self._local = threading.local()
+        self._memory_anchor = None
 
     def insert_user(self, user_id, name, pin, role):
         """
@@ -111,13 +473,15 @@ class Database:
         """
         try:
             # Attempt to insert a new user into the database
-            self.execute_query(
-                """
-                INSERT INTO users (id, name, pin, role)
-                VALUES (?, ?, ?, ?)
-                """,
-                (user_id, name, pin, role),
-            )
+            with self.transaction():
+                self.execute_query(
+                    """
+                    INSERT INTO users (id, name, pin, role)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (user_id, name, pin, role),
+                )
+                bump_version(self)
             return {"success": True, "message": "User added successfully."}
         except sqlite3.IntegrityError as e:
             # Handle duplicate User ID or other integrity issues
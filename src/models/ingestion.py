@@ -0,0 +1,297 @@
+# src/models/ingestion.py
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+# Defaults of an IngestionQueue: rows committed per transaction at most,
+# seconds a row waits for more rows to share its transaction, and rows
+# queued before submit() blocks
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_MAX_DELAY = 0.005
+DEFAULT_MAX_PENDING = 10_000
+
+
+class IngestionStats(NamedTuple):
+    """
+    Counters of an IngestionQueue.
+
+    Attributes:
+        rows (int): Rows committed.
+        batches (int): Transactions committed.
+        failed (int): Rows whose write failed.
+        pending (int): Rows and flush requests waiting for the writer.
+    """
+
+    rows: int
+    batches: int
+    failed: int
+    pending: int
+
+    @property
+    def rows_per_batch(self):
+        """Average number of rows committed per transaction."""
+        return self.rows / self.batches if self.batches else 0.0
+
+
+class _Marker:
+    """
+    Queue entry resolved once every row queued before it was written; the
+    last one, queued by close(), also stops the writer.
+    """
+
+    __slots__ = ("future", "stop")
+
+    def __init__(self, stop=False):
+        self.future = Future()
+        self.stop = stop
+
+
+class IngestionQueue:
+    """
+    Group-commit front end to SalesRepData for many concurrent writers.
+
+    Rows submitted from any thread are queued and written by one dedicated
+    writer thread, which commits up to batch_size of them per transaction
+    with SalesRepData.add_many_daily_metrics(). A batch is written as soon
+    as it is full or max_delay seconds after its first row arrived, so the
+    transaction and rollup costs are shared by every row in it instead of
+    each caller committing and waiting for the write lock in turn.
+
+    Each submission returns a Future that resolves once the row is
+    committed. The queue holds at most max_pending rows; submit() blocks
+    when it is full, so fast producers are slowed down instead of using
+    unbounded memory. close() (also run at interpreter exit) writes every
+    queued row before stopping the writer.
+
+    Example:
+        with IngestionQueue(SalesRepData(db)) as ingestion:
+            future = ingestion.submit("SR001", "2024-01-31", 20, 10, 5, 2,
+                                      500.0, 800.0)
+            future.result()  # Wait until the row is committed
+    """
+
+    def __init__(
+        self,
+        metrics_manager,
+        batch_size=DEFAULT_BATCH_SIZE,
+        max_delay=DEFAULT_MAX_DELAY,
+        max_pending=DEFAULT_MAX_PENDING,
+    ):
+        """
+        Starts the writer thread.
+
+        Args:
+            metrics_manager (SalesRepData): Writes the rows.
+            batch_size (int): Most rows committed in one transaction.
+            max_delay (float): Seconds the first row of a batch waits for
+                more rows; 0 writes whatever is queued at once.
+            max_pending (int): Most rows queued before submit() blocks.
+
+        Raises:
+            ValueError: If a limit is out of range.
+        """
+        if batch_size < 1 or max_pending < 1 or max_delay < 0:
+            raise ValueError(
+                "batch_size and max_pending must be at least 1 and "
+                "max_delay must not be negative"
+            )
+        self.metrics_manager = metrics_manager
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(max_pending)
+        # Held while checking for close() and queuing, so no entry can be
+        # queued after the writer's stop marker
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        # Only updated by the writer thread
+        self._rows = 0
+        self._batches = 0
+        self._failed = 0
+        self._writer = threading.Thread(
+            target=self._run, name="metrics-ingestion", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def stats(self):
+        """
+        IngestionStats: The queue's counters.
+        """
+        return IngestionStats(
+            self._rows, self._batches, self._failed, self._queue.qsize()
+        )
+
+    def submit(
+        self,
+        rep_id,
+        date,
+        scheduled_calls,
+        live_calls,
+        offers,
+        closed,
+        cash_collected,
+        contract_value,
+        timeout=None,
+    ):
+        """
+        Queues one row of daily metrics, with the arguments of
+        SalesRepData.add_daily_metrics().
+
+        Args:
+            timeout (float, optional): Seconds to wait for room in a full
+                queue. Waits as long as needed when omitted.
+
+        Returns:
+            Future: Resolves to None once the row is committed, or raises
+                    the exception that kept it from being written. Rows
+                    cancelled before their batch is written are skipped.
+
+        Raises:
+            queue.Full: If the queue stayed full for `timeout` seconds.
+            RuntimeError: If the queue was closed.
+        """
+        future = Future()
+        row = (
+            rep_id,
+            date,
+            scheduled_calls,
+            live_calls,
+            offers,
+            closed,
+            cash_collected,
+            contract_value,
+        )
+        self._put((row, future), timeout)
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Waits until every row submitted before the call was written.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most.
+
+        Raises:
+            TimeoutError: If the rows were not written in time, including
+                when the queue stayed full for the whole timeout.
+            RuntimeError: If the queue was closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        marker = _Marker()
+        try:
+            self._put(marker, timeout)
+        except queue.Full:
+            raise TimeoutError(
+                "The ingestion queue stayed full until the flush timed out"
+            ) from None
+        if deadline is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+        marker.future.result(timeout)
+
+    def close(self, timeout=None):
+        """
+        Stops accepting rows, writes every queued row and stops the writer
+        thread. Calling it again does nothing.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the writer.
+        """
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(_Marker(stop=True))
+        self._writer.join(timeout)
+        atexit.unregister(self.close)
+
+    def _put(self, entry, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._submit_lock.acquire(
+            timeout=-1 if timeout is None else timeout
+        ):
+            raise queue.Full
+        try:
+            if self._closed:
+                raise RuntimeError("The ingestion queue is closed")
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+            self._queue.put(entry, timeout=timeout)
+        finally:
+            self._submit_lock.release()
+
+    def _run(self):
+        """
+        The writer thread: collects batches and writes them until stopped.
+        """
+        stop = False
+        while not stop:
+            entry = self._queue.get()
+            deadline = time.monotonic() + self.max_delay
+            batch = []
+            markers = []
+            while True:
+                if isinstance(entry, _Marker):
+                    # Someone is waiting for the rows queued so far
+                    markers.append(entry)
+                    stop = entry.stop
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for marker in markers:
+                marker.future.set_result(None)
+
+    def _write(self, batch):
+        """
+        Commits a batch of (row, future) entries in one transaction and
+        resolves their futures.
+        """
+        rows = []
+        futures = []
+        for row, future in batch:
+            if future.set_running_or_notify_cancel():
+                rows.append(row)
+                futures.append(future)
+        if not rows:
+            return
+        try:
+            self.metrics_manager.add_many_daily_metrics(rows)
+        except Exception as error:
+            if len(rows) == 1:
+                self._failed += 1
+                futures[0].set_exception(error)
+                return
+            # Nothing was committed; write each row on its own so a bad row
+            # only fails its own future
+            for row, future in zip(rows, futures):
+                try:
+                    self.metrics_manager.add_daily_metrics(*row)
+                except Exception as row_error:
+                    self._failed += 1
+                    future.set_exception(row_error)
+                else:
+                    self._rows += 1
+                    self._batches += 1
+                    future.set_result(None)
+            return
+        self._rows += len(rows)
+        self._batches += 1
+        for future in futures:
+            future.set_result(None)
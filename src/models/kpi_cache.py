@@ -0,0 +1,162 @@
+# src/models/kpi_cache.py
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+# Default limits of a KPICache
+CACHE_MAX_ENTRIES = 4096
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CacheStats(NamedTuple):
+    """
+    Counters for tuning a KPICache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to be computed, including stale ones.
+        stale (int): Misses caused by a newer data version.
+        evictions (int): Entries dropped to respect the limits.
+        entries (int): Entries currently cached.
+        bytes (int): Estimated memory held by the cached values.
+    """
+
+    hits: int
+    misses: int
+    stale: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def estimate_size(value):
+    """
+    Roughly estimates the memory held by a cached value, following tuples,
+    lists and dictionaries (including named tuples such as KPIResult).
+
+    Args:
+        value: The value to measure.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(
+            estimate_size(key) + estimate_size(item)
+            for key, item in value.items()
+        )
+    return size
+
+
+class KPICache:
+    """
+    Thread-safe LRU cache for KPI and report results.
+
+    Every entry stores the data version it was computed at (see
+    src/models/versions.py). A lookup passes the current version of the
+    data the entry depends on, and an entry computed at an older version is
+    dropped instead of returned, so cached values are invalidated exactly
+    when their underlying data changes. Entries are evicted least recently
+    used first once either the entry limit or the memory cap is exceeded.
+    """
+
+    def __init__(
+        self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES
+    ):
+        """
+        Args:
+            max_entries (int): Maximum number of cached results.
+            max_bytes (int): Maximum estimated memory of the cached results.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (version, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._stale = self._evictions = 0
+
+    def get_or_compute(self, key, version, compute):
+        """
+        Returns the cached value for a key if it was computed at `version`,
+        otherwise computes, caches and returns it.
+
+        Args:
+            key (hashable): Identifies the result, e.g. ("kpis", rep_id).
+            version (int): Current version of the data the result depends on.
+            compute (callable): Produces the value on a miss.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                self._stale += 1
+                self._remove(key)
+            self._misses += 1
+
+        value = compute()
+        self.put(key, version, value)
+        return value
+
+    def put(self, key, version, value):
+        """
+        Caches a value computed at `version`, evicting least recently used
+        entries as needed. Values larger than the memory cap are not cached.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, value, size)
+            self._bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Drops every cached entry; the counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns:
+            CacheStats: The current counters.
+        """
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._stale,
+                self._evictions,
+                len(self._entries),
+                self._bytes,
+            )
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[2]
@@ -1,5 +1,329 @@
-from .sales_rep_data import SalesRepData
+import json
+from array import array
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+from . import rollups
+from .kpi_cache import KPICache
+from .storage import TEXT_STORAGE
 from .user_manager import UserManager
+from .versions import current_version, range_version, rep_version
+
+# SQL expressions for every KPI a team comparison can be sorted by, written
+# against the columns of the sales_rep_totals rollup (aliased as t)
+KPI_EXPRESSIONS = {
+    "scheduled_calls": "COALESCE(t.scheduled_calls, 0)",
+    "live_calls": "COALESCE(t.live_calls, 0)",
+    "offers": "COALESCE(t.offers, 0)",
+    "closed": "COALESCE(t.closed, 0)",
+    "cash_collected": "COALESCE(t.cash_collected, 0.0)",
+    "contract_value": "COALESCE(t.contract_value, 0.0)",
+    "show_percentage": "CASE WHEN t.scheduled_calls "
+    "THEN t.live_calls * 1.0 / t.scheduled_calls * 100 ELSE 0 END",
+    "offer_percentage": "CASE WHEN t.live_calls "
+    "THEN t.offers * 1.0 / t.live_calls * 100 ELSE 0 END",
+    "close_percentage": "CASE WHEN t.offers "
+    "THEN t.closed * 1.0 / t.offers * 100 ELSE 0 END",
+    "cash_per_call": "CASE WHEN t.live_calls "
+    "THEN t.cash_collected * 1.0 / t.live_calls ELSE 0 END",
+    "revenue_per_call": "CASE WHEN t.live_calls "
+    "THEN t.contract_value * 1.0 / t.live_calls ELSE 0 END",
+}
+
+_KPI_COLUMNS = ", ".join(
+    f"{expression} AS {kpi}" for kpi, expression in KPI_EXPRESSIONS.items()
+)
+
+
+@lru_cache(maxsize=None)
+def team_kpis_query(storage=TEXT_STORAGE):
+    """
+    Builds the query for every sales rep's lifetime totals and derived KPIs
+    in one pass; the ORDER BY and LIMIT clauses are appended by
+    KPI.team_kpis().
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        str: A query without parameters.
+    """
+    return f"""
+    SELECT u.id, u.name, {_KPI_COLUMNS}
+    FROM users u
+    LEFT JOIN {rollups.totals_source(storage)} t ON t.rep_id = u.id
+    WHERE u.role = 'sales_rep'
+"""
+
+
+@lru_cache(maxsize=None)
+def rep_kpis_query(storage=TEXT_STORAGE):
+    """
+    Builds the query for the same columns for an explicit list of rep IDs,
+    passed as one JSON array parameter and returned in list order.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        str: A query taking the JSON array of rep IDs.
+    """
+    return f"""
+    SELECT r.value, u.name, {_KPI_COLUMNS}
+    FROM json_each(?) r
+    LEFT JOIN users u ON u.id = r.value
+    LEFT JOIN {rollups.totals_source(storage)} t ON t.rep_id = r.value
+    ORDER BY r.key
+"""
+
+
+# Decimal places to which leaderboard values are compared when ranking
+RANK_PRECISION = 6
+
+
+@lru_cache(maxsize=None)
+def leaderboard_query(metric, storage=TEXT_STORAGE, ranged=False, bottom=False):
+    """
+    Builds the query behind KPI.leaderboard(): every sales rep's value of one
+    metric, dense-ranked by a window function (1 is the highest value, tied
+    reps share a rank), cut to the first rows by LIMIT. Values are compared
+    to RANK_PRECISION decimal places, so money sums that differ only by
+    floating-point error still tie.
+
+    Args:
+        metric (str): A key of KPI_EXPRESSIONS.
+        storage (TextStorage): The database's storage format.
+        ranged (bool): Rank totals over a date range, taking the parameters
+            of rollups.range_totals_params() first, instead of lifetime
+            totals.
+        bottom (bool): Return the lowest ranks first instead of the highest.
+
+    Returns:
+        str: A query ending with a LIMIT parameter and returning rank,
+             rep_id, name and value.
+    """
+    if ranged:
+        source = f"({rollups.range_totals_query(storage)})"
+    else:
+        source = rollups.totals_source(storage)
+    expression = KPI_EXPRESSIONS[metric]
+    order = "DESC" if bottom else "ASC"
+    return f"""
+    SELECT rank, rep_id, name, value FROM (
+        SELECT
+            DENSE_RANK() OVER (
+                ORDER BY ROUND({expression}, {RANK_PRECISION}) DESC
+            ) AS rank,
+            u.id AS rep_id,
+            u.name,
+            {expression} AS value
+        FROM users u
+        LEFT JOIN {source} t ON t.rep_id = u.id
+        WHERE u.role = 'sales_rep'
+    )
+    ORDER BY rank {order}, rep_id
+    LIMIT ?
+"""
+
+
+# Queries for databases in the text storage format
+TEAM_KPIS_QUERY = team_kpis_query(TEXT_STORAGE)
+REP_KPIS_QUERY = rep_kpis_query(TEXT_STORAGE)
+
+# Earliest and latest dates used when a date range is open on one side
+MIN_DATE = "0001-01-01"
+MAX_DATE = "9999-12-31"
+
+# Trailing windows, in days, computed by KPI.rolling_kpis() by default
+ROLLING_WINDOWS = (7, 30, 90)
+
+
+def rolling_kpis_query(windows, filter_reps=False, storage=TEXT_STORAGE):
+    """
+    Builds the query behind KPI.rolling_kpis(): daily totals per rep, then a
+    set of window sums per day for every trailing window, in one pass.
+
+    Each window frame covers the current day and the `window - 1` calendar
+    days before it (a RANGE frame over day numbers, so days without data do
+    not stretch the window).
+
+    Args:
+        windows (sequence): Window lengths in days.
+        filter_reps (bool): Add a JSON array parameter restricting the reps.
+        storage (TextStorage): The database's storage format; dates in the
+            parameters must be encoded with it.
+
+    Returns:
+        str: A query taking (lookback start, start, end[, rep IDs JSON])
+             and returning rep_id, date and six sums per window, ordered by
+             rep and date.
+    """
+    names, sums = [], []
+    for window in windows:
+        for column in rollups.METRIC_COLUMNS:
+            expression = f"SUM({column}) OVER w{window}"
+            if column in rollups.MONEY_COLUMNS:
+                expression = storage.money_sql(expression)
+            names.append(f"w{window}_{column}")
+            sums.append(f"{expression} AS {names[-1]}")
+    names, sums = ", ".join(names), ", ".join(sums)
+    frames = ",\n".join(
+        f"w{window} AS (PARTITION BY rep_id ORDER BY day "
+        f"RANGE BETWEEN {window - 1} PRECEDING AND CURRENT ROW)"
+        for window in windows
+    )
+    rep_filter = (
+        "AND rep_id IN (SELECT value FROM json_each(?4))" if filter_reps else ""
+    )
+    daily_sums = ", ".join(
+        f"SUM({column}) AS {column}" for column in rollups.METRIC_COLUMNS
+    )
+    return f"""
+        WITH daily AS (
+            SELECT rep_id, date, {storage.day_sql} AS day, {daily_sums}
+            FROM sales_rep_data
+            WHERE date BETWEEN ?1 AND ?3 {rep_filter}
+            GROUP BY rep_id, date
+        )
+        SELECT rep_id, {storage.date_sql("date")}, {names} FROM (
+            SELECT rep_id, date, {sums}
+            FROM daily
+            WINDOW {frames}
+        )
+        WHERE date >= ?2
+        ORDER BY rep_id, date
+    """
+
+
+class KPIResult(NamedTuple):
+    """
+    A sales rep's metric totals together with the KPIs derived from them.
+    """
+
+    rep_id: str
+    name: str
+    scheduled_calls: int
+    live_calls: int
+    offers: int
+    closed: int
+    cash_collected: float
+    contract_value: float
+    show_percentage: float
+    offer_percentage: float
+    close_percentage: float
+    cash_per_call: float
+    revenue_per_call: float
+
+    @classmethod
+    def from_totals(
+        cls,
+        rep_id,
+        name,
+        scheduled_calls,
+        live_calls,
+        offers,
+        closed,
+        cash_collected,
+        contract_value,
+    ):
+        """
+        Builds a result from raw metric totals, deriving the KPIs.
+
+        Args:
+            rep_id (str): The ID of the sales rep.
+            name (str): The name of the sales rep (may be None).
+            scheduled_calls, live_calls, offers, closed (int): Metric totals.
+            cash_collected, contract_value (float): Money totals.
+
+        Returns:
+            KPIResult: The totals and derived KPIs.
+        """
+        # Calculate KPIs with conditional handling to avoid division by zero
+        show_percentage = (
+            (live_calls / scheduled_calls * 100) if scheduled_calls else 0
+        )
+        offer_percentage = (offers / live_calls * 100) if live_calls else 0
+        close_percentage = (closed / offers * 100) if offers else 0
+        cash_per_call = (cash_collected / live_calls) if live_calls else 0
+        revenue_per_call = (contract_value / live_calls) if live_calls else 0
+        return cls(
+            rep_id,
+            name,
+            scheduled_calls,
+            live_calls,
+            offers,
+            closed,
+            cash_collected,
+            contract_value,
+            show_percentage,
+            offer_percentage,
+            close_percentage,
+            cash_per_call,
+            revenue_per_call,
+        )
+
+
+class LeaderboardEntry(NamedTuple):
+    """
+    A sales rep's place on a leaderboard. Ranks are dense: reps with equal
+    values share a rank and the next value gets the next rank.
+    """
+
+    rank: int
+    rep_id: str
+    name: str
+    value: float
+
+
+class KPITrend(NamedTuple):
+    """
+    One rep's KPIs over a trailing window, as a column per field: entry i
+    of every column belongs to dates[i]. Only days on which the rep
+    reported metrics have a point.
+    """
+
+    rep_id: str
+    window: int
+    dates: list
+    scheduled_calls: array
+    live_calls: array
+    offers: array
+    closed: array
+    cash_collected: array
+    contract_value: array
+    show_percentage: array
+    offer_percentage: array
+    close_percentage: array
+    cash_per_call: array
+    revenue_per_call: array
+
+    @classmethod
+    def empty(cls, rep_id, window):
+        """
+        Creates a series without points, ready to be appended to.
+        """
+        counts = [array("q") for _ in range(4)]
+        floats = [array("d") for _ in range(7)]
+        return cls(rep_id, window, [], *counts, *floats)
+
+    def append(self, day, totals):
+        """
+        Adds the point for one day from its six window totals.
+        """
+        result = KPIResult.from_totals(self.rep_id, None, *totals)
+        self.dates.append(day)
+        for column, value in zip(self[3:], result[2:]):
+            column.append(value)
+
+    def as_dict(self):
+        """
+        Returns the series as plain lists, e.g. for JSON encoding.
+        """
+        return {
+            field: list(value) if isinstance(value, (array, list)) else value
+            for field, value in zip(self._fields, self)
+        }
 
 
 class KPI:
@@ -8,7 +332,7 @@ class KPI:
     reps.
     """
 
-    def __init__(self, db, user_manager: UserManager):
+    def __init__(self, db, user_manager: UserManager, cache: KPICache = None):
         """
         Initializes KPI with database and user manager instances.
 
@@ -16,9 +340,214 @@ class KPI:
             db (Database): Instance of the Database class for data operations.
             user_manager (UserManager): UserManager instance to retrieve sales
             reps.
+            cache (KPICache, optional): Cache for per-rep and team results,
+            validated against the data versions.
         """
         self.db = db
         self.user_manager = user_manager
+        self.cache = cache
+
+    def compute_kpis(self, rep_id, name=None):
+        """
+        Computes the lifetime KPIs of a specific sales rep without printing.
+
+        Args:
+            rep_id (str): The ID of the sales rep.
+            name (str, optional): The name of the sales rep.
+
+        Returns:
+            KPIResult: The rep's totals and KPIs (all zero if the rep has no
+                       data).
+        """
+
+        def compute():
+            # Fetch the rep's lifetime totals from the rollup table
+            data = self.db.fetch_one(
+                rollups.rep_totals_query(self.db.storage), (rep_id,)
+            )
+            return KPIResult.from_totals(
+                rep_id, name, *(data or (0, 0, 0, 0, 0.0, 0.0))
+            )
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(
+            ("kpis", rep_id, name), rep_version(self.db, rep_id), compute
+        )
+
+    def compute_many(self, rep_ids):
+        """
+        Computes the lifetime KPIs of several sales reps in one query.
+
+        Args:
+            rep_ids (iterable): IDs of the sales reps.
+
+        Returns:
+            list: One KPIResult per rep ID, in the given order. Unknown reps
+                  and reps without data get zero totals.
+        """
+        rows = self.db.fetch_all(
+            rep_kpis_query(self.db.storage), (json.dumps(list(rep_ids)),)
+        )
+        return [KPIResult._make(row) for row in rows]
+
+    def iter_kpis(self, rep_ids=None, start_date=None, end_date=None):
+        """
+        Streams KPI results for many reps, over their whole history or over a
+        date range, without loading the full result into memory.
+
+        Args:
+            rep_ids (iterable, optional): Only include these reps.
+            start_date (str, optional): First date of the range (YYYY-MM-DD).
+            end_date (str, optional): Last date of the range (YYYY-MM-DD).
+
+        Yields:
+            KPIResult: One result per rep. Without a date range every sales
+                       rep is included in the order they were added; with a
+                       range only reps with data in it are, ordered by ID.
+        """
+        storage = self.db.storage
+        if start_date is None and end_date is None:
+            query = team_kpis_query(storage)
+            params = ()
+            if rep_ids is not None:
+                query += " AND u.id IN (SELECT value FROM json_each(?))"
+                params = (json.dumps(list(rep_ids)),)
+            order = "u.rowid"
+        else:
+            # The rep filter goes inside the range query, where it turns
+            # each part of the range into index lookups per rep
+            filter_reps = rep_ids is not None
+            query = f"""
+                SELECT t.rep_id, u.name, {_KPI_COLUMNS}
+                FROM ({rollups.range_totals_query(storage, filter_reps)}) t
+                LEFT JOIN users u ON u.id = t.rep_id
+            """
+            params = rollups.range_totals_params(
+                start_date or MIN_DATE, end_date or MAX_DATE, storage, rep_ids
+            )
+            order = "t.rep_id"
+        query += f" ORDER BY {order}"
+
+        for row in self.db.iter_query(query, params):
+            yield KPIResult._make(row)
+
+    def rolling_kpis(
+        self,
+        windows=ROLLING_WINDOWS,
+        rep_ids=None,
+        start_date=None,
+        end_date=None,
+    ):
+        """
+        Computes trailing-window KPIs (e.g. 7/30/90 days) for every day of a
+        date range, for all windows and all reps in a single query.
+
+        Args:
+            windows (iterable): Window lengths in days.
+            rep_ids (iterable, optional): Only include these reps.
+            start_date (str, optional): First day to report (YYYY-MM-DD).
+                Data from before it still counts towards its windows.
+            end_date (str, optional): Last day to report (YYYY-MM-DD).
+
+        Returns:
+            dict: {rep_id: {window: KPITrend}} for every rep with data in
+                  the range, ordered by rep ID and window length.
+
+        Raises:
+            ValueError: If a window is not a positive whole number of days.
+        """
+        windows = tuple(sorted(set(windows)))
+        if not windows or any(
+            not isinstance(window, int) or window < 1 for window in windows
+        ):
+            raise ValueError("Windows must be positive numbers of days")
+        rep_ids = tuple(rep_ids) if rep_ids is not None else None
+        start_date = start_date or MIN_DATE
+        end_date = end_date or MAX_DATE
+        lookback = _days_before(start_date, windows[-1] - 1)
+
+        def compute():
+            storage = self.db.storage
+            params = tuple(
+                map(storage.encode_date, (lookback, start_date, end_date))
+            )
+            if rep_ids is not None:
+                params += (json.dumps(list(rep_ids)),)
+            query = rolling_kpis_query(windows, rep_ids is not None, storage)
+            width = len(rollups.METRIC_COLUMNS)
+            trends = {}
+            for row in self.db.iter_query(query, params):
+                series = trends.get(row[0])
+                if series is None:
+                    series = trends[row[0]] = {
+                        window: KPITrend.empty(row[0], window)
+                        for window in windows
+                    }
+                for i, window in enumerate(windows):
+                    offset = 2 + i * width
+                    series[window].append(row[1], row[offset : offset + width])
+            return trends
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(
+            ("rolling_kpis", windows, rep_ids, start_date, end_date),
+            range_version(self.db, lookback, end_date),
+            compute,
+        )
+
+    def leaderboard(
+        self, metric, limit=10, bottom=False, start_date=None, end_date=None
+    ):
+        """
+        Ranks every sales rep by a raw metric or derived KPI, over their whole
+        history or over a date range. Ranking and selection run in SQL, so
+        only the returned entries reach Python.
+
+        Args:
+            metric (str): A key of KPI_EXPRESSIONS, e.g. "closed" or
+                "close_percentage".
+            limit (int, optional): Return only this many entries; all reps
+                when None.
+            bottom (bool): Return the lowest-ranked reps first.
+            start_date (str, optional): First date of the range (YYYY-MM-DD).
+            end_date (str, optional): Last date of the range (YYYY-MM-DD).
+
+        Returns:
+            list: LeaderboardEntry items, best first (worst first with
+                  bottom). Reps without data in the range have a value of 0.
+
+        Raises:
+            ValueError: If the metric is unknown or limit is below 1.
+        """
+        if metric not in KPI_EXPRESSIONS:
+            raise ValueError(f"Unknown metric to rank by: {metric}")
+        if limit is not None and limit < 1:
+            raise ValueError("Leaderboard limit must be at least 1")
+
+        def compute():
+            storage = self.db.storage
+            ranged = start_date is not None or end_date is not None
+            params = ()
+            if ranged:
+                params = rollups.range_totals_params(
+                    start_date or MIN_DATE, end_date or MAX_DATE, storage
+                )
+            # A negative LIMIT means no limit in SQLite
+            params += (-1 if limit is None else limit,)
+            rows = self.db.fetch_all(
+                leaderboard_query(metric, storage, ranged, bottom), params
+            )
+            return [LeaderboardEntry._make(row) for row in rows]
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(
+            ("leaderboard", metric, limit, bottom, start_date, end_date),
+            current_version(self.db),
+            compute,
+        )
 
     def calculate_kpis(self, rep_id, name):
         """
@@ -28,74 +557,75 @@ class KPI:
             rep_id (int): The ID of the sales rep.
             name (str): The name of the sales rep.
 
-        Outputs:
-            Displays KPI summary including raw values, show percentage, offer
-            percentage, close percentage, cash per call, and revenue per call in
-            the specified format.
+        Returns:
+            KPIResult: The rep's raw totals together with show percentage,
+            offer percentage, close percentage, cash per call, and revenue per
+            call, ready to be displayed by the view.
         """
-        # Fetch sales rep data from sales_rep_data table
-        data = self.db.fetch_all(
-            """
-            SELECT SUM(scheduled_calls), SUM(live_calls), SUM(offers), 
-                   SUM(closed), SUM(cash_collected), SUM(contract_value)
-            FROM sales_rep_data
-            WHERE rep_id = ?
-            """,
-            (rep_id,),
-        )[0]
+        return self.compute_kpis(rep_id, name)
 
-        # Unpack data
-        (
-            scheduled_calls,
-            live_calls,
-            offers,
-            closed,
-            cash_collected,
-            contract_value,
-        ) = data
+    def team_kpis(self, sort_by=None, descending=True, limit=None):
+        """
+        Retrieves every sales rep's metric totals and derived KPIs with a
+        single query over the users table and the lifetime rollup.
 
-        # Calculate KPIs with conditional handling to avoid division by zero
-        show_percentage = (
-            (live_calls / scheduled_calls * 100) if scheduled_calls else 0
-        )
-        offer_percentage = (offers / live_calls * 100) if live_calls else 0
-        close_percentage = (closed / offers * 100) if offers else 0
-        cash_per_call = (cash_collected / live_calls) if live_calls else 0
-        revenue_per_call = (contract_value / live_calls) if live_calls else 0
+        Args:
+            sort_by (str, optional): A key of KPI_EXPRESSIONS to sort by.
+                Reps are listed in the order they were added when omitted.
+            descending (bool): Sort from highest to lowest value.
+            limit (int, optional): Return only the first `limit` reps.
 
-        # Output KPI summary for the given sales rep
-        print(f"\nKPI Summary for Employee {rep_id}:")
-        print(
-            f" - Show Percentage: {show_percentage:.2f}% ({scheduled_calls} "
-            f"Scheduled Calls, {live_calls} Live Calls)"
-        )
-        print(
-            f" - Offer Percentage: {offer_percentage:.2f}% ({live_calls} Live Calls, "
-            f"{offers} Offers)"
-        )
-        print(
-            f" - Close Percentage: {close_percentage:.2f}% ({offers} Offers, {closed} "
-            f"Closed Deals)"
+        Returns:
+            list: A KPIResult per sales rep.
+
+        Raises:
+            ValueError: If sort_by is not a known KPI.
+        """
+        if self.cache is None:
+            return self._team_kpis(sort_by, descending, limit)
+        return self.cache.get_or_compute(
+            ("team_kpis", sort_by, descending, limit),
+            current_version(self.db),
+            lambda: self._team_kpis(sort_by, descending, limit),
         )
-        print(f" - Cash Collected: ${cash_collected:.2f}")
-        print(f" - Contract Value: ${contract_value:.2f}")
 
-    def compare_all_kpis(self):
+    def _team_kpis(self, sort_by, descending, limit):
+        query = team_kpis_query(self.db.storage)
+        params = ()
+        if sort_by is None:
+            query += " ORDER BY u.rowid"
+        elif sort_by in KPI_EXPRESSIONS:
+            direction = "DESC" if descending else "ASC"
+            query += f" ORDER BY {sort_by} {direction}, u.id"
+        else:
+            raise ValueError(f"Unknown KPI to sort by: {sort_by}")
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        rows = self.db.fetch_all(query, params)
+        return [KPIResult._make(row) for row in rows]
+
+    def compare_all_kpis(self, sort_by=None, limit=None):
         """
-        Compares KPIs across all sales reps by retrieving data through
-        UserManager.
+        Compares KPIs across all sales reps, fetched in a single query.
 
-        Outputs:
-            Displays a KPI summary (with raw values) for each sales rep for
-            comparison.
+        Args:
+            sort_by (str, optional): A key of KPI_EXPRESSIONS to rank reps by,
+                highest first.
+            limit (int, optional): Return only the top `limit` reps.
+
+        Returns:
+            list: A KPIResult (with raw values) per sales rep, for the view to
+            display side by side.
         """
-        # Get all sales reps from UserManager
-        reps = [
-            user
-            for user in self.user_manager.get_all_users()
-            if user["role"] == "sales_rep"
-        ]
+        return self.team_kpis(sort_by=sort_by, limit=limit)
+
 
-        # Compare KPIs for each sales rep
-        for rep in reps:
-            self.calculate_kpis(rep["id"], rep["name"])
+def _days_before(day, days):
+    """
+    Returns the ISO date `days` days before `day`, clamped to MIN_DATE.
+    """
+    try:
+        return (date.fromisoformat(day) - timedelta(days=days)).isoformat()
+    except OverflowError:
+        return MIN_DATE
@@ -0,0 +1,213 @@
+# src/models/migrations.py
+
+from datetime import datetime
+from typing import NamedTuple
+
+from . import rollups, versions
+from .storage import COMPACT_STORAGE, JULIAN_DAY_OFFSET
+
+
+class Migration(NamedTuple):
+    """
+    A single versioned schema change.
+
+    Attributes:
+        version (int): Unique, increasing schema version number.
+        description (str): Short human-readable summary of the change.
+        statements (tuple): SQL statements applied in order.
+    """
+
+    version: int
+    description: str
+    statements: tuple
+
+
+# Ordered list of schema migrations. Append new entries with the next version
+# number; never edit or reorder a migration that has already shipped.
+MIGRATIONS = [
+    Migration(
+        1,
+        "Covering index on sales_rep_data (rep_id, date)",
+        (
+            """
+            CREATE INDEX IF NOT EXISTS idx_sales_rep_data_rep_date
+            ON sales_rep_data (
+                rep_id, date, scheduled_calls, live_calls, offers, closed,
+                cash_collected, contract_value
+            )
+            """,
+        ),
+    ),
+    Migration(
+        2,
+        "Covering index on sales_rep_data (date, rep_id)",
+        (
+            """
+            CREATE INDEX IF NOT EXISTS idx_sales_rep_data_date_rep
+            ON sales_rep_data (
+                date, rep_id, scheduled_calls, live_calls, offers, closed,
+                cash_collected, contract_value
+            )
+            """,
+        ),
+    ),
+    Migration(
+        3,
+        "Monthly and lifetime per-rep rollup tables",
+        rollups.CREATE_STATEMENTS + rollups.REBUILD_STATEMENTS,
+    ),
+    Migration(
+        4,
+        "Data version table for cache validation",
+        versions.CREATE_STATEMENTS,
+    ),
+    Migration(
+        5,
+        "Per-rep cumulative totals by date for range queries",
+        rollups.CUMULATIVE_CREATE_STATEMENTS
+        + rollups.CUMULATIVE_REBUILD_STATEMENTS,
+    ),
+    Migration(
+        6,
+        "Drop the monthly rollup table, replaced by the cumulative table",
+        (
+            "DROP INDEX IF EXISTS idx_sales_rep_monthly_month",
+            "DROP TABLE IF EXISTS sales_rep_monthly",
+        ),
+    ),
+]
+
+
+def current_version(db):
+    """
+    Returns the schema version recorded in the database.
+
+    Args:
+        db (Database): The database instance.
+
+    Returns:
+        int: The highest applied migration version, or 0 if none.
+    """
+    result = db.fetch_all(
+        "SELECT COALESCE(MAX(version), 0) FROM schema_version"
+    )
+    return result[0][0]
+
+
+def run_migrations(db, migrations=None):
+    """
+    Applies every migration newer than the database's schema version. Each
+    migration runs in its own transaction together with its schema_version
+    entry, so a failed migration leaves the schema at the previous version.
+
+    Args:
+        db (Database): The database instance.
+        migrations (list, optional): Migrations to apply. Defaults to
+            MIGRATIONS.
+
+    Returns:
+        list: The versions that were applied, in order.
+    """
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,  -- Applied migration version
+            description TEXT,             -- Summary of the migration
+            applied_at TEXT               -- When the migration ran (ISO 8601)
+        )
+        """)
+
+    applied = []
+    version = current_version(db)
+    for migration in sorted(migrations or MIGRATIONS):
+        if migration.version <= version:
+            continue
+        with db.transaction():
+            for statement in migration.statements:
+                db.execute_query(statement)
+            db.execute_query(
+                """
+                INSERT INTO schema_version (version, description, applied_at)
+                VALUES (?, ?, ?)
+                """,
+                (
+                    migration.version,
+                    migration.description,
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+        applied.append(migration.version)
+    return applied
+
+
+def convert_to_compact(db, vacuum=False):
+    """
+    Converts a text-format sales_rep_data table to the compact format
+    (integer day numbers and integer cents, see src/models/storage.py).
+
+    The table is copied into a new one with the same row IDs, its covering
+    indexes are recreated and the rollups are rebuilt in cents, all in one
+    transaction. Afterwards every model using the database reads and writes
+    the compact format; their public API is unchanged.
+
+    Args:
+        db (Database): The database instance.
+        vacuum (bool): Run VACUUM afterwards so the database file shrinks
+            by the space freed.
+
+    Raises:
+        ValueError: If a row's date is not a valid YYYY-MM-DD date.
+    """
+    with db.transaction():
+        invalid = db.fetch_one(
+            "SELECT COUNT(*) FROM sales_rep_data WHERE julianday(date) IS NULL"
+        )[0]
+        if invalid:
+            raise ValueError(
+                f"{invalid} rows have dates that are not YYYY-MM-DD; "
+                "fix them before converting"
+            )
+
+        db.execute_query(
+            "ALTER TABLE sales_rep_data RENAME TO sales_rep_data_text"
+        )
+        db.setup_tables(COMPACT_STORAGE)
+        db.execute_query(f"""
+            INSERT INTO sales_rep_data (
+                id, rep_id, date, scheduled_calls, live_calls, offers,
+                closed, cash_collected, contract_value
+            )
+            SELECT
+                id, rep_id,
+                CAST(julianday(date) - {JULIAN_DAY_OFFSET} AS INTEGER),
+                scheduled_calls, live_calls, offers, closed,
+                CAST(ROUND(cash_collected * 100) AS INTEGER),
+                CAST(ROUND(contract_value * 100) AS INTEGER)
+            FROM sales_rep_data_text
+            """)
+        # Dropping the old table drops its indexes, whose names are reused
+        db.execute_query("DROP TABLE sales_rep_data_text")
+        for migration in MIGRATIONS:
+            if migration.version in (1, 2):
+                for statement in migration.statements:
+                    db.execute_query(statement)
+        for statement in rollups.TOTALS_REBUILD_STATEMENTS:
+            db.execute_query(statement)
+        for statement in rollups.CUMULATIVE_REBUILD_STATEMENTS:
+            db.execute_query(statement)
+        versions.bump_all_versions(db)
+    db.storage = COMPACT_STORAGE
+
+    if vacuum:
+        db.conn.execute("VACUUM")
+
+
+if __name__ == "__main__":
+    from .database import Database
+
+    db = Database()
+    if db.storage is COMPACT_STORAGE:
+        print("Database already uses the compact storage format.")
+    else:
+        convert_to_compact(db, vacuum=True)
+        print("Database converted to the compact storage format.")
+    db.close()
@@ -0,0 +1,225 @@
+# src/models/quantiles.py
+
+import math
+import random
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+# Default accuracy parameter of KLLSketch (see rank_error())
+DEFAULT_K = 200
+
+# Smallest k accepted; below it the error bound no longer holds
+MIN_K = 8
+
+# Ratio between the capacities of neighbouring levels
+CAPACITY_RATIO = 2 / 3
+
+
+def rank_error(k=DEFAULT_K):
+    """
+    Returns the normalized rank error of a KLLSketch with accuracy k: with
+    99% probability, the true rank of the value returned for quantile q is
+    within q +/- rank_error(k), e.g. about 0.0166 (1.7% of the count) for
+    k=200. This is the empirical bound published for the KLL sketch by
+    Apache DataSketches; it does not depend on the number of values.
+
+    Args:
+        k (int): The sketch's accuracy parameter.
+
+    Returns:
+        float: The error as a fraction of the number of values.
+    """
+    return 2.446 / k**0.9433
+
+
+class KLLSketch:
+    """
+    Streaming quantile estimator (Karnin, Lang and Liberty, "Optimal
+    Quantile Approximation in Streams", 2016) that keeps O(k) values however
+    many it has seen; in practice up to about k, e.g. 100 to 200 values for
+    the default k=200.
+
+    Values are buffered in levels; a value at level h stands for 2**h
+    original values. When a level is full it is sorted and every other value,
+    starting at a random offset, moves up a level. Sketches built from
+    separate streams (e.g. one per worker) can be merged, and the result has
+    the same error bound as a sketch fed with both streams. The minimum,
+    maximum and count are exact.
+
+    Example:
+        sketch = KLLSketch()
+        sketch.update(values)
+        median = sketch.quantile(0.5)
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        """
+        Args:
+            k (int): Accuracy parameter; the rank error shrinks roughly in
+                proportion to 1/k and memory grows with k (see rank_error()).
+            seed (int, optional): Seed for the compaction coin flips, for
+                reproducible estimates.
+
+        Raises:
+            ValueError: If k is below MIN_K.
+        """
+        if k < MIN_K:
+            raise ValueError(f"k must be at least {MIN_K}")
+        self.k = k
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._levels = [[]]
+        self._capacities = [k]
+        self._random = random.Random(seed)
+
+    @property
+    def size(self):
+        """
+        int: Number of values currently retained.
+        """
+        return sum(len(items) for items in self._levels)
+
+    def add(self, value):
+        """
+        Adds one value.
+        """
+        self.update((value,))
+
+    def update(self, values):
+        """
+        Adds a batch of values. Memory use grows with the batch size until
+        the batch has been compacted, so stream long inputs in batches.
+
+        Args:
+            values (iterable): Numbers; None values are skipped.
+        """
+        values = [value for value in values if value is not None]
+        if not values:
+            return
+        low, high = min(values), max(values)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+        self.count += len(values)
+        self._levels[0].extend(values)
+        self._compress()
+
+    def merge(self, other):
+        """
+        Adds every value summarized by another sketch to this one.
+
+        Args:
+            other (KLLSketch): The sketch to merge; it is left unchanged.
+        """
+        if not other.count:
+            return
+        while len(self._levels) < len(other._levels):
+            self._add_level()
+        for items, other_items in zip(self._levels, other._levels):
+            items.extend(other_items)
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        self.count += other.count
+        self._compress()
+
+    def quantile(self, q):
+        """
+        Estimates the value at quantile q.
+
+        Args:
+            q (float): Quantile between 0 and 1, e.g. 0.5 for the median.
+
+        Returns:
+            float: A retained value whose rank is within rank_error(k) of q
+                   (the exact minimum for 0 and maximum for 1), or None if
+                   the sketch is empty.
+
+        Raises:
+            ValueError: If q is outside [0, 1].
+        """
+        return self.quantiles((q,))[0]
+
+    def quantiles(self, qs):
+        """
+        Estimates the values at several quantiles in one pass.
+
+        Args:
+            qs (iterable): Quantiles between 0 and 1.
+
+        Returns:
+            list: One estimate per quantile, as returned by quantile().
+        """
+        qs = list(qs)
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles must be between 0 and 1")
+        if not self.count:
+            return [None] * len(qs)
+        values, cumulative = self._sorted_view()
+        results = []
+        for q in qs:
+            if q == 0:
+                results.append(self.min)
+            elif q == 1:
+                results.append(self.max)
+            else:
+                # First value whose cumulative weight reaches q of the total
+                index = bisect_left(cumulative, q * self.count)
+                results.append(values[min(index, len(values) - 1)])
+        return results
+
+    def rank(self, value):
+        """
+        Estimates the fraction of values less than or equal to `value`.
+
+        Returns:
+            float: A rank between 0 and 1 within rank_error(k) of the true
+                   one, or 0.0 if the sketch is empty.
+        """
+        if not self.count:
+            return 0.0
+        values, cumulative = self._sorted_view()
+        index = bisect_right(values, value)
+        return cumulative[index - 1] / self.count if index else 0.0
+
+    def _sorted_view(self):
+        """
+        Returns the retained values in ascending order and their cumulative
+        weights.
+        """
+        weighted = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self._levels)
+            for value in items
+        )
+        values = [value for value, _ in weighted]
+        cumulative = list(accumulate(weight for _, weight in weighted))
+        return values, cumulative
+
+    def _add_level(self):
+        self._levels.append([])
+        # The top level holds k values and each level below it two thirds
+        # of the one above, so lower levels shrink as the sketch grows
+        height = len(self._levels)
+        self._capacities = [
+            max(2, math.ceil(self.k * CAPACITY_RATIO ** (height - level - 1)))
+            for level in range(height)
+        ]
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) >= self._capacities[level]:
+                if level + 1 == len(self._levels):
+                    self._add_level()
+                items.sort()
+                # An odd value out stays behind, so weights add up to count
+                kept = [items.pop()] if len(items) % 2 else []
+                offset = self._random.getrandbits(1)
+                self._levels[level + 1].extend(items[offset::2])
+                self._levels[level] = kept
+            level += 1
@@ -0,0 +1,86 @@
+# src/models/query_plans.py
+
+from . import rollups
+from .database import Database
+from .kpi_calculator import (
+    ROLLING_WINDOWS,
+    leaderboard_query,
+    rolling_kpis_query,
+    team_kpis_query,
+)
+from .storage import TEXT_STORAGE
+
+
+def app_queries(storage=TEXT_STORAGE):
+    """
+    Lists the application's main read queries with representative
+    parameters, as issued against a database in the given storage format.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        dict: Query name mapped to a (query, params) pair.
+    """
+    encode = storage.encode_date
+    # Text databases build the report from the rows (see report_stats())
+    if storage is TEXT_STORAGE:
+        report_query = rollups.range_sums_query(storage)
+    else:
+        report_query = rollups.range_totals_query(storage)
+    return {
+        "KPI.calculate_kpis": (rollups.rep_totals_query(storage), ("SR001",)),
+        "KPI.compare_all_kpis": (team_kpis_query(storage), ()),
+        "generate_report": (
+            report_query,
+            rollups.range_totals_params("2024-01-15", "2024-12-20", storage),
+        ),
+        "KPI.leaderboard": (
+            leaderboard_query("close_percentage", storage, ranged=True),
+            rollups.range_totals_params("2024-01-15", "2024-12-20", storage)
+            + (10,),
+        ),
+        "KPI.rolling_kpis": (
+            rolling_kpis_query(ROLLING_WINDOWS, storage=storage),
+            tuple(map(encode, ("2023-10-03", "2024-01-01", "2024-12-31"))),
+        ),
+    }
+
+
+# The main read queries of a database in the text storage format
+APP_QUERIES = app_queries(TEXT_STORAGE)
+
+
+def explain_app_queries(db):
+    """
+    Collects the EXPLAIN QUERY PLAN output for each of the app's main queries.
+
+    Args:
+        db (Database): The database instance.
+
+    Returns:
+        dict: Query name mapped to its list of plan steps.
+    """
+    return {
+        name: db.explain_query_plan(query, params)
+        for name, (query, params) in app_queries(db.storage).items()
+    }
+
+
+def print_query_plans(db):
+    """
+    Prints the query plan of each of the app's main queries.
+
+    Args:
+        db (Database): The database instance.
+    """
+    for name, steps in explain_app_queries(db).items():
+        print(f"{name}:")
+        for step in steps:
+            print(f" - {step}")
+
+
+if __name__ == "__main__":
+    db = Database()
+    print_query_plans(db)
+    db.close()
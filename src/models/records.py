@@ -0,0 +1,104 @@
+# src/models/records.py
+
+
+def record_factory(record_class):
+    """
+    Adapts a record class to sqlite3's row_factory protocol, so query results
+    are built directly as records instead of tuples that are copied later.
+
+    Args:
+        record_class (type): A class whose constructor takes the selected
+            columns positionally.
+
+    Returns:
+        callable: A row factory for Database.fetch_all()/iter_query().
+    """
+
+    def factory(cursor, row):
+        return record_class(*row)
+
+    return factory
+
+
+def dict_factory(cursor, row):
+    """
+    Row factory that builds each row as a dictionary keyed by column name.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor the row was read from.
+        row (tuple): The row's values.
+
+    Returns:
+        dict: The row's values by column name.
+    """
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class UserRecord:
+    """
+    A user without their PIN hash, as listed by UserManager.
+    Supports both attribute and dictionary-style access (user["role"]).
+    """
+
+    __slots__ = ("id", "name", "role")
+
+    def __init__(self, id, name, role):
+        self.id = id
+        self.name = name
+        self.role = role
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __repr__(self):
+        return (
+            f"UserRecord(id={self.id!r}, name={self.name!r}, "
+            f"role={self.role!r})"
+        )
+
+
+class DailyMetrics:
+    """
+    One row of sales_rep_data.
+    """
+
+    __slots__ = (
+        "rep_id",
+        "date",
+        "scheduled_calls",
+        "live_calls",
+        "offers",
+        "closed",
+        "cash_collected",
+        "contract_value",
+    )
+
+    def __init__(
+        self,
+        rep_id,
+        date,
+        scheduled_calls,
+        live_calls,
+        offers,
+        closed,
+        cash_collected,
+        contract_value,
+    ):
+        self.rep_id = rep_id
+        self.date = date
+        self.scheduled_calls = scheduled_calls
+        self.live_calls = live_calls
+        self.offers = offers
+        self.closed = closed
+        self.cash_collected = cash_collected
+        self.contract_value = contract_value
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return "DailyMetrics({})".format(
+            ", ".join(
+                f"{field}={getattr(self, field)!r}" for field in self.__slots__
+            )
+        )
@@ -0,0 +1,290 @@
+# src/models/report_stats.py
+
+from itertools import islice
+from typing import NamedTuple
+
+from .quantiles import DEFAULT_K, KLLSketch, rank_error
+from .rollups import METRIC_COLUMNS
+
+# NumPy is optional and imported on first use, since importing it costs
+# more than a typical report; the pure Python path gives the same results
+np = None
+_numpy_checked = False
+
+# Per-day ratios summarized next to the raw metrics by daily distributions:
+# (name, numerator, denominator, scale); days with a zero denominator are
+# left out of that ratio
+DAILY_RATIOS = (
+    ("show_percentage", "live_calls", "scheduled_calls", 100),
+    ("offer_percentage", "offers", "live_calls", 100),
+    ("close_percentage", "closed", "offers", 100),
+    ("cash_per_call", "cash_collected", "live_calls", 1),
+    ("revenue_per_call", "contract_value", "live_calls", 1),
+)
+
+# Daily rows summarized per batch by compute_daily_distribution()
+DAILY_BATCH_SIZE = 10_000
+
+# Rep count from which the NumPy path is chosen by default; below it the
+# pure Python path is about as fast and avoids the import
+NUMPY_MIN_ROWS = 50_000
+
+
+def _load_numpy():
+    """
+    Imports NumPy on first call.
+
+    Returns:
+        module: The numpy module, or None if it is not installed.
+    """
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - depends on the environment
+            numpy = None
+        np = numpy
+        _numpy_checked = True
+    return np
+
+
+class MetricStats(NamedTuple):
+    """
+    Distribution of one metric across the team's per-rep totals.
+    """
+
+    min: float
+    q1: float
+    median: float
+    q3: float
+    max: float
+    mean: float
+
+
+class ReportStats(NamedTuple):
+    """
+    Everything the team performance report shows, computed from per-rep
+    metric totals.
+
+    Attributes:
+        rep_count (int): Number of reps with data.
+        metrics (dict): Metric name mapped to its MetricStats, in
+            METRIC_COLUMNS order.
+        underperformers (list): (rep_id, metric, value, q1) tuples for every
+            metric where a rep is below the first quartile, ordered by rep
+            then metric.
+        top_performers (dict): Metric name mapped to (rep_id, value) of the
+            first rep with the highest positive value, or (None, 0).
+    """
+
+    rep_count: int
+    metrics: dict
+    underperformers: list
+    top_performers: dict
+
+
+class DailyDistribution(NamedTuple):
+    """
+    Approximate distribution of every metric and ratio across individual
+    rep-days, summarized with bounded memory.
+
+    Attributes:
+        row_count (int): Number of daily rows summarized.
+        metrics (dict): Metric or ratio name mapped to its MetricStats.
+            Minimum, maximum and mean are exact; quartiles and median are
+            estimates whose rank is within rank_error of the true one.
+            Ratios without any defined day are left out.
+        rank_error (float): Error bound of the estimates as a fraction of
+            the number of days (see quantiles.rank_error()).
+    """
+
+    row_count: int
+    metrics: dict
+    rank_error: float
+
+
+def compute_report_stats(rows, use_numpy=None):
+    """
+    Computes min/Q1/median/Q3/max/mean, below-Q1 reps and top performers for
+    all six metrics from per-rep totals.
+
+    Quartiles use the same "exclusive" method as statistics.quantiles(), so
+    results match the original report.
+
+    Args:
+        rows (sequence): Tuples of (rep_id, scheduled_calls, live_calls,
+            offers, closed, cash_collected, contract_value).
+        use_numpy (bool, optional): Force the NumPy (True) or pure Python
+            (False) path. Defaults to NumPy when it is installed and there
+            are at least NUMPY_MIN_ROWS rows.
+
+    Returns:
+        ReportStats: The report statistics.
+
+    Raises:
+        ValueError: If rows is empty, or use_numpy is True and NumPy is not
+            installed.
+    """
+    if not rows:
+        raise ValueError("Cannot compute report statistics without data")
+    if use_numpy is None:
+        use_numpy = len(rows) >= NUMPY_MIN_ROWS and _load_numpy() is not None
+    if use_numpy:
+        if _load_numpy() is None:
+            raise ValueError("NumPy is not installed")
+        return _compute_numpy(rows)
+    return _compute_python(rows)
+
+
+def compute_daily_distribution(rows, k=DEFAULT_K, seed=0):
+    """
+    Streams daily rows into a quantile sketch per metric and ratio, so
+    memory use does not grow with the number of rows.
+
+    Args:
+        rows (iterable): Daily rows ending with the six METRIC_COLUMNS
+            values, e.g. from SalesRepData.iter_daily_metrics().
+        k (int): Accuracy parameter of the sketches.
+        seed (int): Seed of the sketches, so repeated runs over the same
+            rows give the same estimates.
+
+    Returns:
+        DailyDistribution: The distribution, or None if there are no rows.
+    """
+    names = METRIC_COLUMNS + tuple(ratio[0] for ratio in DAILY_RATIOS)
+    sketches = {name: KLLSketch(k, seed) for name in names}
+    sums = dict.fromkeys(names, 0)
+    ratios = [
+        (
+            name,
+            METRIC_COLUMNS.index(numerator),
+            METRIC_COLUMNS.index(denominator),
+            scale,
+        )
+        for name, numerator, denominator, scale in DAILY_RATIOS
+    ]
+    width = len(METRIC_COLUMNS)
+    rows = iter(rows)
+    row_count = 0
+    while True:
+        batch = list(islice(rows, DAILY_BATCH_SIZE))
+        if not batch:
+            break
+        row_count += len(batch)
+        columns = list(zip(*batch))[-width:]
+        batch_values = dict(zip(METRIC_COLUMNS, columns))
+        for name, numerator, denominator, scale in ratios:
+            batch_values[name] = [
+                top * scale / bottom
+                for top, bottom in zip(columns[numerator], columns[denominator])
+                if bottom
+            ]
+        for name, values in batch_values.items():
+            sketches[name].update(values)
+            sums[name] += sum(values)
+
+    if not row_count:
+        return None
+    metrics = {}
+    for name, sketch in sketches.items():
+        if not sketch.count:
+            continue
+        q1, median, q3 = sketch.quantiles((0.25, 0.5, 0.75))
+        metrics[name] = MetricStats(
+            sketch.min, q1, median, q3, sketch.max, sums[name] / sketch.count
+        )
+    return DailyDistribution(row_count, metrics, rank_error(k))
+
+
+def _quartile_positions(n):
+    """
+    Returns the (j, delta) interpolation terms that statistics.quantiles()
+    uses for Q1 and Q3 of n sorted values with the exclusive method.
+    """
+    m = n + 1
+    positions = []
+    for i in (1, 3):
+        j = i * m // 4
+        j = 1 if j < 1 else n - 1 if j > n - 1 else j
+        positions.append((j, i * m - j * 4))
+    return positions
+
+
+def _compute_python(rows):
+    rep_ids = [row[0] for row in rows]
+    columns = list(zip(*rows))[1:]
+    n = len(rows)
+    positions = _quartile_positions(n) if n > 1 else None
+    mid = n // 2
+
+    metrics = {}
+    top_performers = {}
+    for metric, values in zip(METRIC_COLUMNS, columns):
+        data = sorted(values)
+        if positions:
+            q1, q3 = (
+                (data[j - 1] * (4 - delta) + data[j] * delta) / 4
+                for j, delta in positions
+            )
+        else:
+            q1 = q3 = data[0]
+        median = data[mid] if n % 2 else (data[mid - 1] + data[mid]) / 2
+        metrics[metric] = MetricStats(
+            data[0], q1, median, q3, data[-1], sum(values) / n
+        )
+
+        top = data[-1]
+        if top > 0:
+            top_performers[metric] = (rep_ids[values.index(top)], top)
+        else:
+            top_performers[metric] = (None, 0)
+
+    thresholds = [(metric, stats.q1) for metric, stats in metrics.items()]
+    underperformers = [
+        (row[0], metric, value, q1)
+        for row in rows
+        for (metric, q1), value in zip(thresholds, row[1:])
+        if value < q1
+    ]
+    return ReportStats(n, metrics, underperformers, top_performers)
+
+
+def _compute_numpy(rows):
+    rep_ids = [row[0] for row in rows]
+    values = np.array([row[1:] for row in rows], dtype=np.float64)
+    n = len(rows)
+    data = np.sort(values, axis=0)
+    mid = n // 2
+
+    if n > 1:
+        q1, q3 = (
+            (data[j - 1] * (4 - delta) + data[j] * delta) / 4
+            for j, delta in _quartile_positions(n)
+        )
+    else:
+        q1 = q3 = data[0]
+    median = data[mid] if n % 2 else (data[mid - 1] + data[mid]) / 2
+    means = values.sum(axis=0) / n
+    maxima = data[-1]
+    top_index = values.argmax(axis=0)
+
+    metrics = {}
+    top_performers = {}
+    for k, metric in enumerate(METRIC_COLUMNS):
+        metrics[metric] = MetricStats(
+            *(float(column[k]) for column in (data[0], q1, median, q3)),
+            float(maxima[k]),
+            float(means[k]),
+        )
+        if maxima[k] > 0:
+            top_performers[metric] = (rep_ids[top_index[k]], float(maxima[k]))
+        else:
+            top_performers[metric] = (None, 0)
+
+    # np.nonzero walks the mask row by row, i.e. by rep then metric
+    below = values < q1
+    underperformers = [
+        (rep_ids[i], METRIC_COLUMNS[k], float(values[i, k]), float(q1[k]))
+        for i, k in zip(*np.nonzero(below))
+    ]
+    return ReportStats(n, metrics, underperformers, top_performers)
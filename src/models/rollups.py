@@ -0,0 +1,452 @@
+# src/models/rollups.py
+
+import json
+from functools import lru_cache
+
+from .storage import TEXT_STORAGE
+from .versions import bump_all_versions, bump_version
+
+# Summed metric columns shared by sales_rep_data and the rollup tables
+METRIC_COLUMNS = (
+    "scheduled_calls",
+    "live_calls",
+    "offers",
+    "closed",
+    "cash_collected",
+    "contract_value",
+)
+
+_METRIC_LIST = ", ".join(METRIC_COLUMNS)
+_METRIC_SUMS = ", ".join(f"SUM({metric})" for metric in METRIC_COLUMNS)
+_METRIC_UPDATES = ", ".join(
+    f"{metric} = {metric} + excluded.{metric}"
+    for metric in ("row_count",) + METRIC_COLUMNS
+)
+
+TOTALS_UPSERT = f"""
+    INSERT INTO sales_rep_totals (rep_id, row_count, {_METRIC_LIST})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (rep_id) DO UPDATE SET {_METRIC_UPDATES}
+"""
+
+# A metric's total over a range, from the cumulative rows at either end
+_RANGE_DIFFERENCE = "(hi.{0} - COALESCE(lo.{0}, 0))"
+
+# Metric columns holding money, stored in the database's money format
+MONEY_COLUMNS = ("cash_collected", "contract_value")
+
+# A stored money value in whole cents. Compact rows already hold integer
+# cents and text rows REAL dollars; telling them apart by type lets the
+# cumulative statements, including schema migration 5 (which runs before
+# the storage format is known), work in either format.
+_CENTS = (
+    "CASE typeof({0}) WHEN 'integer' THEN {0} "
+    "ELSE CAST(ROUND({0} * 100) AS INTEGER) END"
+)
+
+
+def _cents_to_dollars(column):
+    return f"{column} / 100.0"
+
+
+def _decoded_metrics(storage, template="{}", money_sql=None):
+    """
+    Lists the six metric columns as SQL, each wrapped in `template` (e.g.
+    "SUM({})") and read back as dollars when it holds money, with
+    `money_sql` if given or else the storage format's conversion.
+    """
+    money_sql = money_sql or storage.money_sql
+    columns = []
+    for metric in METRIC_COLUMNS:
+        expression = template.format(metric)
+        if metric in MONEY_COLUMNS:
+            expression = money_sql(expression)
+        columns.append(f"{expression} AS {metric}")
+    return ", ".join(columns)
+
+
+@lru_cache(maxsize=None)
+def rep_totals_query(storage=TEXT_STORAGE):
+    """
+    Builds the query for a single rep's lifetime totals, read from the
+    rollup, with money in dollars whatever the storage format.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        str: A query taking the rep ID.
+    """
+    return f"""
+    SELECT {_decoded_metrics(storage)}
+    FROM sales_rep_totals
+    WHERE rep_id = ?
+"""
+
+
+@lru_cache(maxsize=None)
+def range_totals_query(storage=TEXT_STORAGE, filter_reps=False):
+    """
+    Builds the query for per-rep totals over a date range. Each rep's totals
+    are the difference between two rows of the cumulative table: the last
+    one on or before the end of the range and the last one before its start.
+    That is two index lookups per rep, however long the range. Money is
+    subtracted in whole cents and only then converted to dollars, so the
+    totals are exact to the cent in either storage format.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+        filter_reps (bool): Only look up the reps of a JSON list instead of
+            every rep with data.
+
+    Returns:
+        str: A query taking the parameters from range_totals_params().
+    """
+    if filter_reps:
+        reps = "SELECT DISTINCT value AS rep_id FROM json_each(?3)"
+    else:
+        reps = "SELECT rep_id FROM sales_rep_totals"
+    metrics = _decoded_metrics(storage, _RANGE_DIFFERENCE, _cents_to_dollars)
+    return f"""
+    SELECT r.rep_id, {metrics}
+    FROM ({reps}) r
+    JOIN sales_rep_cumulative hi
+        ON hi.rep_id = r.rep_id AND hi.date = (
+            SELECT MAX(date) FROM sales_rep_cumulative
+            WHERE rep_id = r.rep_id AND date <= ?2
+        )
+    LEFT JOIN sales_rep_cumulative lo
+        ON lo.rep_id = r.rep_id AND lo.date = (
+            SELECT MAX(date) FROM sales_rep_cumulative
+            WHERE rep_id = r.rep_id AND date < ?1
+        )
+    WHERE hi.row_count > COALESCE(lo.row_count, 0)
+    ORDER BY r.rep_id
+"""
+
+
+@lru_cache(maxsize=None)
+def totals_source(storage=TEXT_STORAGE):
+    """
+    Returns SQL usable in a FROM clause in place of sales_rep_totals that
+    reads its money columns as dollars.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        str: The table name, or a subquery for formats that need decoding.
+    """
+    if storage is TEXT_STORAGE:
+        return "sales_rep_totals"
+    return (
+        f"(SELECT rep_id, row_count, {_decoded_metrics(storage)} "
+        "FROM sales_rep_totals)"
+    )
+
+
+@lru_cache(maxsize=None)
+def range_sums_query(storage=TEXT_STORAGE):
+    """
+    Builds the query that sums each rep's rows over a date range directly
+    from sales_rep_data, the way the team report always has. Its cost grows
+    with the range, but on text-format databases its float money sums are
+    what decides how a median or quartile falling on a half cent prints.
+
+    Each rep's rows are read from the (rep_id, date) covering index, which
+    orders them exactly as the (date, rep_id) index does within a rep, so
+    the sums are added in the same order, and come out bit for bit the
+    same, as a plain GROUP BY over the range, without its sort.
+
+    Args:
+        storage (TextStorage): The database's storage format.
+
+    Returns:
+        str: A query taking the encoded first and last dates.
+    """
+    return f"""
+    SELECT r.rep_id, {_decoded_metrics(storage, "SUM(d.{})")}
+    FROM sales_rep_totals r
+    CROSS JOIN sales_rep_data d
+        ON d.rep_id = r.rep_id AND d.date BETWEEN ? AND ?
+    GROUP BY r.rep_id
+    ORDER BY r.rep_id
+"""
+
+
+# Rollup tables, created by schema migration 3. Nothing reads
+# sales_rep_monthly any more; schema migration 6 drops it.
+CREATE_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS sales_rep_monthly (
+        rep_id TEXT,                -- References the user ID of the sales rep
+        month TEXT,                 -- Month of the entries (YYYY-MM)
+        row_count INTEGER,          -- Number of daily rows summed
+        scheduled_calls INTEGER,
+        live_calls INTEGER,
+        offers INTEGER,
+        closed INTEGER,
+        cash_collected REAL,
+        contract_value REAL,
+        PRIMARY KEY (rep_id, month)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sales_rep_totals (
+        rep_id TEXT PRIMARY KEY,    -- References the user ID of the sales rep
+        row_count INTEGER,          -- Number of daily rows summed
+        scheduled_calls INTEGER,
+        live_calls INTEGER,
+        offers INTEGER,
+        closed INTEGER,
+        cash_collected REAL,
+        contract_value REAL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sales_rep_monthly_month "
+    "ON sales_rep_monthly (month, rep_id)",
+)
+
+
+# Fills both rollup tables of a text-format database, as applied by
+# schema migration 3
+REBUILD_STATEMENTS = (
+    "DELETE FROM sales_rep_monthly",
+    "DELETE FROM sales_rep_totals",
+    f"""
+    INSERT INTO sales_rep_monthly (rep_id, month, row_count, {_METRIC_LIST})
+    SELECT rep_id, {TEXT_STORAGE.month_sql}, COUNT(*), {_METRIC_SUMS}
+    FROM sales_rep_data
+    GROUP BY rep_id, {TEXT_STORAGE.month_sql}
+    """,
+    f"""
+    INSERT INTO sales_rep_totals (rep_id, row_count, {_METRIC_LIST})
+    SELECT rep_id, SUM(row_count), {_METRIC_SUMS}
+    FROM sales_rep_monthly
+    GROUP BY rep_id
+    """,
+)
+
+# Recomputes the lifetime rollup from sales_rep_data. Money sums keep the
+# storage format's unit, so these work in either format.
+TOTALS_REBUILD_STATEMENTS = (
+    "DELETE FROM sales_rep_totals",
+    f"""
+    INSERT INTO sales_rep_totals (rep_id, row_count, {_METRIC_LIST})
+    SELECT rep_id, COUNT(*), {_METRIC_SUMS}
+    FROM sales_rep_data
+    GROUP BY rep_id
+    """,
+)
+
+# Running (prefix) sums of each metric over a rep's rows ordered by date,
+# with money in whole cents
+_RUNNING_SUMS = ", ".join(
+    "SUM(COALESCE(SUM({0}), 0)) OVER w AS {1}".format(
+        _CENTS.format(metric) if metric in MONEY_COLUMNS else metric, metric
+    )
+    for metric in METRIC_COLUMNS
+)
+
+# Per-rep cumulative table, created by schema migration 5. A row holds the
+# totals of every row of the rep dated on or before its date, so the totals
+# of any date range are the difference of two rows. Money totals are whole
+# cents in either storage format: differences of float running sums would
+# be off by rounding errors that can change a printed cent.
+CUMULATIVE_CREATE_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS sales_rep_cumulative (
+        rep_id TEXT,                -- References the user ID of the sales rep
+        date,                       -- A date with rows, as stored in them
+        row_count INTEGER,          -- Number of daily rows up to date
+        scheduled_calls INTEGER,    -- Metric totals up to date, inclusive
+        live_calls INTEGER,
+        offers INTEGER,
+        closed INTEGER,
+        cash_collected INTEGER,     -- In cents
+        contract_value INTEGER,     -- In cents
+        PRIMARY KEY (rep_id, date)
+    ) WITHOUT ROWID
+    """,
+)
+
+# Recomputes the cumulative table from sales_rep_data in one pass, in
+# either storage format
+CUMULATIVE_REBUILD_STATEMENTS = (
+    "DELETE FROM sales_rep_cumulative",
+    f"""
+    INSERT INTO sales_rep_cumulative (rep_id, date, row_count, {_METRIC_LIST})
+    SELECT rep_id, date, SUM(COUNT(*)) OVER w, {_RUNNING_SUMS}
+    FROM sales_rep_data
+    GROUP BY rep_id, date
+    WINDOW w AS (PARTITION BY rep_id ORDER BY date)
+    """,
+)
+
+# Drops a rep's cumulative rows from a date onwards (rep_id, date)
+CUMULATIVE_TRUNCATE = (
+    "DELETE FROM sales_rep_cumulative WHERE rep_id = ? AND date >= ?"
+)
+
+# Recomputes the rows dropped by CUMULATIVE_TRUNCATE (rep_id, date): running
+# sums of the rep's rows from that date on, added to the last row before it
+_CUMULATIVE_SUMS = ", ".join(
+    f"COALESCE(b.{column}, 0) + s.{column}"
+    for column in ("row_count",) + METRIC_COLUMNS
+)
+CUMULATIVE_EXTEND = f"""
+    INSERT INTO sales_rep_cumulative (rep_id, date, row_count, {_METRIC_LIST})
+    SELECT s.rep_id, s.date, {_CUMULATIVE_SUMS}
+    FROM (
+        SELECT
+            rep_id, date, SUM(COUNT(*)) OVER w AS row_count, {_RUNNING_SUMS}
+        FROM sales_rep_data
+        WHERE rep_id = ?1 AND date >= ?2
+        GROUP BY rep_id, date
+        WINDOW w AS (ORDER BY date)
+    ) s
+    LEFT JOIN (
+        SELECT * FROM sales_rep_cumulative
+        WHERE rep_id = ?1 AND date < ?2
+        ORDER BY date DESC
+        LIMIT 1
+    ) b ON 1
+"""
+
+
+class RollupAccumulator:
+    """
+    Collects per-rep lifetime deltas for rows as they are written, so the
+    lifetime rollup can be updated with one upsert per rep instead of one
+    per row. The cumulative table is refreshed per rep from the earliest
+    date written, so appending new days only recomputes the new rows.
+
+    Rows are added in their stored form, so money sums keep the storage
+    format's unit.
+    """
+
+    def __init__(self, storage=TEXT_STORAGE):
+        """
+        Args:
+            storage (TextStorage): Format of the rows being added.
+        """
+        self.storage = storage
+        # rep_id -> [row_count, six metric sums]
+        self.totals = {}
+        # Every (stored) date written, for the per-date data versions
+        self.dates = set()
+        # rep_id -> earliest (stored) date written
+        self.first_dates = {}
+
+    def add(self, row):
+        """
+        Adds one sales_rep_data row to the pending deltas.
+
+        Args:
+            row (tuple): A stored row in SalesRepData.COLUMNS order (rep_id,
+                date, followed by the six metric values).
+        """
+        self.dates.add(row[1])
+        first = self.first_dates.get(row[0])
+        if first is None or row[1] < first:
+            self.first_dates[row[0]] = row[1]
+        delta = self.totals.get(row[0])
+        if delta is None:
+            self.totals[row[0]] = [1] + [value or 0 for value in row[2:]]
+        else:
+            delta[0] += 1
+            delta[1] += row[2] or 0
+            delta[2] += row[3] or 0
+            delta[3] += row[4] or 0
+            delta[4] += row[5] or 0
+            delta[5] += row[6] or 0
+            delta[6] += row[7] or 0
+
+    def track(self, rows):
+        """
+        Passes rows through unchanged while adding each one to the deltas.
+
+        Args:
+            rows (iterable): Rows in SalesRepData.COLUMNS order.
+
+        Yields:
+            tuple: Each row of `rows`.
+        """
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def flush(self, db):
+        """
+        Upserts the pending deltas into the lifetime rollup, recomputes the
+        cumulative rows of each rep from its earliest date written, bumps
+        the data versions of the reps and dates written and clears the
+        deltas. Should run in the same transaction as the inserts it
+        describes.
+
+        Args:
+            db (Database): The database instance.
+        """
+        db.execute_many(
+            TOTALS_UPSERT,
+            ((rep_id,) + tuple(delta) for rep_id, delta in self.totals.items()),
+        )
+        first_dates = list(self.first_dates.items())
+        db.execute_many(CUMULATIVE_TRUNCATE, first_dates)
+        db.execute_many(CUMULATIVE_EXTEND, first_dates)
+        if self.totals:
+            bump_version(
+                db, self.totals, map(self.storage.decode_date, self.dates)
+            )
+        self.totals.clear()
+        self.dates.clear()
+        self.first_dates.clear()
+
+
+def rebuild_rollups(db):
+    """
+    Recomputes the lifetime and cumulative rollups from
+    sales_rep_data, e.g. after rows were loaded or edited outside of
+    SalesRepData.
+
+    Args:
+        db (Database): The database instance.
+    """
+    with db.transaction():
+        for statement in TOTALS_REBUILD_STATEMENTS:
+            db.execute_query(statement)
+        for statement in CUMULATIVE_REBUILD_STATEMENTS:
+            db.execute_query(statement)
+        bump_all_versions(db)
+
+
+def range_totals_params(
+    start_date, end_date, storage=TEXT_STORAGE, rep_ids=None
+):
+    """
+    Builds the parameters of range_totals_query() for a date range.
+
+    Args:
+        start_date (str): First date of the range in YYYY-MM-DD format.
+        end_date (str): Last date of the range in YYYY-MM-DD format.
+        storage (TextStorage): The database's storage format.
+        rep_ids (iterable, optional): The reps to sum, for a query built
+            with filter_reps=True.
+
+    Returns:
+        tuple: The encoded first and last dates, followed by the JSON list
+               of reps with rep_ids.
+    """
+    params = (storage.encode_date(start_date), storage.encode_date(end_date))
+    if rep_ids is None:
+        return params
+    return params + (json.dumps(list(rep_ids)),)
+
+
+if __name__ == "__main__":
+    from .database import Database
+
+    db = Database()
+    rebuild_rollups(db)
+    db.close()
+    print("Rollup tables rebuilt.")
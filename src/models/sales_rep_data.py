@@ -1,6 +1,13 @@
 # sales_rep_data.py
+import json
+
 from .database import Database
-from datetime import datetime
+from . import rollups
+from .kpi_cache import KPICache
+from .quantiles import DEFAULT_K
+from .report_stats import compute_daily_distribution, compute_report_stats
+from .storage import TEXT_STORAGE
+from .versions import range_version
 
 
 class SalesRepData:
@@ -9,9 +16,24 @@ class SalesRepData:
     Allows adding data like calls, offers, closed deals, etc.
     """
 
-    def __init__(self, db: Database):
+    # Insert column order shared by single-row and bulk writes
+    COLUMNS = (
+        "rep_id",
+        "date",
+        "scheduled_calls",
+        "live_calls",
+        "offers",
+        "closed",
+        "cash_collected",
+        "contract_value",
+    )
+
+    def __init__(self, db: Database, cache: KPICache = None):
         # Reference to the Database instance
         self.db = db
+        # Optional cache for date-range results, validated against the
+        # per-date data versions
+        self.cache = cache
 
     def add_daily_metrics(
         self,
@@ -25,11 +47,12 @@ class SalesRepData:
         contract_value,
     ):
         """
-        Adds daily metrics for a specific sales rep to the database.
+        Adds daily metrics for a specific sales rep to the database and updates
+        the rep's lifetime and cumulative rollups in the same transaction.
 
         Args:
             rep_id (str): The ID of the sales rep.
-            date (str): The date of the metrics in MM/DD/YYYY format.
+            date (str): The date of the metrics in YYYY-MM-DD format.
             scheduled_calls (int): The number of scheduled calls.
             live_calls (int): The number of live calls.
             offers (int): The number of offers made.
@@ -37,13 +60,8 @@ class SalesRepData:
             cash_collected (float): The amount of cash collected.
             contract_value (float): The value of contracts closed.
         """
-        self.db.execute_query(
-            """
-            INSERT INTO sales_rep_data (
-                rep_id, date, scheduled_calls, live_calls, offers,
-                closed, cash_collected, contract_value
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        storage = self.db.storage
+        row = storage.encode_row(
             (
                 rep_id,
                 date,  # Explicitly use the provided date
@@ -53,5 +71,220 @@ class SalesRepData:
                 closed,
                 cash_collected,
                 contract_value,
+            )
+        )
+        deltas = rollups.RollupAccumulator(storage)
+        deltas.add(row)
+        with self.db.transaction():
+            self.db.execute_query(
+                """
+                INSERT INTO sales_rep_data (
+                    rep_id, date, scheduled_calls, live_calls, offers,
+                    closed, cash_collected, contract_value
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                row,
+            )
+            deltas.flush(self.db)
+
+    def add_many_daily_metrics(self, rows, chunk_size=10_000):
+        """
+        Adds many rows of daily metrics in a single transaction, updating the
+        lifetime and cumulative rollups once per rep at the end.
+
+        Args:
+            rows (iterable): Tuples in COLUMNS order (rep_id, date,
+                scheduled_calls, live_calls, offers, closed, cash_collected,
+                contract_value). May be a generator.
+            chunk_size (int): Number of rows written per executemany() call.
+
+        Returns:
+            int: The number of rows inserted.
+        """
+        storage = self.db.storage
+        deltas = rollups.RollupAccumulator(storage)
+        with self.db.transaction():
+            inserted = self.db.bulk_insert(
+                "sales_rep_data",
+                self.COLUMNS,
+                deltas.track(map(storage.encode_row, rows)),
+                chunk_size=chunk_size,
+            )
+            deltas.flush(self.db)
+        return inserted
+
+    def fetch_totals_by_rep(self, start_date, end_date):
+        """
+        Sums each rep's metrics over an inclusive date range, as the
+        difference of two rows of the cumulative rollup per rep, so the cost
+        does not grow with the length of the range.
+
+        Args:
+            start_date (str): First date of the range in YYYY-MM-DD format.
+            end_date (str): Last date of the range in YYYY-MM-DD format.
+
+        Returns:
+            list: Tuples of (rep_id, scheduled_calls, live_calls, offers,
+                  closed, cash_collected, contract_value), one per rep with
+                  data in the range.
+        """
+        return self._cached(
+            ("range_totals", start_date, end_date),
+            start_date,
+            end_date,
+            lambda: self.db.fetch_all(
+                rollups.range_totals_query(self.db.storage),
+                rollups.range_totals_params(
+                    start_date, end_date, self.db.storage
+                ),
             ),
         )
+
+    def report_stats(self, start_date, end_date):
+        """
+        Computes the team report statistics for an inclusive date range.
+
+        Compact databases take each rep's totals from the cumulative rollup.
+        Text databases sum the range's rows directly, because the report's
+        medians and quartiles are printed from float money sums: exact ones
+        would print a value falling on a half cent differently from before.
+
+        Args:
+            start_date (str): First date of the range in YYYY-MM-DD format.
+            end_date (str): Last date of the range in YYYY-MM-DD format.
+
+        Returns:
+            ReportStats: The statistics, or None if no rep has data in the
+                         range.
+        """
+
+        def compute():
+            storage = self.db.storage
+            if storage is TEXT_STORAGE:
+                data = self.db.fetch_all(
+                    rollups.range_sums_query(storage),
+                    rollups.range_totals_params(start_date, end_date, storage),
+                )
+            else:
+                data = self.fetch_totals_by_rep(start_date, end_date)
+            return compute_report_stats(data) if data else None
+
+        return self._cached(
+            ("report_stats", start_date, end_date),
+            start_date,
+            end_date,
+            compute,
+        )
+
+    def daily_distribution(self, start_date, end_date, k=DEFAULT_K):
+        """
+        Estimates the distribution of every metric and per-day ratio across
+        the individual daily rows of an inclusive date range, streaming the
+        rows into quantile sketches instead of loading them.
+
+        Args:
+            start_date (str): First date of the range in YYYY-MM-DD format.
+            end_date (str): Last date of the range in YYYY-MM-DD format.
+            k (int): Accuracy parameter of the sketches; quartiles are
+                within quantiles.rank_error(k) in rank (about 1.7% of the
+                days for the default of 200).
+
+        Returns:
+            DailyDistribution: The approximate distribution, or None if
+                               there is no data in the range.
+        """
+
+        def compute():
+            return compute_daily_distribution(
+                self.iter_daily_metrics(
+                    start_date=start_date, end_date=end_date
+                ),
+                k,
+            )
+
+        return self._cached(
+            ("daily_distribution", start_date, end_date, k),
+            start_date,
+            end_date,
+            compute,
+        )
+
+    def _cached(self, key, start_date, end_date, compute):
+        """
+        Serves a date-range result from the cache while no row dated inside
+        the range has been written since it was computed.
+        """
+        if self.cache is None:
+            return compute()
+        version = range_version(self.db, start_date, end_date)
+        return self.cache.get_or_compute(key, version, compute)
+
+    def iter_daily_metrics(
+        self,
+        rep_ids=None,
+        start_date=None,
+        end_date=None,
+        batch_size=None,
+        row_factory=None,
+    ):
+        """
+        Streams raw daily rows, optionally filtered by rep and date, reading
+        them from SQLite in fetchmany() batches.
+
+        Args:
+            rep_ids (iterable, optional): Only include these reps.
+            start_date (str, optional): First date to include (YYYY-MM-DD).
+            end_date (str, optional): Last date to include (YYYY-MM-DD).
+            batch_size (int, optional): Rows fetched per fetchmany() call.
+            row_factory (callable, optional): Builds each row, e.g.
+                record_factory(DailyMetrics). Rows are tuples in COLUMNS
+                order when omitted.
+
+        Yields:
+            One row at a time, sorted by rep and date (or by date and rep
+            when filtering by date only).
+        """
+        storage = self.db.storage
+        conditions = []
+        params = ()
+        if rep_ids is not None:
+            conditions.append("d.rep_id IN (SELECT value FROM json_each(?))")
+            params += (json.dumps(list(rep_ids)),)
+        if start_date is not None:
+            conditions.append("d.date >= ?")
+            params += (storage.encode_date(start_date),)
+        if end_date is not None:
+            conditions.append("d.date <= ?")
+            params += (storage.encode_date(end_date),)
+
+        # Follow whichever covering index matches the filters, so rows stream
+        # in index order without a sort step
+        order = "d.rep_id, d.date"
+        if rep_ids is None and conditions:
+            order = "d.date, d.rep_id"
+
+        # Dates and money are returned in the public format whatever the
+        # storage format, so row factories see the same values
+        columns = []
+        for column in self.COLUMNS:
+            expression = "d." + column
+            if column == "date":
+                expression = storage.date_sql(expression)
+            elif column in rollups.MONEY_COLUMNS:
+                expression = storage.money_sql(expression)
+            columns.append(f"{expression} AS {column}")
+        query = "SELECT {} FROM sales_rep_data d {} ORDER BY {}".format(
+            ", ".join(columns),
+            "WHERE " + " AND ".join(conditions) if conditions else "",
+            order,
+        )
+        return self.db.iter_query(
+            query, params, batch_size=batch_size, row_factory=row_factory
+        )
+
+    def rebuild_rollups(self):
+        """
+        Recomputes the lifetime and cumulative rollups from the raw rows.
+        Run this after loading or editing rows outside of this class.
+        """
+        rollups.rebuild_rollups(self.db)
@@ -0,0 +1,252 @@
+# src/models/snapshot_file.py
+
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import NamedTuple
+
+from .analytics import COLUMN_TYPES, ColumnarMetrics, MetricsSnapshot
+from .versions import current_version, reset_version
+
+# First bytes of every snapshot file
+MAGIC = b"KPISNAP\0"
+
+# Version of the file layout; open_snapshot() rewrites files of any other
+FORMAT_VERSION = 2
+
+# Columns start at multiples of this many bytes, so views of them are
+# aligned for NumPy
+ALIGNMENT = 8
+
+# Header: magic, format version, column typecodes (one byte per column, in
+# COLUMN_TYPES order), row count, highest sales_rep_data ID included, data
+# version, reset version and size of the rep dictionary in bytes. It is
+# followed by each column's offset from the start of the file, the rep
+# dictionary (a UTF-8 JSON list of rep IDs, indexed by rep code) and the
+# columns, each an array of fixed-width little-endian values.
+_HEADER = struct.Struct("<8sI8sqqqqI")
+_OFFSETS = struct.Struct(f"<{len(COLUMN_TYPES)}q")
+
+_TYPECODES = "".join(COLUMN_TYPES.values()).encode("ascii")
+
+
+class SnapshotHeader(NamedTuple):
+    """
+    Describes the rows held by a snapshot file.
+
+    Attributes:
+        row_count (int): Number of daily rows.
+        last_id (int): Highest sales_rep_data ID the rows cover.
+        version (int): Global data version when the rows were read.
+        reset_version (int): Version of the last reset of every version.
+    """
+
+    row_count: int
+    last_id: int
+    version: int
+    reset_version: int
+
+
+def write_snapshot(db, path, snapshot=None):
+    """
+    Writes every row of sales_rep_data to a snapshot file. The file is
+    written under a temporary name and then renamed over `path`, so readers
+    never see a partial file.
+
+    Args:
+        db (Database): The database instance.
+        path (str): The snapshot file.
+        snapshot (MetricsSnapshot, optional): An in-memory snapshot of `db`
+            to write; it is refreshed first. The rows are loaded when
+            omitted.
+
+    Returns:
+        SnapshotHeader: What the file holds.
+    """
+    _check_byte_order()
+    if snapshot is None:
+        snapshot = MetricsSnapshot(db, use_numpy=False)
+    else:
+        snapshot.refresh()
+    header = SnapshotHeader(
+        len(snapshot),
+        snapshot.last_id,
+        snapshot.version,
+        snapshot.reset_version,
+    )
+    dictionary = json.dumps(snapshot.rep_ids).encode("utf-8")
+
+    offsets = []
+    position = _HEADER.size + _OFFSETS.size + len(dictionary)
+    for name in COLUMN_TYPES:
+        position = _align(position)
+        offsets.append(position)
+        position += snapshot.columns[name].itemsize * len(snapshot)
+
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as handle:
+            handle.write(
+                _HEADER.pack(
+                    MAGIC, FORMAT_VERSION, _TYPECODES, *header, len(dictionary)
+                )
+            )
+            handle.write(_OFFSETS.pack(*offsets))
+            handle.write(dictionary)
+            for name, offset in zip(COLUMN_TYPES, offsets):
+                handle.write(bytes(offset - handle.tell()))
+                handle.write(snapshot.columns[name])
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return header
+
+
+class MappedSnapshot(ColumnarMetrics):
+    """
+    A snapshot file mapped read-only into memory. Opening it only reads the
+    header and the rep dictionary: each column is a memoryview of the
+    mapping, so values are read from the OS page cache as they are used,
+    without being copied into Python objects, and processes mapping the
+    same file share its pages. Supports every ColumnarMetrics computation.
+
+    Example:
+        with open_snapshot(db, "metrics.snapshot") as snapshot:
+            stats = snapshot.report_stats("2024-01-01", "2024-12-31")
+    """
+
+    def __init__(self, path, use_numpy=None):
+        """
+        Args:
+            path (str): The snapshot file.
+            use_numpy (bool, optional): See ColumnarMetrics.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the file is not a snapshot in this format.
+        """
+        _check_byte_order()
+        self.path = path
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is not a snapshot file")
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self.columns = {}
+        try:
+            super().__init__(self._parse(), self.columns, use_numpy)
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def is_stale(self, db):
+        """
+        Checks whether the database changed since the file was written: its
+        data version moved on, every version was reset (rows may have been
+        edited) or its highest row ID differs, e.g. it is another database.
+
+        Args:
+            db (Database): The database the file was written from.
+
+        Returns:
+            bool: True if the file no longer matches the database.
+        """
+        if current_version(db) != self.header.version:
+            return True
+        if reset_version(db) != self.header.reset_version:
+            return True
+        last_id = db.fetch_one("SELECT MAX(id) FROM sales_rep_data")[0]
+        return (last_id or 0) != self.header.last_id
+
+    def close(self):
+        """
+        Unmaps the file. Columns, and NumPy arrays made from them, cannot be
+        used afterwards.
+
+        Raises:
+            BufferError: If NumPy arrays viewing the columns still exist.
+        """
+        if self._mmap.closed:
+            return
+        for column in self.columns.values():
+            column.release()
+        self._buffer.release()
+        self._mmap.close()
+
+    def _parse(self):
+        """
+        Reads the header and rep dictionary, and adds a view of each column
+        to self.columns.
+
+        Returns:
+            list: The rep dictionary.
+        """
+        buffer = self._buffer
+        if len(buffer) < _HEADER.size + _OFFSETS.size:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        magic, version, typecodes, *fields = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a snapshot file")
+        if version != FORMAT_VERSION or typecodes != _TYPECODES:
+            raise ValueError(
+                f"{self.path} uses snapshot format {version}, expected "
+                f"{FORMAT_VERSION}"
+            )
+        *fields, dictionary_size = fields
+        self.header = SnapshotHeader(*fields)
+
+        start = _HEADER.size + _OFFSETS.size
+        end = start + dictionary_size
+        rep_ids = json.loads(bytes(buffer[start:end]).decode("utf-8"))
+        offsets = _OFFSETS.unpack_from(buffer, _HEADER.size)
+        for (name, typecode), offset in zip(COLUMN_TYPES.items(), offsets):
+            size = struct.calcsize(typecode) * self.header.row_count
+            if offset < end or offset + size > len(buffer):
+                raise ValueError(f"{self.path} is truncated or corrupt")
+            self.columns[name] = buffer[offset : offset + size].cast(typecode)
+        return rep_ids
+
+
+def open_snapshot(db, path, use_numpy=None):
+    """
+    Maps a snapshot file, first writing it from the database if it is
+    missing, stale or in another format.
+
+    Args:
+        db (Database): The database instance.
+        path (str): The snapshot file.
+        use_numpy (bool, optional): See ColumnarMetrics.
+
+    Returns:
+        MappedSnapshot: The mapped file, matching the database.
+    """
+    try:
+        snapshot = MappedSnapshot(path, use_numpy)
+    except (FileNotFoundError, ValueError):
+        pass
+    else:
+        if not snapshot.is_stale(db):
+            return snapshot
+        snapshot.close()
+    write_snapshot(db, path)
+    return MappedSnapshot(path, use_numpy)
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def _check_byte_order():
+    # Columns are written and viewed in the machine's own byte order
+    if sys.byteorder != "little":
+        raise ValueError("Snapshot files need a little-endian machine")
@@ -0,0 +1,135 @@
+# src/models/storage.py
+
+from datetime import date as Date
+from functools import lru_cache
+
+# Difference between SQLite's Julian day numbers and the proleptic Gregorian
+# ordinals used as compact day numbers (0001-01-01 is day 1)
+JULIAN_DAY_OFFSET = 1721424.5
+
+
+class TextStorage:
+    """
+    The original sales_rep_data format: dates as YYYY-MM-DD text and money
+    as REAL dollars. Values are stored exactly as the application passes
+    them, so every conversion is a no-op.
+    """
+
+    name = "text"
+
+    # Declared types of the date and money columns
+    date_type = "TEXT"
+    money_type = "REAL"
+
+    # SQL giving a row's day number (for window frames) and its month
+    # (YYYY-MM)
+    day_sql = "julianday(date)"
+    month_sql = "substr(date, 1, 7)"
+
+    # SQL giving a row's date as a proleptic Gregorian ordinal (the compact
+    # day number), NULL for dates that are not YYYY-MM-DD
+    ordinal_sql = f"CAST(julianday(date) - {JULIAN_DAY_OFFSET} AS INTEGER)"
+
+    def encode_date(self, value):
+        """
+        Converts a YYYY-MM-DD date to its stored form.
+        """
+        return value
+
+    def decode_date(self, value):
+        """
+        Converts a stored date back to YYYY-MM-DD.
+        """
+        return value
+
+    def encode_row(self, row):
+        """
+        Converts a row in SalesRepData.COLUMNS order to its stored form.
+        """
+        return row
+
+    def date_sql(self, column):
+        """
+        Returns SQL that reads a stored date column as YYYY-MM-DD.
+        """
+        return column
+
+    def money_sql(self, column):
+        """
+        Returns SQL that reads a stored money column (or sum) as dollars.
+        """
+        return column
+
+
+class CompactStorage(TextStorage):
+    """
+    Opt-in sales_rep_data format with dates as integer day numbers and money
+    as integer cents. Rows and index entries are narrower, date ranges are
+    integer comparisons and money sums are exact. The rollup tables keep
+    their column types and hold whole cents.
+    """
+
+    name = "compact"
+
+    date_type = "INTEGER"
+    money_type = "INTEGER"
+
+    day_sql = "date"
+    month_sql = f"strftime('%Y-%m', date + {JULIAN_DAY_OFFSET})"
+    ordinal_sql = "date"
+
+    def encode_date(self, value):
+        return Date.fromisoformat(value).toordinal()
+
+    def decode_date(self, value):
+        return _ordinal_to_iso(value)
+
+    def encode_row(self, row):
+        return (
+            row[0],
+            Date.fromisoformat(row[1]).toordinal(),
+            row[2],
+            row[3],
+            row[4],
+            row[5],
+            _cents(row[6]),
+            _cents(row[7]),
+        )
+
+    def date_sql(self, column):
+        return f"date({column} + {JULIAN_DAY_OFFSET})"
+
+    def money_sql(self, column):
+        return f"{column} / 100.0"
+
+
+TEXT_STORAGE = TextStorage()
+COMPACT_STORAGE = CompactStorage()
+
+
+def detect_storage(db):
+    """
+    Determines the format of an existing sales_rep_data table from the
+    declared type of its date column.
+
+    Args:
+        db (Database): The database instance.
+
+    Returns:
+        TextStorage: TEXT_STORAGE or COMPACT_STORAGE.
+    """
+    for column in db.fetch_all("PRAGMA table_info(sales_rep_data)"):
+        if column[1] == "date":
+            if column[2].upper() == COMPACT_STORAGE.date_type:
+                return COMPACT_STORAGE
+            break
+    return TEXT_STORAGE
+
+
+@lru_cache(maxsize=4096)
+def _ordinal_to_iso(value):
+    return Date.fromordinal(value).isoformat()
+
+
+def _cents(value):
+    return None if value is None else round(value * 100)
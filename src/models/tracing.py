@@ -0,0 +1,382 @@
+# src/models/tracing.py
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from typing import NamedTuple
+
+# Statements slower than this (in seconds) are kept in the slow-query log
+DEFAULT_SLOW_THRESHOLD = 0.1
+
+# Most recent durations kept per query for the percentiles
+SAMPLES_PER_QUERY = 1024
+
+# Most recent slow queries kept in memory
+SLOW_LOG_SIZE = 100
+
+# Environment variable that turns tracing on for the CLI and HTTP service;
+# its value is the slow-query threshold in milliseconds
+TRACE_ENV_VAR = "KPI_TRACKER_TRACE_SLOW_MS"
+
+logger = logging.getLogger(__name__)
+
+_NUMBERED_PARAM = re.compile(r"\?\d+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_COMMENT = re.compile(r"--[^\n]*")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_query(query):
+    """
+    Reduces a SQL statement to its shape, so executions that differ only in
+    literals, layout or the length of a value list are aggregated together.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        str: The statement on one line with literals replaced by '?', e.g.
+             "SELECT * FROM users WHERE id = ?".
+    """
+    query = _COMMENT.sub(" ", query)
+    query = _STRING.sub("?", query)
+    query = _NUMBERED_PARAM.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    query = _VALUE_LIST.sub("(?)", query)
+    return _SPACE.sub(" ", query).strip()
+
+
+class QueryStats(NamedTuple):
+    """
+    Aggregated timings of one normalized query. Times are in seconds; the
+    percentiles cover the most recent SAMPLES_PER_QUERY executions.
+    """
+
+    query: str
+    count: int
+    total: float
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class SpanStats(NamedTuple):
+    """
+    Aggregated timings of one named span, e.g. a menu action, split into
+    time spent in database calls and everything else (input handling,
+    computation and rendering).
+    """
+
+    name: str
+    count: int
+    total: float
+    db_time: float
+
+    @property
+    def other_time(self):
+        """
+        float: Seconds spent outside of database calls.
+        """
+        return self.total - self.db_time
+
+
+class SlowQuery(NamedTuple):
+    """
+    One execution that took longer than the slow-query threshold.
+    """
+
+    query: str
+    params: tuple
+    seconds: float
+    timestamp: float
+
+
+class _QueryTimings:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_QUERY)
+
+
+class QueryTracer:
+    """
+    Collects per-statement timings from a Database, aggregated by normalized
+    query, keeps a log of slow statements and times named spans of
+    application work. Thread-safe; spans are tracked per thread.
+
+    Example:
+        tracer = QueryTracer(slow_threshold=0.05)
+        db = Database(tracer=tracer)
+        with tracer.span("report"):
+            ...
+        print(tracer.format_report())
+    """
+
+    def __init__(
+        self,
+        slow_threshold=DEFAULT_SLOW_THRESHOLD,
+        slow_log_size=SLOW_LOG_SIZE,
+    ):
+        """
+        Args:
+            slow_threshold (float): Seconds above which an execution is
+                logged as slow (None disables the slow-query log).
+            slow_log_size (int): Number of slow queries kept in memory.
+        """
+        self.slow_threshold = slow_threshold
+        self._queries = {}
+        self._spans = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, query, params, seconds):
+        """
+        Records one execution of a statement.
+
+        Args:
+            query (str): The SQL statement as executed.
+            params: Its parameters (kept only for slow queries).
+            seconds (float): How long it took, including fetching rows.
+        """
+        normalized = normalize_query(query)
+        with self._lock:
+            timings = self._queries.get(normalized)
+            if timings is None:
+                timings = self._queries[normalized] = _QueryTimings()
+            timings.count += 1
+            timings.total += seconds
+            timings.samples.append(seconds)
+            if seconds > timings.max:
+                timings.max = seconds
+
+        # Charge the time to every span open on this thread
+        for db_time in getattr(self._local, "spans", ()):
+            db_time[0] += seconds
+
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            if not isinstance(params, (tuple, list, dict)):
+                params = "<many>"
+            self._slow.append(
+                SlowQuery(normalized, params, seconds, time.time())
+            )
+            logger.warning(
+                "Slow query (%.1f ms): %s", seconds * 1000, normalized
+            )
+
+    @contextmanager
+    def timing(self, query, params=()):
+        """
+        Times the enclosed block as one execution of `query`.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(query, params, time.perf_counter() - started)
+
+    @contextmanager
+    def span(self, name):
+        """
+        Times the enclosed block under `name`, separating the time spent in
+        database calls made by this thread from the rest.
+
+        Args:
+            name (str): Name of the span, e.g. "manager.compare_all_kpis".
+        """
+        spans = getattr(self._local, "spans", None)
+        if spans is None:
+            spans = self._local.spans = []
+        db_time = [0.0]
+        spans.append(db_time)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - started
+            spans.pop()
+            with self._lock:
+                count, total_so_far, db_so_far = self._spans.get(
+                    name, (0, 0.0, 0.0)
+                )
+                self._spans[name] = (
+                    count + 1,
+                    total_so_far + total,
+                    db_so_far + db_time[0],
+                )
+
+    def query_stats(self):
+        """
+        Returns the aggregated timings of every query seen.
+
+        Returns:
+            list: QueryStats entries, by total time, highest first.
+        """
+        with self._lock:
+            snapshot = [
+                (
+                    query,
+                    timings.count,
+                    timings.total,
+                    timings.max,
+                    list(timings.samples),
+                )
+                for query, timings in self._queries.items()
+            ]
+        stats = []
+        for query, count, total, longest, samples in snapshot:
+            samples.sort()
+            stats.append(
+                QueryStats(
+                    query,
+                    count,
+                    total,
+                    total / count,
+                    _percentile(samples, 50),
+                    _percentile(samples, 95),
+                    _percentile(samples, 99),
+                    longest,
+                )
+            )
+        stats.sort(key=lambda entry: entry.total, reverse=True)
+        return stats
+
+    def span_stats(self):
+        """
+        Returns the aggregated timings of every span.
+
+        Returns:
+            list: SpanStats entries, by total time, highest first.
+        """
+        with self._lock:
+            stats = [
+                SpanStats(name, *values) for name, values in self._spans.items()
+            ]
+        stats.sort(key=lambda entry: entry.total, reverse=True)
+        return stats
+
+    def slow_queries(self):
+        """
+        Returns the most recent slow executions, oldest first.
+
+        Returns:
+            list: SlowQuery entries.
+        """
+        return list(self._slow)
+
+    def reset(self):
+        """
+        Discards everything recorded so far.
+        """
+        with self._lock:
+            self._queries.clear()
+            self._spans.clear()
+            self._slow.clear()
+
+    def format_report(self, limit=20):
+        """
+        Formats the query and span timings as a plain-text report.
+
+        Args:
+            limit (int): Maximum number of queries listed.
+
+        Returns:
+            str: The report.
+        """
+        lines = [
+            "Query timings (ms):",
+            f"{'count':>7} {'total':>10} {'mean':>8} {'p50':>8} "
+            f"{'p95':>8} {'p99':>8} {'max':>8}  query",
+        ]
+        for entry in self.query_stats()[:limit]:
+            lines.append(
+                f"{entry.count:>7} {entry.total * 1000:>10.1f} "
+                f"{entry.mean * 1000:>8.2f} {entry.p50 * 1000:>8.2f} "
+                f"{entry.p95 * 1000:>8.2f} {entry.p99 * 1000:>8.2f} "
+                f"{entry.max * 1000:>8.2f}  {entry.query[:100]}"
+            )
+        spans = self.span_stats()
+        if spans:
+            lines.append("")
+            lines.append("Spans (ms):")
+            lines.append(
+                f"{'count':>7} {'total':>10} {'db':>10} {'other':>10}  name"
+            )
+            for entry in spans:
+                lines.append(
+                    f"{entry.count:>7} {entry.total * 1000:>10.1f} "
+                    f"{entry.db_time * 1000:>10.1f} "
+                    f"{entry.other_time * 1000:>10.1f}  {entry.name}"
+                )
+        slow = self.slow_queries()
+        if slow:
+            lines.append("")
+            lines.append(
+                f"Slow queries (>= {self.slow_threshold * 1000:.0f} ms, "
+                "most recent last):"
+            )
+            for entry in slow:
+                lines.append(
+                    f"{entry.seconds * 1000:>10.1f}  {entry.query[:100]}"
+                )
+        return "\n".join(lines)
+
+
+def span(tracer, name):
+    """
+    Returns tracer.span(name), or a no-op context manager when tracing is
+    off (tracer is None).
+    """
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name)
+
+
+def tracer_from_env(environ=None):
+    """
+    Creates a QueryTracer if tracing was turned on through TRACE_ENV_VAR.
+
+    Args:
+        environ (dict, optional): Environment to read. Defaults to
+            os.environ.
+
+    Returns:
+        QueryTracer: A tracer with the configured slow-query threshold, or
+                     None if the variable is not set.
+
+    Raises:
+        ValueError: If the variable is not a number of milliseconds.
+    """
+    value = (os.environ if environ is None else environ).get(TRACE_ENV_VAR)
+    if not value:
+        return None
+    try:
+        threshold = float(value) / 1000
+    except ValueError:
+        raise ValueError(
+            f"{TRACE_ENV_VAR} must be a number of milliseconds, got {value!r}"
+        ) from None
+    return QueryTracer(slow_threshold=threshold)
+
+
+def _percentile(samples, percent):
+    """
+    Nearest-rank percentile of an ascending list of samples.
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, -(-len(samples) * percent // 100))
+    return samples[int(rank) - 1]
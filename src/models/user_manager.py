@@ -1,6 +1,10 @@
 # src/models/user_manager.py
 
+import sqlite3
+
 from .database import Database
+from .records import UserRecord, dict_factory, record_factory
+from .versions import bump_version
 
 
 class UserManager:
@@ -39,6 +43,35 @@ class UserManager:
         else:
             return False, response["message"]
 
+    def add_users(self, users):
+        """
+        Adds several users in a single transaction. Either every user is
+        added or, if any of them fails (e.g., a duplicate ID), none are.
+
+        Args:
+            users (iterable): Tuples of (user_id, name, pin, role).
+
+        Returns:
+            tuple: A tuple containing a boolean indicating success and a message.
+                   (True, "Success message") if all users are added.
+                   (False, "Error message") if the operation fails.
+        """
+        try:
+            with self.db.transaction():
+                count = self.db.execute_many(
+                    """
+                    INSERT INTO users (id, name, pin, role)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    users,
+                )
+                bump_version(self.db)
+        except sqlite3.IntegrityError as e:
+            if "UNIQUE constraint failed" in str(e):
+                return False, "User ID already exists."
+            return False, str(e)
+        return True, f"{count} users added successfully."
+
     def get_user(self, user_id):
         """
         Retrieves user information based on the provided user ID.
@@ -50,21 +83,23 @@ class UserManager:
             dict: A dictionary with the user's details (id, pin, name, role)
                   if the user exists. Returns None if the user is not found.
         """
-        result = self.db.fetch_all(
+        # The row factory builds the dictionary as the row is read
+        return self.db.fetch_one(
             """
             SELECT id, pin, name, role FROM users WHERE id = ?
             """,
             (user_id,),
+            row_factory=dict_factory,
         )
-        if result:
-            # Return the user data as a dictionary
-            return {
-                "id": result[0][0],  # User ID
-                "pin": result[0][1],  # Hashed PIN
-                "name": result[0][2],  # User's name
-                "role": result[0][3],  # User's role
-            }
-        return None  # User not found
+
+    def has_users(self):
+        """
+        Checks whether any user exists, without reading the users table.
+
+        Returns:
+            bool: True if at least one user has been added.
+        """
+        return bool(self.db.fetch_one("SELECT EXISTS (SELECT 1 FROM users)")[0])
 
     def get_all_users(self):
         """
@@ -73,10 +108,32 @@ class UserManager:
 
         Returns:
             list: A list of dictionaries containing user information (id, name, role)
-                  for all users in the database.
+                  for all users in the database, in the order they were added.
+        """
+        return self.db.fetch_all(
+            "SELECT id, name, role FROM users ORDER BY rowid",
+            row_factory=dict_factory,
+        )
+
+    def iter_users(self, role=None):
         """
-        results = self.db.fetch_all("SELECT id, name, role FROM users")
-        # Convert the query result into a list of dictionaries
-        return [
-            {"id": row[0], "name": row[1], "role": row[2]} for row in results
-        ]
+        Streams users from the database without building a list. Unlike
+        get_all_users(), each user is a lightweight UserRecord, which
+        supports attribute and user["role"]-style access.
+
+        Args:
+            role (str, optional): Only include users with this role.
+
+        Yields:
+            UserRecord: One user at a time, in the order they were added.
+        """
+        query = "SELECT id, name, role FROM users"
+        params = ()
+        if role is not None:
+            query += " WHERE role = ?"
+            params = (role,)
+        yield from self.db.iter_query(
+            query + " ORDER BY rowid",
+            params,
+            row_factory=record_factory(UserRecord),
+        )
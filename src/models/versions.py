@@ -0,0 +1,144 @@
+# src/models/versions.py
+
+# Scope bumped by every write; caches of whole-team results key on it
+GLOBAL_SCOPE = "*"
+
+# Scope set by bump_all_versions(); every rep and range version is at least
+# this value, so bumping it invalidates them all at once
+RESET_SCOPE = "reset"
+
+# Prefixes of the per-rep and per-date scopes, e.g. 'rep:SR001' and
+# 'date:2024-01-31'
+REP_SCOPE = "rep:"
+DATE_SCOPE = "date:"
+
+# Version table, created by schema migration 4
+CREATE_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS data_version (
+        scope TEXT PRIMARY KEY,     -- What the version covers, e.g. '*'
+        version INTEGER NOT NULL    -- Bumped whenever that data changes
+    ) WITHOUT ROWID
+    """,
+    f"INSERT OR IGNORE INTO data_version VALUES ('{GLOBAL_SCOPE}', 0)",
+)
+
+# Sets a scope to the current global version
+_SCOPE_UPSERT = f"""
+    INSERT INTO data_version (scope, version)
+    VALUES (
+        ?, (SELECT version FROM data_version WHERE scope = '{GLOBAL_SCOPE}')
+    )
+    ON CONFLICT (scope) DO UPDATE SET version = excluded.version
+"""
+
+
+def bump_version(db, rep_ids=(), dates=()):
+    """
+    Records that data changed. The global version is incremented and the
+    scopes of the given reps and dates are set to the new global version, so
+    every version is monotonic and a range's version can be taken as the
+    maximum over its dates. Should run in the same transaction as the write
+    it describes.
+
+    Args:
+        db (Database): The database instance.
+        rep_ids (iterable): Reps whose data changed.
+        dates (iterable): Dates (YYYY-MM-DD) whose data changed.
+    """
+    db.execute_query(
+        "UPDATE data_version SET version = version + 1 WHERE scope = ?",
+        (GLOBAL_SCOPE,),
+    )
+    scopes = [(REP_SCOPE + rep_id,) for rep_id in rep_ids]
+    scopes.extend((DATE_SCOPE + date,) for date in dates)
+    if scopes:
+        db.execute_many(_SCOPE_UPSERT, scopes)
+
+
+def bump_all_versions(db):
+    """
+    Invalidates every scope at once, e.g. after rollups were rebuilt from
+    rows written outside of the application.
+
+    Args:
+        db (Database): The database instance.
+    """
+    bump_version(db)
+    db.execute_query(_SCOPE_UPSERT, (RESET_SCOPE,))
+
+
+def current_version(db):
+    """
+    Returns the global data version, which changes on every write made
+    through the application.
+
+    Args:
+        db (Database): The database instance.
+
+    Returns:
+        int: The current version.
+    """
+    row = db.fetch_one(
+        "SELECT version FROM data_version WHERE scope = ?", (GLOBAL_SCOPE,)
+    )
+    return row[0] if row else 0
+
+
+def reset_version(db):
+    """
+    Returns the version set by the last bump_all_versions(), e.g. when the
+    rollups were rebuilt after rows were edited outside of the application.
+
+    Args:
+        db (Database): The database instance.
+
+    Returns:
+        int: The version, or 0 if versions were never reset.
+    """
+    row = db.fetch_one(
+        "SELECT version FROM data_version WHERE scope = ?", (RESET_SCOPE,)
+    )
+    return row[0] if row else 0
+
+
+def rep_version(db, rep_id):
+    """
+    Returns the version of one rep's data; it changes whenever a row for
+    that rep is written.
+
+    Args:
+        db (Database): The database instance.
+        rep_id (str): The ID of the sales rep.
+
+    Returns:
+        int: The rep's version, or 0 if the rep never had data written.
+    """
+    row = db.fetch_one(
+        "SELECT MAX(version) FROM data_version WHERE scope IN (?, ?)",
+        (REP_SCOPE + rep_id, RESET_SCOPE),
+    )
+    return row[0] or 0
+
+
+def range_version(db, start_date, end_date):
+    """
+    Returns the version of the data in an inclusive date range; it changes
+    whenever a row dated inside the range is written.
+
+    Args:
+        db (Database): The database instance.
+        start_date (str): First date of the range (YYYY-MM-DD).
+        end_date (str): Last date of the range (YYYY-MM-DD).
+
+    Returns:
+        int: The range's version, or 0 if nothing was written in it.
+    """
+    row = db.fetch_one(
+        """
+        SELECT MAX(version) FROM data_version
+        WHERE scope BETWEEN ? AND ? OR scope = ?
+        """,
+        (DATE_SCOPE + start_date, DATE_SCOPE + end_date, RESET_SCOPE),
+    )
+    return row[0] or 0
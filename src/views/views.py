@@ -1,5 +1,10 @@
 # src/views/views.py
-from src.controllers.utils import get_numeric_input_metrics, get_valid_date
+from src.controllers.utils import (
+    get_nonempty_input,
+    get_numeric_input_metrics,
+    get_optional_date,
+    get_valid_date,
+)
 
 
 def display_manager_menu():
@@ -13,6 +18,9 @@ def display_manager_menu():
         "3. Generate report\n"
         "4. Exit\n"
         "5. Seed DB with Sample Data\n"
+        "6. Import Metrics from File\n"
+        "7. Export Data to File\n"
+        "8. View Leaderboard\n"
     )
 
 
@@ -60,3 +68,153 @@ def prompt_for_metrics():
         cash_collected,
         contract_value,
     )
+
+
+def format_kpi_summary(result):
+    """
+    Formats a sales rep's KPI summary for display.
+
+    Args:
+        result (KPIResult): The rep's totals and KPIs.
+
+    Returns:
+        str: The multi-line KPI summary.
+    """
+    return "\n".join(
+        [
+            f"\nKPI Summary for Employee {result.rep_id}:",
+            f" - Show Percentage: {result.show_percentage:.2f}% "
+            f"({result.scheduled_calls} Scheduled Calls, "
+            f"{result.live_calls} Live Calls)",
+            f" - Offer Percentage: {result.offer_percentage:.2f}% "
+            f"({result.live_calls} Live Calls, {result.offers} Offers)",
+            f" - Close Percentage: {result.close_percentage:.2f}% "
+            f"({result.offers} Offers, {result.closed} Closed Deals)",
+            f" - Cash Collected: ${result.cash_collected:.2f}",
+            f" - Contract Value: ${result.contract_value:.2f}",
+        ]
+    )
+
+
+def display_kpi_summary(result):
+    """
+    Prints a sales rep's KPI summary.
+
+    Args:
+        result (KPIResult): The rep's totals and KPIs.
+    """
+    print(format_kpi_summary(result))
+
+
+def prompt_for_team_kpi_options(sort_keys):
+    """
+    Prompts the manager for how to order and limit the team KPI comparison.
+
+    Args:
+        sort_keys (iterable): The KPI names that can be sorted by.
+
+    Returns:
+        tuple: (sort_by, limit), where sort_by is one of sort_keys or None
+               and limit is a positive int or None. Blank answers mean None.
+    """
+    sort_keys = list(sort_keys)
+    print("Sort by one of: " + ", ".join(sort_keys))
+    while True:
+        sort_by = input("Sort by (leave blank for none): ").strip() or None
+        if sort_by is None or sort_by in sort_keys:
+            break
+        print("Error: Unknown KPI. Please try again.")
+
+    limit = None
+    if sort_by:
+        while True:
+            value = input("Show top N reps (leave blank for all): ").strip()
+            if not value:
+                break
+            if value.isdigit() and int(value) > 0:
+                limit = int(value)
+                break
+            print("Error: Input must be a positive number. Please try again.")
+    return sort_by, limit
+
+
+def prompt_for_leaderboard(metrics):
+    """
+    Prompts the manager for which leaderboard to show.
+
+    Args:
+        metrics (iterable): The metric and KPI names that can be ranked by.
+
+    Returns:
+        tuple: (metric, limit, bottom, start_date, end_date), where limit is
+               a positive int, bottom is True for the lowest-ranked reps and
+               the dates are YYYY-MM-DD strings or None.
+    """
+    metrics = list(metrics)
+    print("Rank by one of: " + ", ".join(metrics))
+    while True:
+        metric = get_nonempty_input("Rank by: ")
+        if metric in metrics:
+            break
+        print("Error: Unknown metric. Please try again.")
+    while True:
+        value = input("Show top N reps (default 10): ").strip() or "10"
+        if value.isdigit() and int(value) > 0:
+            limit = int(value)
+            break
+        print("Error: Input must be a positive number. Please try again.")
+    bottom = input("Show the bottom instead (y/N): ").strip().lower() == "y"
+    start_date = get_optional_date("Start date (YYYY-MM-DD, blank for none): ")
+    end_date = get_optional_date("End date (YYYY-MM-DD, blank for none): ")
+    return metric, limit, bottom, start_date, end_date
+
+
+def format_leaderboard(entries, metric, bottom=False):
+    """
+    Formats leaderboard entries as a ranked table.
+
+    Args:
+        entries (list): LeaderboardEntry items from KPI.leaderboard().
+        metric (str): The metric the reps are ranked by.
+        bottom (bool): Whether the entries are the lowest-ranked reps.
+
+    Returns:
+        str: The table, one rep per line.
+    """
+    title = metric.replace("_", " ").title()
+    lines = [
+        f"{'Bottom' if bottom else 'Top'} {len(entries)} by {title}:",
+        f"{'Rank':>4}  {'Rep':<10} {'Name':<24} {'Value':>12}",
+    ]
+    for entry in entries:
+        value = entry.value
+        text = f"{value:,.2f}" if isinstance(value, float) else f"{value:,}"
+        lines.append(
+            f"{entry.rank:>4}  {entry.rep_id:<10} {entry.name or '':<24} "
+            f"{text:>12}"
+        )
+    return "\n".join(lines)
+
+
+def prompt_for_export(kinds):
+    """
+    Prompts the manager for what to export and how to filter it.
+
+    Args:
+        kinds (sequence): The kinds of data that can be exported.
+
+    Returns:
+        tuple: (kind, path, rep_ids, start_date, end_date), where rep_ids is
+               a list or None and the dates are YYYY-MM-DD strings or None.
+    """
+    while True:
+        kind = get_nonempty_input(f"Export what ({', '.join(kinds)}): ")
+        if kind in kinds:
+            break
+        print("Error: Unknown export. Please try again.")
+    path = get_nonempty_input("Enter the output file (.csv or .ndjson): ")
+    reps = input("Rep IDs, comma-separated (leave blank for all): ").strip()
+    rep_ids = [rep.strip() for rep in reps.split(",") if rep.strip()] or None
+    start_date = get_optional_date("Start date (YYYY-MM-DD, blank for none): ")
+    end_date = get_optional_date("End date (YYYY-MM-DD, blank for none): ")
+    return kind, path, rep_ids, start_date, end_date
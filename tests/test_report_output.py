@@ -0,0 +1,81 @@
+# tests/test_report_output.py
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.controllers import utils
+from src.controllers.utils import format_report, generate_report
+from src.models.database import Database
+from src.models.sales_rep_data import SalesRepData
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+
+# The golden reports were printed by the original generate_report() on this
+# seeded data (default seed), before the report used any rollup
+REPS = 40
+START_DATE = "2023-09-01"
+DAYS = 200
+
+
+def golden_reports():
+    """
+    Lists the golden report files.
+
+    Returns:
+        list: (start_date, end_date, expected output) per file.
+    """
+    reports = []
+    for name in sorted(os.listdir(GOLDEN_DIR)):
+        start_date, end_date = name[len("report_") : -len(".txt")].split("_")
+        with open(os.path.join(GOLDEN_DIR, name), encoding="utf-8") as file:
+            reports.append((start_date, end_date, file.read()))
+    return reports
+
+
+class ReportOutputTest(unittest.TestCase):
+    """
+    The team report must print exactly what it printed before the report
+    was optimized, including medians and quartiles that fall on a half cent.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.db = Database(os.path.join(cls.directory.name, "report.db"))
+        utils.seed_database(cls.db, REPS, START_DATE, DAYS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        cls.directory.cleanup()
+
+    def test_generate_report_matches_golden_output(self):
+        for start_date, end_date, expected in golden_reports():
+            with self.subTest(start_date=start_date, end_date=end_date):
+                answers = [start_date, end_date, "n"]
+                output = io.StringIO()
+                with mock.patch("builtins.input", side_effect=answers):
+                    with mock.patch.object(utils, "clear_screen"):
+                        with contextlib.redirect_stdout(output):
+                            generate_report(SalesRepData(self.db))
+                self.assertEqual(output.getvalue(), expected)
+
+    def test_format_report_matches_golden_output(self):
+        metrics_manager = SalesRepData(self.db)
+        for start_date, end_date, expected in golden_reports():
+            stats = metrics_manager.report_stats(start_date, end_date)
+            if stats is None:
+                continue
+            with self.subTest(start_date=start_date, end_date=end_date):
+                self.assertEqual(
+                    format_report(stats, start_date, end_date) + "\n",
+                    expected,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()